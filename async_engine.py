@@ -0,0 +1,383 @@
+"""
+Asyncio batch engine (python ebay_open.py --batch --engine async).
+
+The sync engine handles one listing at a time: extract, then match, then
+download, then fill the form, and scans the closet before any of that. Here
+the independent waits overlap:
+
+    collect URLs ─→ extract (EXTRACT_TABS tabs, or EXTRACT_CONCURRENCY HTTP requests)
+                        │  [extracted queue, PIPELINE_DEPTH]
+                        ▼
+                    image prefetch (speculative, skipped once the closet
+                        │           scan shows the listing already exists)
+                        │  [ready queue, PIPELINE_DEPTH]
+                        ▼
+    closet scan ──→ match + Poshmark form (one tab, one listing at a time)
+
+The closet scan runs on its own tab from the start. The closet scan and the
+Poshmark form are the flows in poshmark.py, shared with the sync engine.
+"""
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import asyncio, re, time
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+from closet_index import ClosetIndex
+from ebay_http import fetch_listing
+from ebay_listing import EXTRACT_LISTING_JS, EbayListing, listing_from_js
+from ebay_open import (
+    browser_launch_options,
+    download_ebay_images,
+    ebay_item_id,
+    pending_listing_urls,
+    resumed_listing,
+)
+from job_ledger import JobLedger, ledger_key
+from listing_cache import ListingCache
+from memory_guard import MemoryGuard, chromium_metrics_async, recycle_pages_async
+from net_policy import get_net_policy, navigate_async
+from route_policy import RoutePolicy
+from title_match import TitleIndex
+import config, metrics, poshmark
+
+
+_DONE = object()
+
+
+# --- eBay side ----------------------------------------------------------------
+
+async def collect_active_listing_urls(page) -> list[str]:
+    """Async collect_active_listing_urls (ebay_open.py)."""
+    urls = []
+    seen_ids = set()
+    visited_pages = set()
+
+    while True:
+        visited_pages.add(page.url)
+        hrefs = await page.eval_on_selector_all(
+            "a[href*='/itm/']", "els => els.map(el => el.href)"
+        )
+        for href in hrefs:
+            item_id = ebay_item_id(href)
+            if item_id and item_id not in seen_ids:
+                seen_ids.add(item_id)
+                parts = urlsplit(href)
+                urls.append(f"{parts.scheme}://{parts.netloc}/itm/{item_id}")
+        print(f"  Page {len(visited_pages)}: {len(urls)} listings so far")
+
+        next_href = await page.evaluate(
+            """() => {
+                const a = document.querySelector('a.pagination__next');
+                if (!a || a.getAttribute('aria-disabled') === 'true') return null;
+                return a.href || null;
+            }"""
+        )
+        if not next_href or next_href in visited_pages:
+            return urls
+
+        try:
+            await navigate_async(page, next_href, wait_for="a[href*='/itm/']")
+        except PlaywrightTimeoutError:
+            metrics.incr("timeouts")
+            return urls
+
+
+async def get_ebay_description(page) -> str:
+    """Async get_ebay_description (ebay_listing.py) for cross-origin #desc frames."""
+    frame = page.frame(name="desc") or page.frame(url=re.compile(".*desc.*"))
+    if not frame:
+        return ""
+    try:
+        return await frame.eval_on_selector(".x-item-description-child", "el => el.innerText.trim()")
+    except Exception as e:
+        print(f"[desc] Error extracting description: {e}")
+        return ""
+
+
+async def extract_listing(page, url: str) -> EbayListing:
+    with metrics.span("ebay.goto", page="item"):
+        await navigate_async(page, url)
+    with metrics.span("ebay.extract"):
+        data = await page.evaluate(EXTRACT_LISTING_JS)
+        if not data["title"]:
+            raise RuntimeError(f"No eBay title found on {page.url}")
+        description = data["description"]
+        if description is None:
+            description = await get_ebay_description(page)
+    return listing_from_js(data, page.url, ebay_item_id(url), description)
+
+
+# --- Poshmark side (the flows themselves are in poshmark.py) -------------------------
+
+async def scan_posh_closet(posh_page, closet_index: ClosetIndex, full_rescan: bool = False,
+                           stall_timeout_ms: int | None = None,
+                           mode: str | None = None) -> list[str]:
+    """Async scan_posh_closet (ebay_open.py): incremental unless full_rescan."""
+    with metrics.span("posh.closet_scan"):
+        return await poshmark.run_async(posh_page, poshmark.scan_closet(
+            closet_index, full_rescan, stall_timeout_ms, mode))
+
+
+async def create_posh_listing(posh_page, listing: EbayListing, jpg_files: list[Path],
+                              on_stage=None):
+    """
+    Walk the Create Listing form with photos already processed (poshmark.py).
+    Raises RuntimeError if the listing was not created.
+    """
+    with metrics.span("posh.create_listing"):
+        await poshmark.run_async(posh_page, poshmark.fill_listing_form(listing, jpg_files,
+                                                                       on_stage))
+
+
+# --- pipeline -------------------------------------------------------------------
+
+async def run_pipeline(context, ebay_page, closet_index: ClosetIndex, cache: ListingCache,
+                       ledger: JobLedger, limit: int | None = None, full_rescan: bool = False,
+                       backend: str = "browser", shard: tuple[int, int] | None = None) -> dict:
+    """
+    Crosslist every active listing with extraction, closet scan and images
+    overlapped. Progress is recorded in `ledger` as in ebay_open.run_batch.
+    """
+    run_start = time.perf_counter()
+
+    guard = MemoryGuard.from_config()
+
+    async def scan_closet():
+        closet_page = await context.new_page()
+        try:
+            return await scan_posh_closet(closet_page, closet_index, full_rescan=full_rescan)
+        finally:
+            await closet_page.close()
+
+    closet_task = asyncio.create_task(scan_closet())
+
+    print("\nCollecting eBay active listings (all pages)...")
+    with metrics.span("ebay.collect_urls"):
+        listing_urls = await collect_active_listing_urls(ebay_page)
+    listing_urls = pending_listing_urls(listing_urls, ledger, limit, shard)
+    extractors = (f"{config.EXTRACT_TABS} tabs" if backend == "browser"
+                  else f"{config.EXTRACT_CONCURRENCY} HTTP requests")
+    print(f"\n{len(listing_urls)} listings to process "
+          f"({extractors} extracting, depth {config.PIPELINE_DEPTH}).")
+
+    todo = asyncio.Queue()
+    for n, url in enumerate(listing_urls, start=1):
+        todo.put_nowait((n, url))
+    extracted = asyncio.Queue(maxsize=config.PIPELINE_DEPTH)
+    ready = asyncio.Queue(maxsize=config.PIPELINE_DEPTH)
+    title_index = None  # set once the closet scan finishes
+    prefetched = set()  # speculative image downloads the form stage hasn't used yet
+
+    async def extractor(tab):
+        while True:
+            try:
+                n, url = todo.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            key = ledger_key(url, ebay_item_id(url))
+            entry = ledger.start(key, url)
+            try:
+                listing = resumed_listing(entry, cache)
+                if listing is not None:
+                    print(f"(resuming {key} after {entry.stage})")
+                elif tab is None:
+                    listing = await asyncio.to_thread(
+                        fetch_listing, url, item_id=ebay_item_id(url),
+                        cache=cache, max_age=config.LISTING_CACHE_TTL,
+                    )
+                else:
+                    listing = cache.fresh_listing(ebay_item_id(url), config.LISTING_CACHE_TTL)
+                    if listing is None:
+                        listing = await extract_listing(tab, url)
+                        cache.put_listing(listing)
+                if not entry.reached("extracted"):
+                    ledger.advance(key, "extracted", listing.title)
+            except Exception as e:
+                listing = e
+            await extracted.put((n, url, listing))
+
+    async def extract_stage():
+        if backend == "http":
+            workers = [extractor(None) for _ in range(config.EXTRACT_CONCURRENCY)]
+        else:
+            tabs = [ebay_page] + [await context.new_page() for _ in range(config.EXTRACT_TABS - 1)]
+            workers = [extractor(tab) for tab in tabs]
+        await asyncio.gather(*workers)
+        if backend != "http":
+            for tab in tabs[1:]:
+                await tab.close()
+        await extracted.put(_DONE)
+
+    async def prefetch_stage():
+        while (item := await extracted.get()) is not _DONE:
+            n, url, listing = item
+            images = None
+            if isinstance(listing, EbayListing):
+                # Don't fetch photos for listings we already know are in the closet
+                if title_index is None or not title_index.match(listing.title):
+                    images = asyncio.create_task(asyncio.to_thread(
+                        download_ebay_images, listing.image_urls, listing.title, cache,
+                        listing.item_id, evict=False,
+                    ))
+                    prefetched.add(images)
+            await ready.put((n, url, listing, images))
+        await ready.put(_DONE)
+
+    def evict_images():
+        """
+        Trim the image cache while no download is running (one may be reusing
+        any blob), keeping the photos of listings still waiting for the form.
+        """
+        if any(not task.done() for task in prefetched):
+            return
+        keep = [path.stem for task in prefetched
+                if not task.cancelled() and task.exception() is None
+                for path in task.result()]
+        cache.evict(keep=keep)
+
+    async def post_stage() -> dict:
+        nonlocal title_index
+        title_index = TitleIndex(await closet_task, threshold=config.TITLE_MATCH_THRESHOLD)
+        posh_page = await context.new_page()
+        results = {"created": 0, "exists": 0, "failed": 0}
+        on_page = 0  # listings since the Poshmark tab was opened
+
+        while (item := await ready.get()) is not _DONE:
+            n, url, listing, images = item
+            # Only the form tab is replaced here; the extraction tabs close when
+            # their stage ends, and a browser restart is left to the sync engine
+            if on_page >= config.PAGE_RECYCLE_LISTINGS or guard.over_ceiling():
+                with metrics.span("browser.recycle"):
+                    posh_page, = await recycle_pages_async(posh_page)
+                guard.recycled()
+                on_page = 0
+            print(f"\n=== [{n}/{len(listing_urls)}] {url} ===")
+            item_start = time.perf_counter()
+            key = ledger_key(url, ebay_item_id(url))
+            with metrics.span("listing", item_id=ebay_item_id(url)) as listing_span:
+                try:
+                    if isinstance(listing, Exception):
+                        raise listing
+                    matches = title_index.match(listing.title)
+                    if matches:
+                        print(f"Already in closet: {matches[0].title} [{matches[0].kind}]")
+                        ledger.advance(key, "exists")
+                        status = "exists"
+                    else:
+                        if images is None:
+                            images = asyncio.create_task(asyncio.to_thread(
+                                download_ebay_images, listing.image_urls, listing.title, cache,
+                                listing.item_id, evict=False,
+                            ))
+                        jpg_files = await images
+                        ledger.advance(key, "images_ready")
+                        await create_posh_listing(posh_page, listing, jpg_files,
+                                                  on_stage=lambda stage: ledger.advance(key, stage))
+                        # Only a listing that reached "listed" counts as in the closet
+                        title_index.add(listing.title)
+                        closet_index.add_created(listing.title)
+                        status = "created"
+                except Exception as e:
+                    print(f"✗ Listing failed: {e}")
+                    ledger.fail(key, f"{type(e).__name__}: {e}")
+                    status = "failed"
+                finally:
+                    if images is not None:
+                        # A photo thread can't be interrupted; a prefetch for a listing
+                        # that exists (or failed) is waited for, not left running
+                        await asyncio.gather(images, return_exceptions=True)
+                        prefetched.discard(images)
+                listing_span.set(status=status)
+            evict_images()
+            results[status] += 1
+            metrics.incr(f"listings_{status}")
+            print(f"--- {status} in {time.perf_counter() - item_start:.1f}s")
+            on_page += 1
+            done = sum(results.values())  # listings arrive out of order
+            if guard.snapshot_due(done):
+                guard.record(done, await chromium_metrics_async(posh_page))
+        await posh_page.close()
+        return results
+
+    stages = [
+        asyncio.create_task(extract_stage()),
+        asyncio.create_task(prefetch_stage()),
+        asyncio.create_task(post_stage()),
+    ]
+    try:
+        results = (await asyncio.gather(*stages))[-1]
+    finally:
+        # A failed stage (e.g. the closet scan) must not leave the others
+        # blocked on a full queue
+        for task in stages + [closet_task]:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*prefetched, return_exceptions=True)
+        prefetched.clear()
+        cache.evict()
+
+    elapsed = time.perf_counter() - run_start
+    processed = sum(results.values())
+    rate = processed / (elapsed / 60) if elapsed > 0 else 0.0
+    print(
+        f"\nBATCH DONE (async): {processed} listings in {elapsed:.1f}s "
+        f"({rate:.2f} listings/min) — "
+        f"created {results['created']}, already listed {results['exists']}, "
+        f"failed {results['failed']}"
+    )
+    cache.print_stats()
+    get_net_policy().print_stats()
+    guard.print_report()
+    ledger.print_report()
+    return results
+
+
+async def run_async(args):
+    """Async counterpart of ebay_open.run() for --engine async."""
+    config.PROFILE_DIR.mkdir(exist_ok=True)
+    config.DOWNLOAD_DIR.mkdir(exist_ok=True)
+
+    async with async_playwright() as p:
+        with metrics.span("browser.launch"):
+            context = await p.chromium.launch_persistent_context(**browser_launch_options())
+
+        route_policy = RoutePolicy.from_config()
+        if route_policy is not None:
+            await route_policy.install_async(context)
+
+        page = context.pages[0] if context.pages else await context.new_page()
+        print(f"Opening eBay Active Listings page: {config.EBAY_SELLING_URL}")
+        with metrics.span("ebay.goto", page="selling"):
+            await navigate_async(page, config.EBAY_SELLING_URL)
+        try:
+            await page.wait_for_selector("a[href*='/itm/']", timeout=15000)
+        except PlaywrightTimeoutError:
+            metrics.incr("timeouts")
+            print("\nNo listing links found on the eBay Active Listings page.")
+            print("Make sure you're logged in and have active listings.")
+            await context.close()
+            return
+
+        closet_index = ClosetIndex(config.CLOSET_INDEX_PATH)
+        cache = ListingCache(config.CACHE_DIR, config.CACHE_MAX_BYTES)
+        # Only --batch runs resume; a single listing gets a throwaway ledger
+        ledger = JobLedger(config.LEDGER_PATH if args.batch else ":memory:")
+        if args.batch and args.restart:
+            ledger.reset()
+        try:
+            await run_pipeline(
+                context, page, closet_index, cache, ledger,
+                limit=args.limit if args.batch else 1,
+                full_rescan=args.full_rescan,
+                backend=args.extract_backend,
+                shard=args.shard if args.batch else None,
+            )
+            if route_policy is not None:
+                route_policy.print_stats()
+        finally:
+            ledger.close()
+            cache.close()
+            closet_index.close()
+            await context.close()
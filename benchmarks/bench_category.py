@@ -0,0 +1,163 @@
+"""
+Benchmark and equivalence check for category_rules.map_ebay_category_to_posh.
+
+The compiled single-regex classifier is checked against a straightforward
+reference that walks CATEGORY_RULES in order with one whole-word regex per
+keyword; any disagreement is a bug and exits non-zero. Differences against
+the old substring matching ("cap" in "capris") are listed for review.
+
+    python benchmarks/bench_category.py                  # synthetic corpus
+    python benchmarks/bench_category.py titles.tsv       # real listings
+
+The corpus file has one listing per line: either just a title, or
+"category<TAB>title<TAB>department".
+"""
+from pathlib import Path
+
+import argparse, random, re, sys, time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from category_rules import (
+    CATEGORY_RULES,
+    FALLBACK_SUBCATEGORY,
+    classify_many,
+    main_category_for,
+    map_ebay_category_to_posh,
+)
+
+DEPARTMENTS = ["Men", "Women", "Unisex Adult", ""]
+CATEGORIES = [
+    "Tops", "Shirts", "Jeans", "Pants", "Shoes", "Athletic Shoes", "Boots",
+    "Dresses", "Coats, Jackets & Vests", "Sweaters", "Activewear",
+    "Hats", "Jewelry", "Bags & Handbags", "Skirts", "Shorts", "Other",
+]
+FILLER = [
+    "nike", "levis", "vintage", "black", "blue", "red", "size", "m", "l", "xl",
+    "cotton", "wool", "mens", "womens", "new", "nwt", "slim", "fit", "classic",
+    "capris", "cutie", "pink", "string", "spring", "brand", "cap", "tie",
+    "bras", "dresses", "coats", "sets", "rings",
+]
+
+
+def _rule_walk(text: str, main_cat: str, has) -> tuple[str, str]:
+    women = main_cat == "Women"
+    for women_label, men_label, words in CATEGORY_RULES:
+        if men_label is None and not women:
+            continue
+        if has(words):
+            return (main_cat, women_label if women else men_label)
+    return (main_cat, FALLBACK_SUBCATEGORY)
+
+
+_WORD_RES = {}
+
+
+def reference_whole_word(category, title, department):
+    """Same rule order, one whole-word regex per keyword (slow but obvious)."""
+    text = (category or "").lower() + " " + (title or "").lower()
+
+    def has(words):
+        for w in words:
+            pat = _WORD_RES.get(w)
+            if pat is None:
+                pat = _WORD_RES[w] = re.compile(
+                    rf"(?<![a-z0-9]){re.escape(w)}(?:s|es)?(?![a-z0-9])"
+                )
+            if pat.search(text):
+                return True
+        return False
+
+    return _rule_walk(text, main_category_for(department), has)
+
+
+def old_substring(category, title, department):
+    """The original any(w in text) behaviour, for the diff report."""
+    text = (category or "").lower() + " " + (title or "").lower()
+    return _rule_walk(text, main_category_for(department), lambda ws: any(w in text for w in ws))
+
+
+def synthetic_corpus(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    keywords = [w for _, _, words in CATEGORY_RULES for w in words]
+    rows = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(3, 8))
+        for _ in range(rng.randint(0, 2)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        rows.append((rng.choice(CATEGORIES), " ".join(words).title(), rng.choice(DEPARTMENTS)))
+    return rows
+
+
+def load_corpus(path: Path):
+    rows = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        parts = line.split("\t")
+        if len(parts) >= 3:
+            rows.append((parts[0], parts[1], parts[2]))
+        else:
+            rows.append(("", parts[0], ""))
+    return rows
+
+
+def timed(fn, rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = [fn(*row) for row in rows]
+        best = min(best, time.perf_counter() - start)
+    return out, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="category classifier benchmark")
+    parser.add_argument("corpus", nargs="?", type=Path)
+    parser.add_argument("--size", type=int, default=50000, help="synthetic corpus size")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.size)
+    print(f"{len(rows)} listings\n")
+
+    compiled, t_compiled = timed(map_ebay_category_to_posh, rows, args.repeat)
+    reference, t_reference = timed(reference_whole_word, rows, 1)
+    old, t_old = timed(old_substring, rows, args.repeat)
+
+    start = time.perf_counter()
+    batch = classify_many(rows)
+    t_batch = time.perf_counter() - start
+
+    print(f"{'classifier':<34}{'total s':>9}{'µs/listing':>12}")
+    for name, seconds in [
+        ("old substring scans", t_old),
+        ("reference (regex per keyword)", t_reference),
+        ("compiled single regex", t_compiled),
+        ("compiled, classify_many", t_batch),
+    ]:
+        print(f"{name:<34}{seconds:>9.3f}{seconds / len(rows) * 1e6:>12.1f}")
+
+    mismatches = [
+        (row, got, want)
+        for row, got, want in zip(rows, compiled, reference)
+        if got != want
+    ]
+    if batch != compiled:
+        mismatches.append((None, "classify_many", "map_ebay_category_to_posh"))
+
+    changed = [(row, was, now) for row, was, now in zip(rows, old, compiled) if was != now]
+    print(f"\nChanged vs old substring matching: {len(changed)} listings")
+    for (cat, title, dept), was, now in changed[:15]:
+        print(f"  {title!r} [{cat} / {dept or '-'}]: {was[1]} → {now[1]}")
+
+    if mismatches:
+        print(f"\nFAIL: {len(mismatches)} listings differ from the reference classifier")
+        for row, got, want in mismatches[:15]:
+            print(f"  {row}: got {got}, expected {want}")
+        sys.exit(1)
+    print("\nOK: compiled classifier matches the reference on every listing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Closet scan from the JSON feed vs scrolling the DOM, on each stand-in feed.
+
+    python benchmarks/bench_closet_feed.py
+    python benchmarks/bench_closet_feed.py --closet 2000 --latency-ms 80
+
+The stand-in closet loads more cards from an offset-paged JSON feed, a
+cursor-paged one (Poshmark's max_id shape) or HTML fragments. For each,
+runs a full scan in "dom" and "feed" mode (headless), checks both saw the
+same listings, and shows whether the feed mode had to fall back to the DOM
+(expected only for html).
+"""
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import argparse, io, os, shutil, sys, tempfile, time
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from standin_server import standin_env, start_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="closet feed vs DOM scan on the stand-in")
+    parser.add_argument("--closet", type=int, default=960, help="closet size (cards)")
+    parser.add_argument("--latency-ms", type=float, default=30,
+                        help="delay the stand-in adds to every GET")
+    args = parser.parse_args()
+
+    from playwright.sync_api import sync_playwright
+
+    os.environ.setdefault("CLOSET_STALL_TIMEOUT_MS", "1500")
+    work = Path(tempfile.mkdtemp(prefix="bench_closet_feed_"))
+    print(f"{'stand-in feed':<15}{'dom s':>8}{'feed s':>8}{'speed-up':>10}   feed mode read")
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            for feed in ("offset", "cursor", "html"):
+                server, state, base_url = start_server(listings=1, closet=args.closet,
+                                                       latency_ms=args.latency_ms,
+                                                       closet_feed=feed)
+                os.environ.update(standin_env(base_url))
+                import config, ebay_open
+                from closet_index import ClosetIndex
+
+                config.reload()
+                seconds, seen, fell_back = {}, {}, False
+                try:
+                    for mode in ("dom", "feed"):
+                        page = browser.new_page()
+                        index = ClosetIndex(work / f"{feed}_{mode}.sqlite3")
+                        log = io.StringIO()
+                        start = time.perf_counter()
+                        with redirect_stdout(log):
+                            ebay_open.scan_posh_closet(page, index, full_rescan=True, mode=mode)
+                        seconds[mode] = time.perf_counter() - start
+                        seen[mode] = index.known_ids()
+                        index.close()
+                        page.close()
+                        if mode == "feed":
+                            fell_back = "scrolling the closet page instead" in log.getvalue()
+                finally:
+                    server.shutdown()
+
+                if seen["dom"] != seen["feed"] or len(seen["feed"]) != args.closet:
+                    raise SystemExit(f"{feed}: dom saw {len(seen['dom'])}, "
+                                     f"feed saw {len(seen['feed'])} of {args.closet} listings")
+                print(f"{feed:<15}{seconds['dom']:>8.2f}{seconds['feed']:>8.2f}"
+                      f"{seconds['dom'] / seconds['feed']:>9.1f}x   "
+                      f"{'cards (fell back to DOM)' if fell_back else 'JSON feed'}")
+            browser.close()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Perceptual-hash index: lookup time at scale, and the per-photo hashing cost.
+
+    python benchmarks/bench_image_hash.py
+    python benchmarks/bench_image_hash.py --images 250000 --queries 2000
+
+Fills a HammingIndex with random 128-bit hashes plus near copies, then
+times lookups at the reuse and duplicate distances against a linear scan,
+checks both find the same images (and that a hash exactly that many bits
+away is found), and times image_fingerprint on generated photos.
+"""
+from pathlib import Path
+
+import argparse, random, sys, tempfile, time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from image_hash import HASH_BITS, HammingIndex, image_fingerprint
+
+
+def flip_bits(h: int, n: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(HASH_BITS), n):
+        h ^= 1 << bit
+    return h
+
+
+def main():
+    parser = argparse.ArgumentParser(description="perceptual-hash index benchmark")
+    parser.add_argument("--images", type=int, default=100_000, help="hashes in the index")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--reuse", type=int, default=4, help="IMAGE_REUSE_DISTANCE")
+    parser.add_argument("--duplicate", type=int, default=10, help="IMAGE_DUPLICATE_DISTANCE")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    hashes = [rng.getrandbits(HASH_BITS) for _ in range(args.images)]
+
+    start = time.perf_counter()
+    index = HammingIndex(max(args.reuse, args.duplicate))
+    for n, h in enumerate(hashes):
+        index.add(h, n)
+    print(f"Indexed {len(index)} hashes in {time.perf_counter() - start:.2f}s")
+
+    # Half the queries are near copies of indexed photos, half are unrelated
+    queries = [flip_bits(hashes[rng.randrange(len(hashes))], rng.randint(0, args.duplicate), rng)
+               if q % 2 else rng.getrandbits(HASH_BITS) for q in range(args.queries)]
+    linear_queries = queries[: max(1, args.queries // 20)]
+
+    print(f"\n{'distance':<10}{'index µs':>10}{'linear µs':>11}{'speed-up':>10}")
+    for distance in sorted({args.reuse, args.duplicate}):
+        start = time.perf_counter()
+        found = [index.search(q, distance) for q in queries]
+        per_index = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        expected = [sorted(n for n, h in enumerate(hashes) if (h ^ q).bit_count() <= distance)
+                    for q in linear_queries]
+        per_linear = (time.perf_counter() - start) / len(linear_queries)
+
+        for got, want in zip(found, expected):
+            if sorted(v for _, v in got) != want:
+                raise SystemExit(f"index missed a match at distance {distance}")
+        # Worst case for the pigeonhole: exactly `distance` bits off, one in each of
+        # `distance` ranges, so only the last range still matches
+        worst = hashes[0]
+        for shift, _ in index.ranges[:distance]:
+            worst ^= 1 << shift
+        if 0 not in (v for _, v in index.search(worst, distance)):
+            raise SystemExit(f"index missed a hash exactly {distance} bits away")
+        print(f"{distance:<10}{per_index * 1e6:>10.0f}{per_linear * 1e6:>11.0f}"
+              f"{per_linear / per_index:>9.0f}x")
+
+    from PIL import Image, ImageDraw
+
+    with tempfile.TemporaryDirectory(prefix="bench_hash_") as tmp:
+        paths = []
+        for n, (ext, size) in enumerate([("jpg", (1600, 1600)), ("webp", (1200, 1600))] * 4):
+            img = Image.new("RGB", size, "white")
+            draw = ImageDraw.Draw(img)
+            for _ in range(30):
+                x, y = rng.randrange(size[0]), rng.randrange(size[1])
+                draw.ellipse((x, y, x + 200, y + 150),
+                             fill=tuple(rng.randrange(256) for _ in range(3)))
+            path = Path(tmp) / f"photo_{n}.{ext}"
+            img.save(path, quality=90)
+            paths.append(path)
+
+        print()
+        for ext in ("jpg", "webp"):
+            subset = [p for p in paths if p.suffix == f".{ext}"]
+            start = time.perf_counter()
+            for path in subset:
+                image_fingerprint(path)
+            per = (time.perf_counter() - start) / len(subset)
+            print(f"image_fingerprint ({ext}): {per * 1e3:.1f} ms/photo")
+
+
+if __name__ == "__main__":
+    main()
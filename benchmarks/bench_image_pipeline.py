@@ -0,0 +1,104 @@
+"""
+Compare the old two-pass image path (convert_webp_to_jpg → make_square_top_crop)
+with the fused single-decode process_image, serially and on a process pool.
+
+    python benchmarks/bench_image_pipeline.py                 # synthetic samples
+    python benchmarks/bench_image_pipeline.py ~/sample_photos # your own WEBP/JPEG/PNG
+"""
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+from PIL import Image
+
+import argparse, io, os, shutil, sys, tempfile, time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from image_pipeline import convert_webp_to_jpg, make_square_top_crop, process_image
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def make_samples(folder: Path, count: int):
+    """Generate eBay-sized photos in a mix of formats and aspect ratios."""
+    sizes = [(1600, 1200), (1200, 1600), (1600, 1600), (1000, 1500)]
+    formats = [("webp", "WEBP"), ("jpg", "JPEG"), ("png", "PNG")]
+    for i in range(count):
+        w, h = sizes[i % len(sizes)]
+        ext, fmt = formats[i % len(formats)]
+        img = Image.effect_noise((w, h), 40 + i % 30).convert("RGB")
+        img.save(folder / f"sample_{i:03d}.{ext}", fmt, quality=90)
+
+
+def copy_samples(src: Path) -> Path:
+    dst = Path(tempfile.mkdtemp(prefix="bench_img_"))
+    for p in sorted(src.iterdir()):
+        if p.suffix.lower() in IMAGE_EXTS:
+            shutil.copy2(p, dst / p.name)
+    return dst
+
+
+def run_two_pass(folder: Path):
+    with redirect_stdout(io.StringIO()):
+        for p in sorted(folder.iterdir()):
+            make_square_top_crop(convert_webp_to_jpg(p))
+
+
+def run_fused_serial(folder: Path):
+    for p in sorted(folder.iterdir()):
+        process_image(p, p.with_suffix(".jpg"))
+
+
+def run_fused_pool(folder: Path, pool: ProcessPoolExecutor):
+    paths = sorted(folder.iterdir())
+    list(pool.map(process_image, paths, [p.with_suffix(".jpg") for p in paths]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("folder", nargs="?", type=Path, help="folder of sample images")
+    parser.add_argument("--count", type=int, default=24, help="synthetic images to generate")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if args.folder:
+        source = args.folder
+    else:
+        source = Path(tempfile.mkdtemp(prefix="bench_src_"))
+        make_samples(source, args.count)
+
+    n_images = sum(1 for p in source.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+    print(f"{n_images} images from {source}, best of {args.repeat}\n")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pool.submit(int).result()  # spawn workers before timing
+
+        variants = [
+            ("two-pass (current)", run_two_pass),
+            ("fused, serial", run_fused_serial),
+            (f"fused, {args.workers} processes", lambda f: run_fused_pool(f, pool)),
+        ]
+
+        results = []
+        for name, fn in variants:
+            best = float("inf")
+            for _ in range(args.repeat):
+                work = copy_samples(source)
+                start = time.perf_counter()
+                fn(work)
+                best = min(best, time.perf_counter() - start)
+                shutil.rmtree(work)
+            results.append((name, best))
+
+    baseline = results[0][1]
+    print(f"{'variant':<28}{'total s':>10}{'ms/image':>10}{'speedup':>9}")
+    for name, seconds in results:
+        print(
+            f"{name:<28}{seconds:>10.3f}{seconds / n_images * 1000:>10.1f}"
+            f"{baseline / seconds:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
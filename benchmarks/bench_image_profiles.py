@@ -0,0 +1,82 @@
+"""
+Upload size and encode time of each image output profile.
+
+    python benchmarks/bench_image_profiles.py                 # synthetic photos
+    python benchmarks/bench_image_profiles.py ~/sample_photos # your own WEBP/JPEG/PNG
+
+Every photo goes through process_image once per profile (serially, so the
+times are per photo). Bytes saved are relative to the "original" profile,
+which matches the old output: full resolution at quality 95.
+"""
+from pathlib import Path
+from PIL import Image, ImageDraw, ImageFilter
+
+import argparse, random, shutil, sys, tempfile, time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from image_pipeline import PROFILES, process_image
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def make_photos(folder: Path, count: int):
+    """Photo-like samples: smooth backgrounds, shapes and sensor noise, eBay and phone sizes."""
+    rng = random.Random(11)
+    sizes = [(1600, 1200), (1200, 1600), (1600, 1600), (3024, 4032)]
+    for i in range(count):
+        w, h = sizes[i % len(sizes)]
+        img = Image.effect_noise((w // 8, h // 8), 60).convert("RGB").resize((w, h))
+        draw = ImageDraw.Draw(img)
+        for _ in range(12):
+            x, y = rng.randrange(w), rng.randrange(h)
+            draw.rectangle((x, y, x + w // 4, y + h // 5),
+                           fill=tuple(rng.randrange(256) for _ in range(3)))
+        img = img.filter(ImageFilter.GaussianBlur(2))
+        grain = Image.effect_noise((w, h), 12).convert("RGB")
+        img = Image.blend(img, grain, 0.08)
+        fmt, ext = ("WEBP", "webp") if i % 3 == 0 else ("JPEG", "jpg")
+        img.save(folder / f"photo_{i:03d}.{ext}", fmt, quality=92)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("folder", nargs="?", type=Path, help="folder of sample images")
+    parser.add_argument("--count", type=int, default=12, help="synthetic photos to generate")
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="bench_profiles_"))
+    try:
+        if args.folder:
+            sources = [p for p in sorted(args.folder.iterdir()) if p.suffix.lower() in IMAGE_EXTS]
+        else:
+            make_photos(work, args.count)
+            sources = sorted(work.glob("photo_*"))
+        source_bytes = sum(p.stat().st_size for p in sources)
+        print(f"{len(sources)} photos, {source_bytes / 1e6:.1f} MB of sources\n")
+
+        results = {}
+        for name, profile in PROFILES.items():
+            out_dir = work / name
+            out_dir.mkdir()
+            start = time.perf_counter()
+            for path in sources:
+                process_image(path, out_dir / f"{path.stem}.jpg", keep_source=True,
+                              profile=profile)
+            seconds = time.perf_counter() - start
+            size = sum(p.stat().st_size for p in out_dir.iterdir())
+            results[name] = (size, seconds)
+
+        base = results["original"][0]
+        print(f"{'profile':<19}{'edge':>6}{'q':>4}{'MB':>8}{'saved':>8}{'ms/photo':>10}")
+        for name, (size, seconds) in results.items():
+            profile = PROFILES[name]
+            print(f"{name:<19}{profile.max_edge or '-':>6}{profile.quality:>4}"
+                  f"{size / 1e6:>8.2f}{(1 - size / base) * 100:>7.0f}%"
+                  f"{seconds / len(sources) * 1e3:>10.0f}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
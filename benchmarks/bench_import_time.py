@@ -0,0 +1,99 @@
+"""
+Start-up cost of each ebay_open.py subcommand, in fresh interpreters.
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 20
+
+`classify` and `process-images` run for real (one listing, one small
+photo). `scan-closet` and `crosslist` need a browser and accounts, so they
+are measured up to the point where they would launch Chromium: the CLI
+import, .env loading and the Playwright import. "eager imports" loads what
+every subcommand paid for when ebay_open imported everything up front.
+Each row also lists the slowest modules from `python -X importtime`.
+"""
+from pathlib import Path
+
+import argparse, os, statistics, subprocess, sys, tempfile, time
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# Stand-in values so the browser subcommands get past config.require_urls()
+DUMMY_ENV = {
+    "EBAY_SELLING_URL": "http://127.0.0.1:9/sh/lst/active",
+    "POSH_CLOSET_URL": "http://127.0.0.1:9/closet/me",
+    "POSH_CREATE_URL": "http://127.0.0.1:9/create-listing",
+}
+
+BROWSER_STARTUP = (
+    "import ebay_open, config; config.require_urls(); "
+    "from playwright.sync_api import sync_playwright"
+)
+
+
+def commands(photo: Path) -> dict:
+    py = sys.executable
+    return {
+        "interpreter": [py, "-c", "pass"],
+        "classify": [py, "ebay_open.py", "classify", "Women's Jeans", "--title", "Levi's 501"],
+        "process-images": [py, "ebay_open.py", "process-images", str(photo),
+                           "--out", str(photo.parent / "out")],
+        "scan-closet": [py, "-c", BROWSER_STARTUP],
+        "crosslist": [py, "-c", BROWSER_STARTUP + "; import async_engine"],
+        "eager imports": [py, "-c", "import playwright.sync_api, playwright.async_api, "
+                                    "requests, PIL.Image, dotenv, ebay_open"],
+    }
+
+
+def wall_times(cmd: list[str], runs: int, env: dict) -> list[float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=REPO_DIR, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def slowest_imports(cmd: list[str], env: dict, top: int = 3) -> list[tuple[str, float]]:
+    """Top-level packages by cumulative import time (ms), from -X importtime."""
+    proc = subprocess.run([cmd[0], "-X", "importtime", *cmd[1:]], cwd=REPO_DIR, env=env,
+                          capture_output=True, text=True, check=True)
+    packages = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue  # nested import, already counted by its parent
+        name = name.strip().split(".")[0]
+        packages[name] = packages.get(name, 0) + int(cumulative) / 1000
+    packages.pop("site", None)
+    return sorted(packages.items(), key=lambda kv: -kv[1])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ebay_open.py start-up time per subcommand")
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per row")
+    args = parser.parse_args()
+
+    from PIL import Image
+
+    env = {**os.environ, **DUMMY_ENV, "IMAGE_WORKERS": "1"}
+    with tempfile.TemporaryDirectory(prefix="bench_import_") as tmp:
+        photo = Path(tmp) / "photo.webp"
+        Image.new("RGB", (400, 600), "gray").save(photo)
+
+        print(f"{'command':<16}{'median ms':>11}{'min ms':>9}   slowest imports (cumulative ms)")
+        for name, cmd in commands(photo).items():
+            try:
+                times = wall_times(cmd, args.runs, env)
+            except subprocess.CalledProcessError:
+                print(f"{name:<16}{'failed':>11}")
+                continue
+            top = ", ".join(f"{pkg} {ms:.0f}" for pkg, ms in slowest_imports(cmd, env))
+            print(f"{name:<16}{statistics.median(times) * 1e3:>11.0f}"
+                  f"{min(times) * 1e3:>9.0f}   {top}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Active Listings enumeration on the stand-in: pages in flight vs wall time.
+
+    python benchmarks/bench_inventory.py
+    python benchmarks/bench_inventory.py --listings 2000 --page-size 50 --workers 1 4 8
+
+Reads the first page like the `plan` command does, then fetches the rest
+over HTTP with 1, 4, ... pages in flight, and checks every run found each
+listing exactly once with its price. No browser needed.
+"""
+from pathlib import Path
+
+import argparse, sys, time
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from standin_server import standin_env, start_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="inventory paging benchmark on the stand-in")
+    parser.add_argument("--listings", type=int, default=600)
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--latency-ms", type=float, default=80,
+                        help="delay the stand-in adds to every GET")
+    args = parser.parse_args()
+
+    from http_pool import make_http_session
+    from inventory import fetch_pages_http, page_param, parse_active_page
+
+    server, state, base_url = start_server(listings=args.listings, page_size=args.page_size,
+                                           latency_ms=args.latency_ms)
+    selling_url = standin_env(base_url)["EBAY_SELLING_URL"]
+    print(f"{'in flight':<11}{'pages':>7}{'listings':>10}{'wall s':>9}{'pages/s':>9}")
+    try:
+        for workers in args.workers:
+            session = make_http_session(workers)
+            start = time.perf_counter()
+            resp = session.get(selling_url, timeout=30)
+            first, next_url = parse_active_page(resp.text, resp.url)
+            pages = {1: first}
+            if next_url:
+                pages.update(fetch_pages_http(session, next_url,
+                                              page_param(resp.url, next_url), workers))
+            seconds = time.perf_counter() - start
+
+            items = [item for n in sorted(pages) for item in pages[n]]
+            if len({i.item_id for i in items}) != args.listings or len(items) != args.listings:
+                raise SystemExit(f"{workers} in flight: {len(items)} rows, "
+                                 f"{len({i.item_id for i in items})} distinct of {args.listings}")
+            if any(i.price is None for i in items):
+                raise SystemExit(f"{workers} in flight: listings without a price")
+            print(f"{workers:<11}{len(pages):>7}{len(items):>10}{seconds:>9.2f}"
+                  f"{len(pages) / seconds:>9.1f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
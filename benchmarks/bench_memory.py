@@ -0,0 +1,114 @@
+"""
+Memory over a long batch against the stand-in: does it stay flat?
+
+    python benchmarks/bench_memory.py                       # 1,000 listings
+    python benchmarks/bench_memory.py --listings 300 --every 50 --recycle 25
+
+Runs run_batch (headless) over --listings stand-in listings, none of them
+already in the closet, so every one goes through photos and the form. A
+memory snapshot is taken every --every listings: Python and total RSS
+(driver and Chromium included), the form tab's JS heap and DOM nodes, and
+tracemalloc's traced Python memory with its top-growing lines. Prints the
+snapshots as a table and fails if RSS grows by more than --max-growth-mb
+per 100 listings between the first and the last snapshot.
+"""
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import argparse, io, json, os, shutil, sys, tempfile, time
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from standin_server import standin_env, start_server
+
+MB = 1024 * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="memory over a long stand-in batch")
+    parser.add_argument("--listings", type=int, default=1000)
+    parser.add_argument("--every", type=int, default=100, help="snapshot interval (listings)")
+    parser.add_argument("--recycle", type=int, default=None,
+                        help="PAGE_RECYCLE_LISTINGS for the run (default: the configured one)")
+    parser.add_argument("--ceiling-mb", type=int, default=0,
+                        help="MEMORY_CEILING_MB for the run (0: none)")
+    parser.add_argument("--max-growth-mb", type=float, default=10.0,
+                        help="allowed RSS growth per 100 listings")
+    args = parser.parse_args()
+
+    from playwright.sync_api import sync_playwright
+
+    server, state, base_url = start_server(listings=args.listings, closet=50, overlap=0.0,
+                                           page_size=50, image_px=400)
+    os.environ.update(standin_env(base_url))
+    work = Path(tempfile.mkdtemp(prefix="bench_memory_"))
+    try:
+        import config, ebay_open
+        from closet_index import ClosetIndex
+        from job_ledger import JobLedger
+        from listing_cache import ListingCache
+        from memory_guard import MemoryGuard
+
+        config.reload()
+        config.DOWNLOAD_DIR = work / "downloads"
+        config.DOWNLOAD_DIR.mkdir()
+        if args.recycle:
+            config.PAGE_RECYCLE_LISTINGS = args.recycle
+        guard = MemoryGuard(ceiling_mb=args.ceiling_mb, snapshot_every=args.every, trace=True,
+                            out_dir=work)
+
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            context = browser.new_context()
+            page, posh_page = context.new_page(), context.new_page()
+            page.goto(config.EBAY_SELLING_URL, wait_until="domcontentloaded")
+            index = ClosetIndex(work / "closet.sqlite3")
+            cache = ListingCache(work / "cache", 1 << 30)
+            ledger = JobLedger(work / "ledger.sqlite3")
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                outcome = ebay_open.run_batch(page, posh_page, index, cache, ledger, guard=guard)
+            elapsed = time.perf_counter() - start
+            ledger.close()
+            cache.close()
+            index.close()
+            browser.close()
+    finally:
+        server.shutdown()
+
+    try:
+        snaps = [json.loads(line) for line in guard.out_path.read_text().splitlines()]
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(f"{sum(outcome.values())} listings in {elapsed / 60:.1f} min "
+          f"({outcome['failed']} failed), tabs recycled {guard.recycles}x\n")
+    print(f"{'listings':>9}{'python MB':>11}{'total MB':>10}{'traced MB':>11}"
+          f"{'JS heap MB':>12}{'DOM nodes':>11}")
+    for snap in snaps:
+        chromium = snap.get("chromium", {})
+        print(f"{snap['listings']:>9}{snap['python_rss_mb']:>11.0f}{snap['total_rss_mb']:>10.0f}"
+              f"{snap.get('traced_mb', 0):>11.1f}"
+              f"{chromium.get('JSHeapUsedSize', 0) / MB:>12.1f}{chromium.get('Nodes', 0):>11.0f}")
+    if snaps and snaps[-1].get("top_growth"):
+        print("\nTop Python growth since the start:")
+        for line in snaps[-1]["top_growth"]:
+            print(f"  {line}")
+
+    if len(snaps) < 2:
+        raise SystemExit("fewer than two snapshots; raise --listings or lower --every")
+    first, last = snaps[0], snaps[-1]
+    per = 100 / (last["listings"] - first["listings"])
+    for key in ("python_rss_mb", "total_rss_mb"):
+        growth = (last[key] - first[key]) * per
+        print(f"\n{key}: {growth:+.1f} MB per 100 listings", end="")
+        if growth > args.max_growth_mb:
+            raise SystemExit(f"\n{key} grew {growth:.1f} MB per 100 listings "
+                             f"(limit {args.max_growth_mb})")
+    print()
+
+
+if __name__ == "__main__":
+    main()
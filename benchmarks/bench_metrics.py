@@ -0,0 +1,75 @@
+"""
+Cost of the metrics calls left in the pipeline, with tracing off and on.
+
+    python benchmarks/bench_metrics.py
+    python benchmarks/bench_metrics.py --calls 1000000
+"""
+from pathlib import Path
+
+import argparse, sys, tempfile, time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import metrics
+
+
+@metrics.traced("bench.decorated")
+def decorated():
+    pass
+
+
+def plain():
+    pass
+
+
+def per_call_ns(fn, calls: int) -> float:
+    start = time.perf_counter()
+    fn(calls)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def loop_plain(n):
+    for _ in range(n):
+        plain()
+
+
+def loop_decorated(n):
+    for _ in range(n):
+        decorated()
+
+
+def loop_span(n):
+    for _ in range(n):
+        with metrics.span("bench.span"):
+            pass
+
+
+def loop_incr(n):
+    for _ in range(n):
+        metrics.incr("bench.counter")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="metrics overhead benchmark")
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    cases = [
+        ("plain function call", loop_plain),
+        ("@traced function call", loop_decorated),
+        ("with span()", loop_span),
+        ("incr()", loop_incr),
+    ]
+
+    off = {name: per_call_ns(fn, args.calls) for name, fn in cases}
+    metrics.enable(Path(tempfile.mkdtemp(prefix="bench_metrics_")))
+    on = {name: per_call_ns(fn, args.calls) for name, fn in cases}
+    metrics._tracer = None  # discard the recorded spans instead of printing them
+
+    print(f"{'call':<24}{'off ns':>10}{'on ns':>10}")
+    for name, _ in cases:
+        print(f"{name:<24}{off[name]:>10.0f}{on[name]:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Photo downloads from a flaky stand-in, with and without the network policy.
+
+    python benchmarks/bench_net_policy.py
+    python benchmarks/bench_net_policy.py --rate-limit 4 --error-rate 0.1 --threads 24
+
+The stand-in answers 429 past --rate-limit requests in flight, 503 for a
+fraction of requests and drops some connections ("flaky"); the "outage"
+runs also answer only 503 for their first --outage seconds. Every carousel
+photo of the inventory is fetched on --threads threads through
+net_policy.NetPolicy:
+
+    none        one attempt per photo, no host limit (the old behaviour)
+    retry       retries with backoff, no host limit or breaker
+    policy      retries, AIMD host limit and circuit breaker
+
+and each run prints how many photos arrived, how long it took, and how
+often the stand-in had to throttle the client.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import argparse, io, sys, time
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from standin_server import start_server
+
+UNLIMITED = 10 ** 6
+
+
+def run(policy, urls: list[str], threads: int):
+    """Fetch every URL through `policy`; returns (photos fetched, seconds)."""
+    from http_pool import make_http_session
+
+    session = make_http_session(threads)
+
+    def fetch(url):
+        def attempt():
+            resp = session.get(url, timeout=10)
+            resp.raise_for_status()
+            return resp
+        try:
+            return len(policy.call(url, attempt).content) > 0
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        fetched = sum(pool.map(fetch, urls))
+    return fetched, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="network policy on a flaky stand-in")
+    parser.add_argument("--listings", type=int, default=40)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--rate-limit", type=int, default=6,
+                        help="stand-in answers 429 past this many requests in flight")
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--reset-rate", type=float, default=0.02)
+    parser.add_argument("--outage", type=float, default=1.5,
+                        help="seconds of 503-only answers at the start of each run")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    from net_policy import NetPolicy
+
+    server, state, base_url = start_server(
+        listings=args.listings, image_px=240, latency_ms=args.latency_ms,
+        rate_limit=args.rate_limit, error_rate=args.error_rate, reset_rate=args.reset_rate,
+    )
+    urls = [f"{base_url}/img/{l['id']}-{n}.webp"
+            for l in state.listings for n in range(l["images"])]
+    policies = {
+        "none": lambda: NetPolicy(retries=0, host_concurrency=UNLIMITED,
+                                  breaker_failures=UNLIMITED),
+        "retry": lambda: NetPolicy(retries=4, backoff=0.2, host_concurrency=UNLIMITED,
+                                   breaker_failures=UNLIMITED),
+        "policy": lambda: NetPolicy(retries=4, backoff=0.2, host_concurrency=args.threads,
+                                    breaker_failures=5, breaker_cooldown=1.0),
+    }
+
+    print(f"{len(urls)} photos, {args.threads} threads\n")
+    print(f"{'run':<16}{'fetched':>9}{'wall s':>8}{'429s':>7}{'503s':>7}{'resets':>8}"
+          f"{'retries':>9}{'pauses':>8}{'limit':>7}")
+    try:
+        for scenario, name in [(s, n) for s in ("flaky", "outage") for n in policies]:
+            policy = policies[name]()
+            state.faults = dict.fromkeys(state.faults, 0)
+            if scenario == "outage":
+                state.outage(args.outage)
+            with redirect_stdout(io.StringIO()):  # the policy's pause notices
+                fetched, seconds = run(policy, urls, args.threads)
+            hosts = list(policy.hosts.values())
+            limit = min(int(h.limit) for h in hosts) if name == "policy" else "-"
+            print(f"{scenario + ' / ' + name:<16}{fetched:>5}/{len(urls):<3}{seconds:>8.2f}"
+                  f"{state.faults['throttled']:>7}{state.faults['error']:>7}"
+                  f"{state.faults['reset']:>8}{sum(h.retries for h in hosts):>9}"
+                  f"{sum(h.opened for h in hosts):>8}{limit:>7}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Page-ready time with the request-routing policy on and off.
+
+Each run opens the page in a fresh browser context (so neither mode gets a
+warm HTTP cache), waits for the element the script actually reads, then for
+the load event, and records requests made, bytes received and JS heap size.
+
+    python benchmarks/bench_route_policy.py https://www.ebay.com/itm/1234567890
+    python benchmarks/bench_route_policy.py https://poshmark.com/closet/someone --runs 5 --headed
+
+The policy is configured the same way as in ebay_open.py (ROUTE_BLOCK_TYPES,
+ROUTE_BLOCK_DOMAINS, ROUTE_ALLOW_DOMAINS).
+"""
+from pathlib import Path
+from statistics import median
+
+import argparse, sys, time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+
+from route_policy import RoutePolicy
+
+# What ebay_open.py waits for / reads on each kind of page
+READY_SELECTOR = (
+    "h1.x-item-title__mainTitle span.ux-textspans--BOLD, "
+    "a.tile__title, "
+    "a[href*='/itm/']"
+)
+
+
+def load_once(browser, url: str, selector: str, policy: RoutePolicy | None) -> dict:
+    context = browser.new_context()
+    if policy is not None:
+        policy.install(context)
+    page = context.new_page()
+
+    finished = []
+    page.on("requestfinished", finished.append)
+
+    start = time.perf_counter()
+    page.goto(url, wait_until="domcontentloaded")
+    dom_ready = time.perf_counter() - start
+    try:
+        page.wait_for_selector(selector, timeout=30000)
+        ready = time.perf_counter() - start
+    except PlaywrightTimeoutError:
+        ready = float("nan")
+    try:
+        page.wait_for_load_state("load", timeout=60000)
+        loaded = time.perf_counter() - start
+    except PlaywrightTimeoutError:
+        loaded = float("nan")
+
+    received = 0
+    for request in finished:
+        try:
+            received += request.sizes()["responseBodySize"]
+        except Exception:
+            pass
+    heap = page.evaluate("() => (performance.memory || {}).usedJSHeapSize || 0")
+    context.close()
+
+    return {
+        "dom": dom_ready,
+        "ready": ready,
+        "load": loaded,
+        "requests": len(finished),
+        "mb": received / 1e6,
+        "heap_mb": heap / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="route policy page-load benchmark")
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--selector", default=READY_SELECTOR,
+                        help="element that marks the page as usable")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    columns = ["dom", "ready", "load", "requests", "mb", "heap_mb"]
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=not args.headed)
+        for url in args.urls:
+            print(f"\n{url}")
+            print(f"{'policy':<8}" + "".join(f"{c:>10}" for c in columns))
+            for mode in ("off", "on"):
+                policy = RoutePolicy.from_config() if mode == "on" else None
+                runs = []
+                # Every run is cold; report the median of each column
+                for _ in range(args.runs):
+                    runs.append(load_once(browser, url, args.selector, policy))
+                row = {c: median(r[c] for r in runs) for c in columns}
+                print(f"{mode:<8}" + "".join(
+                    f"{row[c]:>10.0f}" if c == "requests" else f"{row[c]:>10.2f}"
+                    for c in columns
+                ))
+                if policy is not None:
+                    policy.print_stats()
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Sharded runs against the local stand-in: throughput by worker count.
+
+    python benchmarks/bench_shards.py
+    python benchmarks/bench_shards.py --listings 60 --workers 1 2 4 --engine async
+
+For each worker count, resets the stand-in closet, runs shard_runner.py
+with headless workers and fresh profiles, caches, closet index and job
+ledger, and checks that every listing was handled exactly once: the
+workers' listings add up to the inventory and the stand-in received one
+new closet card per listing that wasn't already there.
+"""
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import argparse, io, json, os, shutil, sys, tempfile
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from standin_server import standin_env, start_server
+
+
+def run_sharded(work: Path, workers: int, args) -> Path:
+    """Run shard_runner with everything under `work`; returns its report file."""
+    import config, shard_runner
+
+    os.environ.update({
+        "HEADLESS": "1",
+        "PROFILE_DIR": str(work / "no-profile"),  # nothing to copy: fresh worker profiles
+        "SHARD_DIR": str(work / "shards"),
+        "CACHE_DIR": str(work / "cache"),
+        "CLOSET_INDEX_PATH": str(work / "closet.sqlite3"),
+        "LEDGER_PATH": str(work / "ledger.sqlite3"),
+        "CLOSET_STALL_TIMEOUT_MS": "1500",
+    })
+    config.reload()
+    argv = ["--workers", str(workers), "--concurrency", str(args.concurrency)]
+    if args.engine:
+        argv += ["--engine", args.engine]
+    with redirect_stdout(io.StringIO()):
+        shard_runner.main(argv)
+    return max(config.SHARD_DIR.glob("report-*.json"), key=lambda p: p.stat().st_mtime)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sharded-run benchmark on the stand-in")
+    parser.add_argument("--listings", type=int, default=24)
+    parser.add_argument("--closet", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--engine", choices=("sync", "async"), default=None)
+    parser.add_argument("--latency-ms", type=float, default=50,
+                        help="delay the stand-in adds to every GET")
+    args = parser.parse_args()
+
+    server, state, base_url = start_server(listings=args.listings, closet=args.closet,
+                                           overlap=0.5, page_size=10, image_px=600,
+                                           latency_ms=args.latency_ms)
+    os.environ.update(standin_env(base_url))
+    expected_new = args.listings - int(args.listings * 0.5)
+
+    print(f"{'workers':<9}{'listings':>9}{'created':>9}{'exists':>8}{'failed':>8}"
+          f"{'wall s':>9}{'per min':>9}")
+    try:
+        for workers in args.workers:
+            state.reset_closet(args.closet, overlap=0.5)
+            work = Path(tempfile.mkdtemp(prefix=f"bench_shards_{workers}_"))
+            try:
+                report = json.loads(run_sharded(work, workers, args).read_text())
+            finally:
+                shutil.rmtree(work, ignore_errors=True)
+            st = report["statuses"]
+            print(f"{workers:<9}{report['listings']:>9}{st.get('created', 0):>9}"
+                  f"{st.get('exists', 0):>8}{st.get('failed', 0):>8}"
+                  f"{report['wall_seconds']:>9.1f}{report['listings_per_min']:>9.1f}")
+            if report["listings"] != args.listings:
+                raise SystemExit(f"{workers} workers handled {report['listings']} "
+                                 f"of {args.listings} listings")
+            if state.created != expected_new:
+                raise SystemExit(f"{workers} workers created {state.created} closet cards, "
+                                 f"expected {expected_new}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
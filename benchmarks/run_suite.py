@@ -0,0 +1,330 @@
+"""
+Offline benchmark suite, run against the local stand-in server.
+
+    python benchmarks/run_suite.py                 # everything
+    python benchmarks/run_suite.py --quick         # smaller sizes
+    python benchmarks/run_suite.py --only micro    # benchmarks whose name starts with "micro"
+    python benchmarks/run_suite.py --no-browser    # skip the Playwright benchmarks
+
+Benchmarks:
+
+    micro.category            map_ebay_category_to_posh, µs per listing
+    micro.convert_webp_to_jpg legacy conversion pass, ms per photo
+    micro.make_square_top_crop legacy crop pass, ms per photo
+    micro.process_image       fused single-decode path, ms per photo
+    http.extract              HTTP backend against the stand-in, listings/min
+    browser.closet_scan.<n>   full closet scroll of n cards (DOM), seconds
+    browser.closet_feed.<n>   the same closet read from its JSON feed, seconds
+    browser.e2e               run_batch (extract → match → images → form), listings/min
+    browser.e2e_async         async_engine.run_pipeline on the same work, listings/min
+
+Each run is appended to benchmarks/results/history.jsonl with the git
+commit, and compared with the previous run on the same machine.
+"""
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import argparse, io, json, os, platform, shutil, subprocess, sys, tempfile, time
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(REPO_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+from standin_server import standin_env, start_server
+
+RESULTS_PATH = BENCH_DIR / "results" / "history.jsonl"
+
+# unit → True when a larger number is better
+HIGHER_IS_BETTER = {"listings/min": True, "µs/listing": False, "ms/photo": False, "s": False}
+
+
+def _time_per_item(fn, items, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / max(len(items), 1)
+
+
+def bench_category(quick: bool) -> dict:
+    from bench_category import synthetic_corpus
+    from category_rules import map_ebay_category_to_posh
+
+    rows = synthetic_corpus(5000 if quick else 50000)
+    per = _time_per_item(lambda row: map_ebay_category_to_posh(*row), rows)
+    return {"micro.category": (per * 1e6, "µs/listing")}
+
+
+def bench_images(quick: bool) -> dict:
+    from bench_image_pipeline import make_samples
+    from image_pipeline import convert_webp_to_jpg, make_square_top_crop, process_image
+
+    count = 6 if quick else 24
+    src = Path(tempfile.mkdtemp(prefix="suite_img_"))
+    try:
+        make_samples(src, count)
+        webps = sorted(src.glob("*.webp"))
+        results = {}
+
+        def fresh_copy():
+            dst = Path(tempfile.mkdtemp(prefix="suite_run_", dir=src))
+            for p in sorted(src.glob("sample_*")):
+                shutil.copy2(p, dst / p.name)
+            return dst
+
+        # The legacy helpers print per file; keep the report readable
+        with redirect_stdout(io.StringIO()):
+            work = fresh_copy()
+            start = time.perf_counter()
+            for p in sorted(work.glob("*.webp")):
+                convert_webp_to_jpg(p)
+            results["micro.convert_webp_to_jpg"] = (
+                (time.perf_counter() - start) / max(len(webps), 1) * 1e3, "ms/photo")
+
+            work = fresh_copy()
+            jpgs = sorted(work.glob("*.jpg"))
+            start = time.perf_counter()
+            for p in jpgs:
+                make_square_top_crop(p)
+            results["micro.make_square_top_crop"] = (
+                (time.perf_counter() - start) / max(len(jpgs), 1) * 1e3, "ms/photo")
+
+        work = fresh_copy()
+        photos = sorted(work.glob("sample_*"))
+        start = time.perf_counter()
+        for p in photos:
+            process_image(p, p.with_name(p.stem + "_out.jpg"))
+        results["micro.process_image"] = (
+            (time.perf_counter() - start) / max(len(photos), 1) * 1e3, "ms/photo")
+        return results
+    finally:
+        shutil.rmtree(src, ignore_errors=True)
+
+
+def bench_http_extract(quick: bool) -> dict:
+    from ebay_http import fetch_listings
+
+    count = 40 if quick else 200
+    server, state, base_url = start_server(listings=count, closet=0)
+    try:
+        urls = [f"{base_url}/itm/{l['id']}" for l in state.listings]
+        start = time.perf_counter()
+        listings = fetch_listings(urls, workers=8)
+        elapsed = time.perf_counter() - start
+        failed = [l for l in listings if isinstance(l, Exception)]
+        if failed:
+            raise RuntimeError(f"{len(failed)} stand-in listings failed: {failed[0]}")
+        return {"http.extract": (len(urls) / elapsed * 60, "listings/min")}
+    finally:
+        server.shutdown()
+
+
+def point_at_standin(base_url: str):
+    """Aim ebay_open (and async_engine) at a stand-in, even if config was already read."""
+    import config
+
+    os.environ.update(standin_env(base_url))
+    os.environ.setdefault("CLOSET_STALL_TIMEOUT_MS", "1500")
+    config.reload()
+
+
+def bench_browser(quick: bool) -> dict:
+    from playwright.sync_api import sync_playwright
+
+    listings = 6 if quick else 20
+    closet_sizes = [48, 240] if quick else [48, 240, 960]
+    server, state, base_url = start_server(listings=listings, closet=0, overlap=0.5,
+                                           page_size=10, image_px=600)
+    point_at_standin(base_url)
+    work = Path(tempfile.mkdtemp(prefix="suite_browser_"))
+    results = {}
+
+    try:
+        import config, ebay_open
+        from closet_index import ClosetIndex
+        from job_ledger import JobLedger
+        from listing_cache import ListingCache
+
+        config.DOWNLOAD_DIR = work / "downloads"
+        config.DOWNLOAD_DIR.mkdir()
+
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            context = browser.new_context()
+            page, posh_page = context.new_page(), context.new_page()
+
+            for size in closet_sizes:
+                state.reset_closet(size)
+                for mode, name in (("dom", "closet_scan"), ("feed", "closet_feed")):
+                    index = ClosetIndex(work / f"closet_{mode}_{size}.sqlite3")
+                    log = io.StringIO()
+                    start = time.perf_counter()
+                    with redirect_stdout(log):
+                        titles = ebay_open.scan_posh_closet(posh_page, index, full_rescan=True,
+                                                            mode=mode)
+                    results[f"browser.{name}.{size}"] = (time.perf_counter() - start, "s")
+                    index.close()
+                    if len(titles) != size:
+                        raise RuntimeError(f"closet {mode} scan saw {len(titles)} of {size} cards")
+                    if mode == "feed" and "scrolling the closet page instead" in log.getvalue():
+                        raise RuntimeError("closet feed fell back to the DOM on the stand-in")
+
+            state.reset_closet(200, overlap=0.5)
+            index = ClosetIndex(work / "closet_e2e.sqlite3")
+            cache = ListingCache(work / "cache", 1 << 30)
+            ledger = JobLedger(work / "ledger.sqlite3")
+            page.goto(config.EBAY_SELLING_URL, wait_until="domcontentloaded")
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                outcome = ebay_open.run_batch(page, posh_page, index, cache, ledger)
+            elapsed = time.perf_counter() - start
+            if outcome["failed"]:
+                raise RuntimeError(f"{outcome['failed']} of {listings} stand-in listings failed")
+            results["browser.e2e"] = (sum(outcome.values()) / elapsed * 60, "listings/min")
+            ledger.close()
+            cache.close()
+            index.close()
+            browser.close()
+    finally:
+        server.shutdown()
+        shutil.rmtree(work, ignore_errors=True)
+    return results
+
+
+def bench_browser_async(quick: bool) -> dict:
+    import asyncio
+    from playwright.async_api import async_playwright
+
+    listings = 6 if quick else 20
+    server, state, base_url = start_server(listings=listings, closet=200, overlap=0.5,
+                                           page_size=10, image_px=600)
+    point_at_standin(base_url)
+    work = Path(tempfile.mkdtemp(prefix="suite_async_"))
+
+    async def run():
+        import async_engine, config
+        from closet_index import ClosetIndex
+        from job_ledger import JobLedger
+        from listing_cache import ListingCache
+
+        config.DOWNLOAD_DIR = work / "downloads"
+        config.DOWNLOAD_DIR.mkdir()
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            context = await browser.new_context()
+            page = await context.new_page()
+            await page.goto(config.EBAY_SELLING_URL, wait_until="domcontentloaded")
+            index = ClosetIndex(work / "closet.sqlite3")
+            cache = ListingCache(work / "cache", 1 << 30)
+            ledger = JobLedger(work / "ledger.sqlite3")
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                outcome = await async_engine.run_pipeline(context, page, index, cache, ledger)
+            elapsed = time.perf_counter() - start
+            ledger.close()
+            cache.close()
+            index.close()
+            await browser.close()
+            return outcome, elapsed
+
+    try:
+        outcome, elapsed = asyncio.run(run())
+    finally:
+        server.shutdown()
+        shutil.rmtree(work, ignore_errors=True)
+    if outcome["failed"]:
+        raise RuntimeError(f"{outcome['failed']} of {listings} stand-in listings failed")
+    return {"browser.e2e_async": (sum(outcome.values()) / elapsed * 60, "listings/min")}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def previous_run(path: Path, machine: str) -> dict | None:
+    if not path.exists():
+        return None
+    last = None
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            run = json.loads(line)
+        except ValueError:
+            continue
+        if run.get("machine") == machine:
+            last = run
+    return last
+
+
+def main():
+    parser = argparse.ArgumentParser(description="offline benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs, fewer repeats")
+    parser.add_argument("--only", help="run only benchmarks whose name starts with this")
+    parser.add_argument("--no-browser", action="store_true", help="skip Playwright benchmarks")
+    parser.add_argument("--results", type=Path, default=RESULTS_PATH)
+    parser.add_argument("--no-save", action="store_true", help="don't append to the history")
+    args = parser.parse_args()
+
+    groups = [
+        ("micro.category", bench_category),
+        ("micro.images", bench_images),
+        ("http.extract", bench_http_extract),
+        ("browser", bench_browser),
+        ("browser.e2e_async", bench_browser_async),
+    ]
+
+    results, skipped = {}, {}
+    for prefix, bench in groups:
+        if args.only and not (prefix.startswith(args.only) or args.only.startswith(prefix)):
+            continue
+        if prefix.startswith("browser") and args.no_browser:
+            continue
+        print(f"running {prefix}...", flush=True)
+        try:
+            results.update(bench(args.quick))
+        except Exception as e:
+            skipped[prefix] = f"{type(e).__name__}: {e}".splitlines()[0][:160]
+
+    machine = f"{platform.node()} {platform.machine()} py{platform.python_version()}"
+    before = previous_run(args.results, machine)
+    before_results = (before or {}).get("results", {})
+
+    print(f"\n{'benchmark':<30}{'value':>12}  {'unit':<13}{'previous':>10}{'change':>9}")
+    for name, (value, unit) in results.items():
+        prev = before_results.get(name, [None])[0]
+        change = ""
+        if prev:
+            pct = (value - prev) / prev * 100
+            better = (pct > 0) == HIGHER_IS_BETTER.get(unit, False)
+            change = f"{pct:+.0f}%" + ("" if abs(pct) < 5 else (" ✓" if better else " ✗"))
+        print(f"{name:<30}{value:>12.2f}  {unit:<13}"
+              f"{(f'{prev:.2f}' if prev else '-'):>10}{change:>9}")
+    for name, reason in skipped.items():
+        print(f"{name:<30}{'skipped':>12}  {reason}")
+    if before:
+        print(f"\n(previous: {before.get('commit')} at {before.get('timestamp')})")
+
+    if results and not args.no_save:
+        args.results.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.results, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "commit": git_commit(),
+                "machine": machine,
+                "quick": args.quick,
+                "results": {name: [round(v, 4), unit] for name, (v, unit) in results.items()},
+                "skipped": skipped,
+            }, ensure_ascii=False) + "\n")
+        print(f"Saved to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
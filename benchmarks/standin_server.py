@@ -0,0 +1,550 @@
+"""
+Local stand-in for the eBay and Poshmark pages ebay_open.py drives, so the
+pipeline can be benchmarked without live accounts.
+
+Every page carries the selectors the script depends on:
+
+    /sh/lst/active?page=N   Active Listings: a[href*='/itm/'] links, a.pagination__next
+    /itm/<id>               item page: title/price/labels, breadcrumbs, carousel, iframe#desc
+    /itmdesc/<id>           description iframe (.x-item-description-child)
+    /img/<id>-<n>.webp      generated carousel photo
+    /closet/<name>          closet with infinite scroll of a.tile__title cards
+    /api/closet?offset=&limit=   JSON page of closet cards, offset-paged
+    /vm-rest/users/<name>/posts/filtered?request={"count":..,"max_id":..}
+                            JSON page of closet cards, cursor-paged
+    /closet-page?offset=&limit=  HTML fragment of closet cards (no JSON feed)
+    /create-listing         Create Listing form (#img-file-input, size/condition/
+                            category dropdowns, price modal, Next → List)
+
+Listing an item from the form adds it to the top of the closet. The closet
+page's scroll loads one of the three feeds, picked with --closet-feed
+(offset, cursor or html).
+
+To exercise retries and throttling, GETs can fail on purpose: --rate-limit
+answers 429 (Retry-After: 1) past that many requests in flight,
+--error-rate answers that fraction with 503, and --reset-rate closes that
+fraction of connections without a response. StandInState.outage(seconds)
+answers every GET with 503 for a while.
+
+    python benchmarks/standin_server.py --port 8700 --listings 100 --closet 500
+    EBAY_SELLING_URL=http://127.0.0.1:8700/sh/lst/active \\
+    POSH_CLOSET_URL=http://127.0.0.1:8700/closet/standin \\
+    POSH_CREATE_URL=http://127.0.0.1:8700/create-listing python ebay_open.py --batch
+"""
+from functools import lru_cache
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+from PIL import Image
+
+import argparse, hashlib, io, json, random, sys, threading, time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from category_rules import CATEGORY_RULES, FALLBACK_SUBCATEGORY
+
+BRANDS = ["Levi's", "Nike", "Patagonia", "J.Crew", "Lululemon", "Ralph Lauren",
+          "Carhartt", "Madewell", "Adidas", "Free People", "Banana Republic", "Vans"]
+COLORS = ["Black", "Navy", "Olive", "Heather Gray", "Red", "Cream", "Denim Blue", "Pink"]
+ITEMS = [
+    ("Jeans", "Jeans", "Men"), ("Slim Fit Chino Pants", "Pants", "Men"),
+    ("Oxford Button Down Shirt", "Casual Button-Down Shirts", "Men"),
+    ("Fleece Pullover Jacket", "Coats, Jackets & Vests", "Men"),
+    ("Crewneck Sweater", "Sweaters", "Women"), ("Midi Wrap Dress", "Dresses", "Women"),
+    ("Running Shoes", "Athletic Shoes", "Women"), ("Leggings", "Leggings", "Women"),
+    ("Denim Skirt", "Skirts", "Women"), ("Graphic Tee", "T-Shirts", "Men"),
+    ("Canvas Tote Bag", "Bags & Handbags", "Women"), ("Baseball Cap", "Hats", "Men"),
+]
+SIZES = ["XS", "S", "M", "L", "XL", "32x32", "34x30", "8", "10", "9.5"]
+CONDITIONS = ["New with tags", "New without tags", "Pre-owned - Excellent",
+              "Pre-owned - Good", "Pre-owned - Fair"]
+
+
+def make_listings(count: int, seed: int = 13) -> list[dict]:
+    rng = random.Random(seed)
+    listings = []
+    for i in range(count):
+        item, category, department = rng.choice(ITEMS)
+        size = rng.choice(SIZES)
+        title = f"{rng.choice(BRANDS)} {rng.choice(COLORS)} {item} {department}'s Size {size} #{i}"
+        listings.append({
+            "id": str(360000000000 + i),
+            "title": title[:80],
+            "category": category,
+            "department": department,
+            "size": size,
+            "condition": rng.choice(CONDITIONS),
+            "price": f"US ${rng.randint(8, 120)}.{rng.choice(['00', '99', '50'])}",
+            "images": rng.randint(3, 8),
+            "description": f"{title}\nMeasurements on request.\nSmoke-free home.",
+        })
+    return listings
+
+
+def posh_id(seed: str) -> str:
+    return hashlib.sha1(seed.encode()).hexdigest()[:24]
+
+
+class StandInState:
+    """Listings served as "eBay" and the "Poshmark" closet, mutable by the form."""
+
+    def __init__(self, listings: int, closet: int, overlap: float, page_size: int,
+                 latency_ms: float, image_px: int, closet_feed: str = "offset",
+                 rate_limit: int = 0, error_rate: float = 0.0, reset_rate: float = 0.0):
+        self.listings = make_listings(listings)
+        self.closet_feed = closet_feed
+        self.by_id = {l["id"]: l for l in self.listings}
+        self.page_size = page_size
+        self.latency = latency_ms / 1000
+        self.image_px = image_px
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reset_closet(closet, overlap)
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self.fault_rng = random.Random(7)
+        self.down_until = 0.0
+        self.in_flight = 0
+        self.faults = {"throttled": 0, "error": 0, "reset": 0}
+
+    def outage(self, seconds: float):
+        """Answer every GET with 503 for the next `seconds`."""
+        with self.lock:
+            self.down_until = time.monotonic() + seconds
+
+    def begin_get(self) -> str | None:
+        """Count a GET in flight and pick its fault: "throttled", "error", "reset" or None."""
+        with self.lock:
+            self.in_flight += 1
+            roll = self.fault_rng.random()
+            if time.monotonic() < self.down_until:
+                fault = "error"
+            elif self.rate_limit and self.in_flight > self.rate_limit:
+                fault = "throttled"
+            elif roll < self.error_rate:
+                fault = "error"
+            elif roll < self.error_rate + self.reset_rate:
+                fault = "reset"
+            else:
+                return None
+            self.faults[fault] += 1
+            return fault
+
+    def end_get(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def reset_closet(self, size: int, overlap: float = 0.0):
+        """Closet of `size` cards, newest first; `overlap` of the eBay listings are already in it."""
+        rng = random.Random(size)
+        already = [l["title"] for l in self.listings[: int(len(self.listings) * overlap)]]
+        filler = [
+            f"{rng.choice(BRANDS)} {rng.choice(COLORS)} {rng.choice(ITEMS)[0]} Closet Item {n}"
+            for n in range(max(0, size - len(already)))
+        ]
+        titles = already + filler
+        rng.shuffle(titles)
+        with self.lock:
+            self.closet = [(posh_id(f"{n}:{t}"), t) for n, t in enumerate(titles)]
+            self.created = 0
+
+    def add_to_closet(self, title: str):
+        with self.lock:
+            self.closet.insert(0, (posh_id(f"new:{len(self.closet)}:{title}"), title))
+            self.created += 1
+
+    def closet_page(self, offset: int, limit: int) -> list:
+        with self.lock:
+            return self.closet[offset: offset + limit]
+
+
+def _page(title: str, body: str, script: str = "") -> str:
+    return (
+        "<!DOCTYPE html><html lang='en'><head><meta charset='utf-8'>"
+        f"<title>{escape(title)}</title>"
+        "<style>body{font:14px sans-serif}.hidden{display:none}"
+        ".tile{height:220px;margin:8px;border:1px solid #ccc}</style></head>"
+        f"<body>{body}<script>{script}</script></body></html>"
+    )
+
+
+def render_active(state: StandInState, page_no: int) -> str:
+    size = state.page_size
+    items = state.listings[(page_no - 1) * size: page_no * size]
+    last = page_no * size >= len(state.listings)
+    rows = "".join(
+        f"<tr><td><a class='title' href='/itm/{l['id']}?hash=item{l['id']}'>{escape(l['title'])}</a></td>"
+        f"<td>{escape(l['price'])}</td></tr>"
+        for l in items
+    )
+    nav = (
+        "<a class='pagination__next' aria-disabled='true'>Next</a>" if last
+        else f"<a class='pagination__next' href='/sh/lst/active?page={page_no + 1}'>Next</a>"
+    )
+    return _page("Active listings | Seller Hub", f"<table>{rows}</table><nav>{nav}</nav>")
+
+
+def render_item(listing: dict) -> str:
+    l = {k: escape(str(v)) for k, v in listing.items()}
+    # No whitespace before each <img>: the extractor reads item.firstChild.currentSrc
+    slides = "".join(
+        f"<div class='ux-image-carousel-item image'><img alt='photo {n}' "
+        f"src='/img/{listing['id']}-{n}.webp'></div>"
+        for n in range(listing["images"])
+    )
+    body = f"""
+<nav class="breadcrumbs"><ul>
+  <li><a href="/b/1"><span>Clothing, Shoes &amp; Accessories</span></a></li>
+  <li><a href="/b/2"><span>{l['department']}</span></a></li>
+  <li><a href="/b/3"><span>{l['category']}</span></a></li>
+</ul></nav>
+<div class="ux-image-carousel img-transition-medium">{slides}</div>
+<h1 class="x-item-title__mainTitle"><span class="ux-textspans ux-textspans--BOLD">{l['title']}</span></h1>
+<div class="x-price-primary"><span class="ux-textspans">{l['price']}</span></div>
+<dl class="ux-labels-values ux-labels-values--condition"><dt>Condition</dt><dd><span class="ux-textspans">{l['condition']}</span></dd></dl>
+<dl class="ux-labels-values ux-labels-values--department"><dt>Department</dt><dd><span class="ux-textspans">{l['department']}</span></dd></dl>
+<dl class="ux-labels-values ux-labels-values--size"><dt>Size</dt><dd><span class="ux-textspans">{l['size']}</span></dd></dl>
+<iframe id="desc" name="desc" src="/itmdesc/{listing['id']}"></iframe>
+"""
+    return _page(f"{listing['title']} | eBay", body)
+
+
+def render_desc(listing: dict) -> str:
+    paragraphs = "".join(f"<p>{escape(line)}</p>" for line in listing["description"].split("\n"))
+    return _page("desc", f"<div class='x-item-description-child'>{paragraphs}</div>")
+
+
+CLOSET_JS = """
+let offset = document.querySelectorAll('a.tile__title').length, loading = false, done = false;
+const grid = document.getElementById('tiles');
+async function more() {
+  if (loading || done) return;
+  loading = true;
+  const page = await FEEDS[FEED](offset);
+  for (const [id, title] of page.data) {
+    const div = document.createElement('div');
+    div.className = 'tile';
+    const a = document.createElement('a');
+    a.className = 'tile__title';
+    a.href = `/listing/${title.replace(/[^A-Za-z0-9]+/g, '-')}-${id}`;
+    a.textContent = title;
+    div.appendChild(a);
+    grid.appendChild(div);
+  }
+  offset += page.data.length;
+  done = !page.more;
+  loading = false;
+}
+// Each feed returns {data: [[id, title], ...], more}
+const FEEDS = {
+  offset: async (offset) => {
+    const page = await (await fetch(`/api/closet?offset=${offset}&limit=48`)).json();
+    return {data: page.data, more: page.more_available};
+  },
+  cursor: async (offset) => {
+    const request = encodeURIComponent(JSON.stringify({count: 48, max_id: String(offset)}));
+    const page = await (await fetch(`/vm-rest/users/standin/posts/filtered?request=${request}`)).json();
+    return {data: page.data.map(p => [p.id, p.title]), more: !!page.more.next_max_id};
+  },
+  html: async (offset) => {
+    const html = await (await fetch(`/closet-page?offset=${offset}&limit=48`)).text();
+    const doc = new DOMParser().parseFromString(html, 'text/html');
+    const data = Array.from(doc.querySelectorAll('a')).map(a => [a.dataset.id, a.textContent]);
+    return {data, more: data.length === 48};
+  },
+};
+window.addEventListener('scroll', () => {
+  if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 400) more();
+});
+"""
+
+
+def render_closet(state: StandInState) -> str:
+    first = state.closet_page(0, 48)
+    tiles = "".join(
+        f"<div class='tile'><a class='tile__title' href='/listing/x-{pid}'>{escape(title)}</a></div>"
+        for pid, title in first
+    )
+    script = f"const FEED = {json.dumps(state.closet_feed)};\n{CLOSET_JS}"
+    return _page("Closet | Poshmark", f"<div id='tiles'>{tiles}</div>", script)
+
+
+def _category_labels() -> list[str]:
+    labels = {FALLBACK_SUBCATEGORY}
+    for women_label, men_label, _ in CATEGORY_RULES:
+        labels.add(women_label)
+        if men_label:
+            labels.add(men_label)
+    return sorted(labels)
+
+
+CREATE_JS = """
+const $ = (s) => document.querySelector(s);
+const show = (s) => $(s).classList.remove('hidden');
+const hide = (s) => $(s).classList.add('hidden');
+
+$('#img-file-input').addEventListener('change', (e) => {
+  $('#photo-count').textContent = e.target.files.length + ' photos';
+  show('#crop-modal');
+});
+$('#crop-modal button').addEventListener('click', () => hide('#crop-modal'));
+
+$('.listing-editor__category-container [data-test="dropdown"]').addEventListener('click', () => show('#dept-menu'));
+document.querySelectorAll('#dept-menu a').forEach(a => a.addEventListener('click', () => {
+  $('#category').dataset.dept = a.dataset.etName; show('#cat-menu');
+}));
+document.querySelectorAll('#cat-menu li div').forEach(d => d.addEventListener('click', () => {
+  $('#category').textContent = $('#category').dataset.dept + ' > ' + d.textContent;
+  hide('#dept-menu'); hide('#cat-menu');
+}));
+
+$("div.dropdown[selectortestlocator='size']").addEventListener('click', (e) => {
+  if (e.target.closest('.size-dialog')) return;
+  const dlg = document.createElement('div');
+  dlg.className = 'size-dialog';
+  dlg.innerHTML = `<a class="navigation--horizontal__link"><span>Custom</span></a>
+    <div class="listing-editor__custom_sizes hidden"><input id="customSizeInput0">
+      <button class="btn btn--secondary" type="button">Save</button></div>
+    <button class="btn btn--primary hidden" data-et-name="apply" type="button">Done</button>`;
+  e.currentTarget.appendChild(dlg);
+  dlg.querySelector('a').addEventListener('click', () => {
+    dlg.querySelector('.listing-editor__custom_sizes').classList.remove('hidden');
+  });
+  dlg.querySelector('.btn--secondary').addEventListener('click', () => {
+    $('#size').textContent = dlg.querySelector('input').value;
+    dlg.querySelector('.btn--primary').classList.remove('hidden');
+  });
+  dlg.querySelector('.btn--primary').addEventListener('click', (ev) => {
+    ev.stopPropagation(); setTimeout(() => dlg.remove(), 150);
+  });
+});
+
+$('div.dropdown.listing-editor__input--half[menuclickdismiss]').addEventListener('click', () => show('#cond-menu'));
+document.querySelectorAll('#cond-menu div').forEach(d => d.addEventListener('click', (e) => {
+  e.stopPropagation(); $('#condition').textContent = d.dataset.etPropContent; hide('#cond-menu');
+}));
+
+$("input[data-vv-name='listingPrice']").addEventListener('input', () => show('.listing-price-suggestion-modal'));
+$('.listing-price-suggestion-modal button').addEventListener('click', () => hide('.listing-price-suggestion-modal'));
+
+$("button[data-et-name='next']").addEventListener('click', () => show("button[data-et-name='list']"));
+$("button[data-et-name='list']").addEventListener('click', () => {
+  // sendBeacon survives the script navigating straight to the next listing
+  navigator.sendBeacon('/api/listings', JSON.stringify({title: $("input[data-vv-name='title']").value}));
+  document.body.innerHTML = '<p class="listed">Listed</p>';
+});
+"""
+
+
+def render_create() -> str:
+    categories = "".join(
+        f"<li class='dropdown__link dropdown__menu__item'><div>{escape(label)}</div></li>"
+        for label in _category_labels()
+    )
+    conditions = "".join(
+        f"<div data-et-name='listing_condition' data-et-prop-content='{code}'>{code}</div>"
+        for code in ("nwt", "uln", "ug", "uf")
+    )
+    body = f"""
+<form onsubmit="return false">
+  <input type="file" id="img-file-input" multiple accept="image/*"><span id="photo-count"></span>
+  <div id="crop-modal" class="hidden"><button type="button" data-et-name="apply">Apply</button></div>
+
+  <input data-vv-name="title">
+  <textarea data-vv-name="description"></textarea>
+
+  <div class="listing-editor__category-container">
+    <div data-test="dropdown">Category: <span id="category"></span></div>
+    <div id="dept-menu" class="hidden">
+      <a class="dropdown__link dropdown__menu__item" data-et-name="women"><p>Women</p></a>
+      <a class="dropdown__link dropdown__menu__item" data-et-name="men"><p>Men</p></a>
+    </div>
+    <ul id="cat-menu" class="hidden">{categories}</ul>
+  </div>
+
+  <div class="dropdown" selectortestlocator="size">Size: <span id="size"></span></div>
+
+  <div class="dropdown listing-editor__input--half" menuclickdismiss data-test="dropdown">
+    Condition: <span id="condition"></span>
+    <div id="cond-menu" class="hidden">{conditions}</div>
+  </div>
+
+  <input data-vv-name="listingPrice">
+  <div data-test="modal-container" class="listing-price-suggestion-modal hidden">
+    <div data-test="modal-footer"><button type="button" class="btn btn--primary">Done</button></div>
+  </div>
+
+  <button type="button" data-et-name="next">Next</button>
+  <button type="button" data-et-name="list" class="hidden">List This Item</button>
+</form>
+"""
+    return _page("Create Listing | Poshmark", body, CREATE_JS)
+
+
+@lru_cache(maxsize=256)
+def render_image(name: str, px: int) -> bytes:
+    """A unique, photo-sized WEBP per name (portrait, so the crop has work to do)."""
+    seed = int(hashlib.md5(name.encode()).hexdigest()[:8], 16)
+    base = Image.effect_noise((px, px * 4 // 3), 30 + seed % 40).convert("RGB")
+    tint = Image.new("RGB", base.size, (seed % 256, (seed >> 8) % 256, (seed >> 16) % 256))
+    buf = io.BytesIO()
+    Image.blend(base, tint, 0.4).save(buf, "WEBP", quality=80)
+    return buf.getvalue()
+
+
+def make_handler(state: StandInState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def send(self, status: int, body: bytes, content_type: str, headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def html(self, text: str):
+            self.send(200, text.encode("utf-8"), "text/html; charset=utf-8")
+
+        def do_GET(self):
+            fault = state.begin_get()
+            try:
+                if state.latency:
+                    time.sleep(state.latency)
+                if fault == "throttled":
+                    return self.send(429, b"slow down", "text/plain", {"Retry-After": "1"})
+                if fault == "error":
+                    return self.send(503, b"unavailable", "text/plain")
+                if fault == "reset":
+                    self.close_connection = True
+                    return
+                self.serve_get()
+            finally:
+                state.end_get()
+
+        def serve_get(self):
+            parts = urlsplit(self.path)
+            path, query = parts.path, parse_qs(parts.query)
+            segments = path.strip("/").split("/")
+
+            if path == "/sh/lst/active":
+                return self.html(render_active(state, int(query.get("page", ["1"])[0])))
+            if segments[0] == "itm" and len(segments) == 2 and segments[1] in state.by_id:
+                return self.html(render_item(state.by_id[segments[1]]))
+            if segments[0] == "itmdesc" and len(segments) == 2 and segments[1] in state.by_id:
+                return self.html(render_desc(state.by_id[segments[1]]))
+            if segments[0] == "img" and len(segments) == 2:
+                etag = f'"{hashlib.md5(segments[1].encode()).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self.send(304, b"", "image/webp", {"ETag": etag})
+                body = render_image(segments[1], state.image_px)
+                return self.send(200, body, "image/webp", {"ETag": etag})
+            if segments[0] == "closet":
+                return self.html(render_closet(state))
+            if path == "/api/closet":
+                offset = int(query.get("offset", ["0"])[0])
+                limit = int(query.get("limit", ["48"])[0])
+                data = state.closet_page(offset, limit)
+                body = json.dumps({
+                    "data": data,
+                    "more_available": offset + len(data) < len(state.closet),
+                }).encode()
+                return self.send(200, body, "application/json")
+            if path == "/vm-rest/users/standin/posts/filtered":
+                request = json.loads(query.get("request", ["{}"])[0])
+                offset = int(request.get("max_id") or 0)
+                data = state.closet_page(offset, int(request.get("count", 48)))
+                more = offset + len(data) < len(state.closet)
+                body = json.dumps({
+                    "data": [{"id": pid, "title": title} for pid, title in data],
+                    "more": {"next_max_id": str(offset + len(data)) if more else None},
+                }).encode()
+                return self.send(200, body, "application/json")
+            if path == "/closet-page":
+                offset = int(query.get("offset", ["0"])[0])
+                limit = int(query.get("limit", ["48"])[0])
+                body = "".join(f"<a data-id='{pid}'>{escape(title)}</a>"
+                               for pid, title in state.closet_page(offset, limit))
+                return self.html(body)
+            if path == "/create-listing":
+                return self.html(render_create())
+            self.send(404, b"not found", "text/plain")
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path == "/api/listings":
+                state.add_to_closet(json.loads(body or b"{}").get("title", ""))
+                return self.send(200, b"{}", "application/json")
+            self.send(404, b"not found", "text/plain")
+
+    return Handler
+
+
+def start_server(port: int = 0, listings: int = 50, closet: int = 200, overlap: float = 0.5,
+                 page_size: int = 50, latency_ms: float = 0, image_px: int = 900,
+                 closet_feed: str = "offset", rate_limit: int = 0, error_rate: float = 0.0,
+                 reset_rate: float = 0.0):
+    """
+    Serve the stand-in on a background thread. Returns (server, state, base_url);
+    call server.shutdown() when done.
+    """
+    state = StandInState(listings, closet, overlap, page_size, latency_ms, image_px, closet_feed,
+                         rate_limit, error_rate, reset_rate)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def standin_env(base_url: str) -> dict:
+    """The .env values that point ebay_open.py at the stand-in."""
+    return {
+        "EBAY_SELLING_URL": f"{base_url}/sh/lst/active",
+        "POSH_CLOSET_URL": f"{base_url}/closet/standin",
+        "POSH_CREATE_URL": f"{base_url}/create-listing",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="local eBay/Poshmark stand-in")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--listings", type=int, default=50)
+    parser.add_argument("--closet", type=int, default=200, help="closet size (cards)")
+    parser.add_argument("--overlap", type=float, default=0.5,
+                        help="fraction of eBay listings already in the closet")
+    parser.add_argument("--page-size", type=int, default=50, help="Active Listings per page")
+    parser.add_argument("--latency-ms", type=float, default=0, help="delay added to every GET")
+    parser.add_argument("--image-px", type=int, default=900, help="generated photo width")
+    parser.add_argument("--closet-feed", choices=("offset", "cursor", "html"), default="offset",
+                        help="how the closet's infinite scroll loads more cards")
+    parser.add_argument("--rate-limit", type=int, default=0,
+                        help="answer 429 past this many GETs in flight (0: never)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of GETs answered with 503")
+    parser.add_argument("--reset-rate", type=float, default=0.0,
+                        help="fraction of GETs whose connection is closed without a response")
+    args = parser.parse_args()
+
+    server, _, base_url = start_server(
+        args.port, args.listings, args.closet, args.overlap,
+        args.page_size, args.latency_ms, args.image_px, args.closet_feed,
+        args.rate_limit, args.error_rate, args.reset_rate,
+    )
+    print(f"Stand-in serving on {base_url}")
+    for k, v in standin_env(base_url).items():
+        print(f"  {k}={v}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+eBay → Poshmark category mapping.
+
+The rules are a plain table checked in priority order: the first rule with
+a keyword in the eBay category/title wins. All keywords are compiled once
+into a single regex that matches whole words only (an optional plural "s"
+or "es" is allowed), so "cap" no longer matches "capris" and "tie" no
+longer matches "cutie".
+"""
+import re
+
+# (Women subcategory, Men subcategory, keywords)
+# A Men subcategory of None means the rule only applies to Women.
+CATEGORY_RULES = [
+    # --- SHOES ----------------------------------------------------------------
+    ("Shoes", "Shoes", (
+        "athletic shoes", "running shoes", "sneakers", "trainers",
+        "boots", "ankle boots", "cowboy boots", "work boots",
+        "sandals", "flip flops", "flip-flops",
+        "heels", "pumps", "platforms", "wedges",
+        "flats", "loafers", "oxfords", "mules", "clogs",
+        "slippers", "house shoes",
+        "casual shoes", "dress shoes", "comfort shoes",
+    )),
+
+    # --- JEANS / PANTS / SHORTS / SKIRTS --------------------------------------
+    ("Jeans", "Jeans", ("jeans", "denim")),
+    ("Pants & Jumpsuits", "Pants", ("leggings", "yoga pants")),
+    ("Pants & Jumpsuits", "Pants", (
+        "pants", "trousers", "chinos", "slacks", "cargo pants", "capris",
+    )),
+    ("Shorts", "Shorts", ("shorts", "boardshorts", "gym shorts", "bike shorts")),
+    ("Skirts", "Skirts", ("skirt", "skirts", "skort")),
+
+    # --- TOPS / SHIRTS / SWEATERS / JACKETS & COATS ---------------------------
+    ("Tops", "Shirts", ("t-shirt", "tee", "graphic tee", "tank top", "crop top", "tube top")),
+    ("Shirts", "Shirts", (
+        "shirt", "button-front", "button-down", "polo", "henley", "dress shirt", "flannel",
+    )),
+    ("Tops", "Tops", ("blouse",)),
+    ("Sweaters", "Sweaters", (
+        "sweater", "cardigan", "pullover", "jumper",
+        "hoodie", "hooded sweatshirt", "sweatshirt", "crewneck",
+    )),
+    ("Jackets & Coats", "Jackets & Coats", (
+        "coat", "jacket", "parka", "puffer", "anorak",
+        "trench", "overcoat", "blazer", "vest", "windbreaker", "fleece",
+    )),
+
+    # --- DRESSES / JUMPSUITS / OUTFITS (Women only) ---------------------------
+    ("Dresses", None, ("dress", "sundress", "maxi dress", "cocktail dress", "gown")),
+    ("Pants & Jumpsuits", None, ("jumpsuit", "romper", "playsuit")),
+    ("Pants & Jumpsuits", None, (
+        "outfit", "set", "two piece set", "2 piece set", "matching set",
+    )),
+
+    # --- INTIMATES / SLEEP / SWIM / UNDERWEAR & SOCKS -------------------------
+    ("Intimates & Sleepwear", "Underwear & Socks", (
+        "bra", "bralette", "lingerie", "panties", "underwear", "boxers", "briefs",
+    )),
+    ("Intimates & Sleepwear", "Sleepwear & Robes", (
+        "pajamas", "pyjamas", "sleepwear", "nightgown", "nightshirt", "robe",
+    )),
+    ("Swim", "Swim", (
+        "swimwear", "bikini", "one piece", "one-piece", "swimsuit", "trunks", "rashguard",
+    )),
+    ("Intimates & Sleepwear", "Underwear & Socks", (
+        "socks", "hosiery", "tights", "pantyhose", "stockings",
+    )),
+
+    # --- ACCESSORIES / BAGS / JEWELRY / GROOMING ------------------------------
+    ("Bags", "Bags", (
+        "handbag", "purse", "tote", "crossbody", "shoulder bag", "backpack", "wallet", "clutch",
+    )),
+    ("Accessories", "Accessories", (
+        "belt", "belt buckle", "hat", "beanie", "cap", "scarf", "wrap",
+        "gloves", "mittens", "earmuffs", "visor", "headband", "hair accessory",
+        "keychain", "key chain", "tie", "bow tie", "suspenders", "umbrella",
+    )),
+    ("Jewelry", "Accessories", (
+        "necklace", "bracelet", "ring", "earrings", "jewelry", "jewellery",
+        "anklet", "brooch", "pin",
+    )),
+    ("Makeup", "Makeup", ("makeup", "lipstick", "foundation", "eyeshadow", "mascara", "concealer")),
+    ("Skincare", "Skincare", ("skincare", "skin care", "serum", "moisturizer", "cleanser", "lotion")),
+    ("Hair", "Hair", ("hair care", "shampoo", "conditioner", "hair spray", "styling gel")),
+    ("Grooming", "Grooming", ("grooming", "razor", "shaving", "beard", "aftershave", "cologne")),
+
+    # --- GLOBAL / TRADITIONAL WEAR --------------------------------------------
+    ("Global & Traditional Wear", "Global & Traditional Wear", (
+        "kimono", "sari", "salwar", "hanbok", "dashiki", "kaftan", "kilt",
+    )),
+]
+
+FALLBACK_SUBCATEGORY = "Other"
+
+
+def _word_pattern(alternation: str) -> str:
+    return rf"(?<![a-z0-9])(?:{alternation})(?:s|es)?(?![a-z0-9])"
+
+
+def _trie_pattern(words) -> str:
+    """
+    Regex alternation for `words`, factored by shared prefixes
+    ("sandals|sari|scarf" → "s(?:a(?:ndals|ri)|carf)") so the engine does
+    not retry every keyword at each position. Optional tails are greedy,
+    so the longest keyword at a position is tried first.
+    """
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def compile_rules(rules):
+    """
+    Compile the rule table into (matcher, rules_for_keyword).
+
+    The matcher is one prefix-factored regex that reports, at every word
+    start, the longest keyword found there (lookahead, so matches may
+    overlap). Because only
+    the longest keyword at a position is reported, each keyword also
+    carries the rules of any shorter keywords it contains ("dress shoes"
+    contains "dress"), which keeps first-match priority exact.
+    """
+    rule_of = {}
+    for idx, (_, _, words) in enumerate(rules):
+        for w in words:
+            rule_of.setdefault(w, idx)
+
+    keywords = sorted(rule_of, key=len, reverse=True)
+    patterns = [(u, re.compile(_word_pattern(re.escape(u)))) for u in keywords]
+    rules_for_keyword = {}
+    for w in keywords:
+        inner = {rule_of[u] for u, pattern in patterns if pattern.search(w)}
+        rules_for_keyword[w] = tuple(sorted(inner))
+
+    matcher = re.compile(
+        rf"(?<![a-z0-9])(?=((?:{_trie_pattern(keywords)})(?:s|es)?(?![a-z0-9])))"
+    )
+    return matcher, rules_for_keyword
+
+
+# Compiled on first use, so importing this module stays cheap
+_compiled = None
+
+
+def _rules_matcher():
+    global _compiled
+    if _compiled is None:
+        _compiled = compile_rules(CATEGORY_RULES)
+    return _compiled
+
+
+def _keyword_rules(found: str, rules_for_keyword: dict) -> tuple[int, ...]:
+    rules = rules_for_keyword.get(found)
+    if rules is None:
+        # Matched with a plural suffix; strip it to find the keyword
+        rules = rules_for_keyword.get(found[:-1]) or rules_for_keyword[found[:-2]]
+    return rules
+
+
+def main_category_for(ebay_department: str) -> str:
+    """Poshmark main category ("Men" or "Women") from eBay's Department."""
+    dept = (ebay_department or "").strip()
+
+    if dept in ("Men", "Women"):
+        return dept
+    if dept.startswith("Unisex"):
+        # Choose your default bucket for unisex
+        return "Men"
+    # If department is missing or odd, just default to Women
+    return "Women"
+
+
+def map_ebay_category_to_posh(ebay_category: str, ebay_title: str, ebay_department: str):
+    """
+    Map eBay Clothing/Shoes/Accessories into a Poshmark
+    (main_category, subcategory) pair.
+
+    main_category: "Men" or "Women" (from eBay's Department)
+    subcategory:   Posh top-level like "Shoes", "Jeans", "Accessories", "Other", etc.
+    """
+    main_cat = main_category_for(ebay_department)
+    text = (ebay_category or "").lower() + " " + (ebay_title or "").lower()
+    women = main_cat == "Women"
+
+    matcher, rules_for_keyword = _rules_matcher()
+    best = None
+    for m in matcher.finditer(text):
+        for idx in _keyword_rules(m.group(1), rules_for_keyword):
+            if best is not None and idx >= best:
+                break
+            if women or CATEGORY_RULES[idx][1] is not None:
+                best = idx
+                break
+
+    if best is None:
+        return (main_cat, FALLBACK_SUBCATEGORY)
+
+    women_label, men_label, _ = CATEGORY_RULES[best]
+    return (main_cat, women_label if women else men_label)
+
+
+def classify_many(rows):
+    """
+    Batch form of map_ebay_category_to_posh.
+
+    `rows` is an iterable of (ebay_category, ebay_title, ebay_department);
+    returns a list of (main_category, subcategory) in the same order.
+    """
+    return [map_ebay_category_to_posh(cat, title, dept) for cat, title, dept in rows]
+
+
+def map_ebay_condition_to_posh_code(ebay_condition: str) -> str | None:
+    if not ebay_condition:
+        return None
+
+    text = ebay_condition.lower()
+
+    # Very rough but practical mappings – expand as needed
+    if "new with tags" in text or "new-with-tags" in text:
+        return "nwt"   # New With Tags
+    if "new without tags" in text or "new without tag" in text or "like new" in text or "excellent" in text:
+        return "uln"   # Like New
+    if "good" in text or "gently used" in text:
+        return "ug"    # Good
+    if "fair" in text or "visible wear" in text or "some wear" in text:
+        return "uf"    # Fair
+
+    # default: Good
+    return "ug"
@@ -0,0 +1,98 @@
+"""
+Closet listings from the closet's own paginated data requests.
+
+Scrolling the closet page renders every card (photos, layout) just to read
+its title back out of the DOM. The page fills itself from a JSON feed, so
+the scan captures the first feed request the page makes, then requests the
+pages itself from the top, following the feed's cursor (or offset) to the
+end. Recognized payloads:
+
+    {"data": [{"id": ..., "title": ...}, ...], "more": {"next_max_id": ...}}
+    {"data": [[id, title], ...], "more_available": true}
+
+Anything else returns None here, and the scan falls back to the DOM.
+"""
+from typing import NamedTuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import json
+
+
+class ClosetPage(NamedTuple):
+    items: list[tuple[str, str]]  # (listing ID, title), newest first
+    more: bool
+    cursor: str | None = None  # next_max_id of cursor-paged feeds
+
+
+def is_json_response(response) -> bool:
+    """Whether a Playwright response could be a feed page (checked before reading it)."""
+    return "json" in (response.headers.get("content-type") or "")
+
+
+def parse_closet_payload(payload) -> ClosetPage | None:
+    """One feed page, or None if the payload isn't a closet page we know."""
+    if not isinstance(payload, dict) or not isinstance(payload.get("data"), list):
+        return None
+    items = []
+    for entry in payload["data"]:
+        if isinstance(entry, dict):
+            listing_id, title = entry.get("id"), entry.get("title")
+        elif isinstance(entry, list) and len(entry) == 2:
+            listing_id, title = entry
+        else:
+            return None
+        if not isinstance(listing_id, str) or not isinstance(title, str):
+            return None
+        items.append((listing_id, title.strip()))
+
+    more = payload.get("more")
+    if isinstance(more, dict):
+        cursor = more.get("next_max_id")
+        return ClosetPage(items, bool(cursor), str(cursor) if cursor else None)
+    if isinstance(payload.get("more_available"), bool):
+        return ClosetPage(items, payload["more_available"])
+    return None
+
+
+def _request_param(query: dict) -> dict | None:
+    """The JSON `request=` parameter some feeds carry their paging in."""
+    try:
+        request = json.loads(query.get("request", ""))
+    except ValueError:
+        return None
+    return request if isinstance(request, dict) else None
+
+
+def feed_style(url: str) -> str | None:
+    """How the feed URL pages: "cursor" (max_id), "offset", or None if unrecognized."""
+    query = dict(parse_qsl(urlsplit(url).query, keep_blank_values=True))
+    request = _request_param(query)
+    if "max_id" in query or (request is not None and "max_id" in request):
+        return "cursor"
+    if "offset" in query:
+        return "offset"
+    return None
+
+
+def page_url(url: str, style: str, offset: int = 0, cursor: str | None = None) -> str:
+    """
+    `url` (a captured feed request) rewritten to fetch the page at `offset`
+    or `cursor`; offset 0 / no cursor is the newest page.
+    """
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    if style == "offset":
+        query["offset"] = str(offset)
+    else:
+        request = _request_param(query)
+        if request is not None and "max_id" in request:
+            if cursor is None:
+                request.pop("max_id")
+            else:
+                request["max_id"] = cursor
+            query["request"] = json.dumps(request, separators=(",", ":"))
+        elif cursor is None:
+            query.pop("max_id", None)
+        else:
+            query["max_id"] = cursor
+    return urlunsplit(parts._replace(query=urlencode(query)))
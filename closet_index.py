@@ -0,0 +1,126 @@
+from pathlib import Path
+
+import hashlib, re, sqlite3, time
+
+# Poshmark listing URLs end in a 24-hex-digit listing ID:
+#   /listing/Levis-501-Jeans-32x32-65a1f0c2b3d4e5f6a7b8c9d0
+LISTING_ID_RE = re.compile(r"([0-9a-f]{24})/?(?:[?#].*)?$")
+
+
+def posh_listing_id(href: str) -> str | None:
+    """Return the listing ID from a Poshmark /listing/ href, or None."""
+    if not href:
+        return None
+    m = LISTING_ID_RE.search(href)
+    if m:
+        return m.group(1)
+    # Unknown URL shape: fall back to the last path segment
+    tail = href.split("?")[0].rstrip("/").rsplit("/", 1)[-1]
+    return tail or None
+
+
+class ClosetIndex:
+    """
+    On-disk index of the Poshmark closet (listing ID, title, timestamps).
+
+    Rows come from two sources:
+      - "closet":  seen while scanning the closet page
+      - "created": listed by this tool; stored under a placeholder ID until a
+                   later scan sees the real listing with the same title
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS listings (
+                listing_id TEXT PRIMARY KEY,
+                title      TEXT NOT NULL,
+                source     TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen  REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS listings_title ON listings(title);
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def titles(self) -> list[str]:
+        rows = self.conn.execute("SELECT title FROM listings ORDER BY first_seen")
+        return [title for (title,) in rows]
+
+    def known_ids(self) -> set[str]:
+        rows = self.conn.execute("SELECT listing_id FROM listings WHERE source = 'closet'")
+        return {listing_id for (listing_id,) in rows}
+
+    def upsert_scanned(self, items: list[tuple[str, str]]) -> int:
+        """
+        Record (listing_id, title) pairs seen on the closet page.
+        Returns how many were not in the index before.
+        """
+        now = time.time()
+        known = self.known_ids()
+        new = 0
+        with self.conn:
+            for listing_id, title in items:
+                if listing_id not in known:
+                    new += 1
+                    known.add(listing_id)
+                self.conn.execute(
+                    """
+                    INSERT INTO listings (listing_id, title, source, first_seen, last_seen)
+                    VALUES (?, ?, 'closet', ?, ?)
+                    ON CONFLICT(listing_id) DO UPDATE SET
+                        title = excluded.title, last_seen = excluded.last_seen
+                    """,
+                    (listing_id, title, now, now),
+                )
+                # The real listing replaces our placeholder for it
+                self.conn.execute(
+                    "DELETE FROM listings WHERE source = 'created' AND title = ?",
+                    (title,),
+                )
+        return new
+
+    def add_created(self, title: str):
+        """Record a listing this tool just created, without rescanning the closet."""
+        placeholder = "created:" + hashlib.sha1(title.encode("utf-8")).hexdigest()[:16]
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO listings (listing_id, title, source, first_seen, last_seen)
+                VALUES (?, ?, 'created', ?, ?)
+                """,
+                (placeholder, title, now, now),
+            )
+
+    def prune_unseen(self, since: float) -> int:
+        """
+        After a full rescan, drop rows not seen since `since`: closet rows
+        (sold/deleted) and placeholders the scan didn't match to a listing.
+        """
+        with self.conn:
+            cur = self.conn.execute("DELETE FROM listings WHERE last_seen < ?", (since,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_full_scan', ?)",
+                (str(time.time()),),
+            )
+        return cur.rowcount
+
+    def last_full_scan(self) -> float | None:
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'last_full_scan'"
+        ).fetchone()
+        return float(row[0]) if row else None
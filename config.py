@@ -0,0 +1,230 @@
+"""
+Settings from the environment and the .env file next to this module.
+
+Nothing is read at import time. The first setting accessed loads .env
+(variables already in the environment win) and parses every value below, so
+modules that only need a helper (category rules, image processing) import
+without a .env file and without python-dotenv.
+
+    import config
+    config.require_urls()          # before opening eBay / Poshmark
+    config.FORM_BUDGET_SECONDS
+
+Assigning an attribute (config.DOWNLOAD_DIR = ...) overrides it until the
+next reload().
+"""
+from pathlib import Path
+
+import os
+
+BASE_DIR = Path(__file__).parent
+
+_values = None
+
+
+def _flag(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def _int_or_none(value: str | None) -> int | None:
+    return int(value) if value not in (None, "") else None
+
+
+def _list_or_none(value: str | None) -> tuple[str, ...] | None:
+    if value is None:
+        return None
+    return tuple(s.strip().lower() for s in value.split(",") if s.strip())
+
+
+def _read_settings() -> dict:
+    env = os.getenv
+    return {
+        # eBay Seller Hub and Poshmark pages the script drives (required)
+        "EBAY_SELLING_URL": env("EBAY_SELLING_URL"),
+        "POSH_CLOSET_URL": env("POSH_CLOSET_URL"),
+        "POSH_CREATE_URL": env("POSH_CREATE_URL"),
+
+        # Persistent browser profile for login reuse
+        "PROFILE_DIR": Path(env("PROFILE_DIR", BASE_DIR / ".playwright-profile")),
+
+        # Downloads folder
+        "DOWNLOAD_DIR": Path(env("DOWNLOAD_DIR", BASE_DIR / "downloads")),
+
+        # Run Chromium without a window (stand-in runs, sharded workers on a server)
+        "HEADLESS": _flag(env("HEADLESS", "0")),
+
+        # Local index of the Poshmark closet, refreshed incrementally each run
+        "CLOSET_INDEX_PATH": Path(env("CLOSET_INDEX_PATH", BASE_DIR / "closet_index.sqlite3")),
+
+        # Stage reached by every listing of --batch runs, so a restarted batch resumes
+        "LEDGER_PATH": Path(env("LEDGER_PATH", BASE_DIR / "job_ledger.sqlite3")),
+
+        # How the closet is read: "feed" requests the closet's own JSON pages
+        # (closet_feed.py) and falls back to "dom" (scroll and read the cards)
+        # when the feed isn't recognized
+        "CLOSET_SCAN": env("CLOSET_SCAN", "feed"),
+
+        # How long the closet may go without new cards after a scroll before we
+        # treat it as fully loaded
+        "CLOSET_STALL_TIMEOUT_MS": int(env("CLOSET_STALL_TIMEOUT_MS", "5000")),
+
+        # Time allowed for the whole Poshmark form of one listing (every wait shares it)
+        "FORM_BUDGET_SECONDS": float(env("FORM_BUDGET_SECONDS", "90")),
+
+        # Trigram similarity at or above which two titles count as the same listing
+        "TITLE_MATCH_THRESHOLD": float(env("TITLE_MATCH_THRESHOLD", "0.85")),
+
+        # `plan` flags an unmatched eBay item as a possible duplicate when a closet
+        # title is at least this similar
+        "PLAN_SIMILAR_THRESHOLD": float(env("PLAN_SIMILAR_THRESHOLD", "0.7")),
+
+        # Active Listings pages `plan` fetches at once over HTTP
+        "INVENTORY_CONCURRENCY": max(1, int(env("INVENTORY_CONCURRENCY", "4"))),
+
+        # Where eBay item fields come from: "browser" (the logged-in tab) or "http"
+        # (plain pooled HTTP requests, no tab needed)
+        "EXTRACT_BACKEND": env("EXTRACT_BACKEND", "browser"),
+
+        # "sync" runs one listing at a time; "async" overlaps extraction, the closet
+        # scan and image downloads (async_engine.py)
+        "ENGINE": env("ENGINE", "sync"),
+
+        # How many item pages the HTTP backend fetches at once
+        "EXTRACT_CONCURRENCY": max(1, int(env("EXTRACT_CONCURRENCY", "8"))),
+
+        # Browser tabs extracting eBay item pages at once (async engine, browser backend)
+        "EXTRACT_TABS": max(1, int(env("EXTRACT_TABS", "3"))),
+
+        # Listings allowed to wait between async stages; bounds memory and
+        # speculative downloads
+        "PIPELINE_DEPTH": max(1, int(env("PIPELINE_DEPTH", "4"))),
+
+        # Cache of extracted listings and processed images (keyed by item ID /
+        # content hash), trimmed least-recently-used to CACHE_MAX_MB
+        "CACHE_DIR": Path(env("CACHE_DIR", BASE_DIR / ".cache")),
+        "CACHE_MAX_BYTES": int(float(env("CACHE_MAX_MB", "2048")) * 1024 * 1024),
+
+        # Reuse a cached listing / image without asking the server for this long;
+        # after that, revalidate with ETag/Last-Modified when the server sent them
+        "LISTING_CACHE_TTL": float(env("LISTING_CACHE_TTL_HOURS", "6")) * 3600,
+        "IMAGE_CACHE_TTL": float(env("IMAGE_CACHE_TTL_HOURS", "720")) * 3600,
+
+        # How many carousel images to fetch at once (all share one keep-alive session)
+        "DOWNLOAD_CONCURRENCY": max(1, int(env("DOWNLOAD_CONCURRENCY", "6"))),
+
+        # Connections per host the shared requests session keeps open (http_pool.py)
+        "HTTP_POOL_SIZE": max(1, int(env("HTTP_POOL_SIZE", "16"))),
+
+        # Processes decoding and encoding photos (default: one per core)
+        "IMAGE_WORKERS": _int_or_none(env("IMAGE_WORKERS")),
+
+        # Network calls (net_policy.py): retries after a timeout or a 429/5xx, and
+        # the backoff before them (doubling from NET_BACKOFF_SECONDS, with jitter)
+        "NET_RETRIES": max(0, int(env("NET_RETRIES", "3"))),
+        "NET_BACKOFF_SECONDS": float(env("NET_BACKOFF_SECONDS", "0.5")),
+        "NET_BACKOFF_MAX_SECONDS": float(env("NET_BACKOFF_MAX_SECONDS", "30")),
+
+        # Calls in flight per host; halved while a host throttles, then regrown
+        "NET_HOST_CONCURRENCY": max(1, int(env("NET_HOST_CONCURRENCY", "16"))),
+
+        # Pause a host for BREAKER_COOLDOWN_SECONDS after this many throttled or
+        # failed calls in a row
+        "BREAKER_FAILURES": max(1, int(env("BREAKER_FAILURES", "5"))),
+        "BREAKER_COOLDOWN_SECONDS": float(env("BREAKER_COOLDOWN_SECONDS", "30")),
+
+        # Abort requests the automation never reads (route_policy.py); the lists
+        # are comma-separated, unset keeps the defaults and empty turns that part off
+        "ROUTE_POLICY": env("ROUTE_POLICY", "on").lower() not in ("off", "0", "false", "no"),
+        "ROUTE_BLOCK_TYPES": _list_or_none(env("ROUTE_BLOCK_TYPES")),
+        "ROUTE_BLOCK_DOMAINS": _list_or_none(env("ROUTE_BLOCK_DOMAINS")),
+        "ROUTE_ALLOW_DOMAINS": _list_or_none(env("ROUTE_ALLOW_DOMAINS")),
+
+        # Upload JPEG profile (a name from image_pipeline.PROFILES, e.g. poshmark, small);
+        # IMAGE_MAX_EDGE (0 = no cap) and IMAGE_QUALITY override its values
+        "IMAGE_PROFILE": env("IMAGE_PROFILE", "poshmark"),
+        "IMAGE_MAX_EDGE": _int_or_none(env("IMAGE_MAX_EDGE")),
+        "IMAGE_QUALITY": _int_or_none(env("IMAGE_QUALITY")),
+
+        # Perceptual-hash distance (bits of 128) within which a new photo reuses an
+        # already processed one of the same shape; negative turns reuse off
+        "IMAGE_REUSE_DISTANCE": int(env("IMAGE_REUSE_DISTANCE", "4")),
+
+        # Distance within which a photo is reported as looking like a photo of
+        # another listing (a likely duplicate under a different title)
+        "IMAGE_DUPLICATE_DISTANCE": int(env("IMAGE_DUPLICATE_DISTANCE", "10")),
+
+        # Per-stage timing (--trace or TRACE=1): run-<time>.jsonl plus a Prometheus
+        # textfile (crosslist.prom) are written here at the end of the run
+        "TRACE": _flag(env("TRACE", "0")),
+        "METRICS_DIR": Path(env("METRICS_DIR", BASE_DIR / "metrics")),
+
+        # Where daemon jobs and their results live
+        "JOB_QUEUE_DIR": Path(env("JOB_QUEUE_DIR", BASE_DIR / "queue")),
+
+        # Replace the daemon's eBay and Poshmark tabs after this many jobs;
+        # long-lived tabs keep growing (DOM, JS heap, image memory)
+        "DAEMON_RECYCLE_JOBS": max(1, int(env("DAEMON_RECYCLE_JOBS", "25"))),
+
+        # Replace the batch's eBay and Poshmark tabs after this many listings
+        "PAGE_RECYCLE_LISTINGS": max(1, int(env("PAGE_RECYCLE_LISTINGS", "50"))),
+
+        # Recycle the tabs early when this process, the Playwright driver and
+        # Chromium together hold more than this much memory (PSS), and restart
+        # the browser if that isn't enough (0 = no ceiling)
+        "MEMORY_CEILING_MB": max(0, int(env("MEMORY_CEILING_MB", "0"))),
+
+        # Print and record a memory snapshot every this many listings (0 = never);
+        # TRACEMALLOC=1 adds traced Python allocations and their top growth
+        "MEMORY_SNAPSHOT_EVERY": max(0, int(env("MEMORY_SNAPSHOT_EVERY", "0"))),
+        "TRACEMALLOC": _flag(env("TRACEMALLOC", "0")),
+
+        # Top up the closet index before a daemon job when the last scan is older
+        "DAEMON_CLOSET_REFRESH_SECONDS": float(env("DAEMON_CLOSET_REFRESH_SECONDS", "900")),
+
+        # How often an idle daemon looks for new jobs
+        "DAEMON_POLL_SECONDS": float(env("DAEMON_POLL_SECONDS", "0.5")),
+
+        # Sharded runs (shard_runner.py): worker processes, the cap on each one's
+        # extraction tabs/requests and downloads, and where their profiles, logs
+        # and traces live
+        "SHARD_WORKERS": max(1, int(env("SHARD_WORKERS", "2"))),
+        "SHARD_CONCURRENCY": max(1, int(env("SHARD_CONCURRENCY", "2"))),
+        "SHARD_DIR": Path(env("SHARD_DIR", BASE_DIR / "shards")),
+    }
+
+
+def load() -> dict:
+    """Read .env and parse the settings (once; later calls are free)."""
+    global _values
+    if _values is None:
+        from dotenv import load_dotenv
+
+        load_dotenv(BASE_DIR / ".env")
+        _values = _read_settings()
+    return _values
+
+
+def reload():
+    """Drop parsed values and overrides; the next access re-reads os.environ."""
+    global _values
+    for name in _values or ():
+        globals().pop(name, None)
+    _values = None
+
+
+def require_urls():
+    """Fail early, with a clear message, when the page URLs aren't configured."""
+    values = load()
+    if not (values["EBAY_SELLING_URL"] and values["POSH_CLOSET_URL"]
+            and values["POSH_CREATE_URL"]):
+        raise RuntimeError(
+            "EBAY_SELLING_URL, POSH_CLOSET_URL, and POSH_CREATE_URL must be set in a .env file"
+        )
+
+
+def __getattr__(name: str):
+    values = load()
+    try:
+        return values[name]
+    except KeyError:
+        raise AttributeError(f"module 'config' has no attribute {name!r}") from None
@@ -0,0 +1,275 @@
+"""
+Warm-browser daemon: keeps the persistent context, the eBay tab and the
+Poshmark tab open and crosslists items as jobs arrive.
+
+    python crosslist_daemon.py serve                      # run the daemon
+    python crosslist_daemon.py submit 123456789012 --wait # queue an item ID or URL
+    python crosslist_daemon.py result <job id>
+
+Jobs travel through a file queue (job_queue.py) under JOB_QUEUE_DIR, so a
+client never needs the browser, and a result file records the job's status
+and timings. A single job skips the browser launch, the login check and the
+closet scan that a fresh `ebay_open.py` run pays for; the closet index is
+only topped up when it is older than DAEMON_CLOSET_REFRESH_SECONDS.
+"""
+from urllib.parse import urlsplit
+
+import argparse, json, signal, time
+
+from closet_index import ClosetIndex
+from ebay_http import fetch_listing
+from ebay_open import (
+    browser_launch_options,
+    crosslist_listing,
+    ebay_item_id,
+    extract_ebay_listing,
+    scan_posh_closet,
+)
+from job_queue import FileJobQueue
+from listing_cache import ListingCache
+from memory_guard import MemoryGuard, chromium_metrics
+from net_policy import navigate
+from route_policy import RoutePolicy
+from title_match import TitleIndex
+import config, metrics
+
+
+def item_url(target: str) -> str:
+    """A job target is an eBay item URL or a bare item ID."""
+    if target.isdigit():
+        parts = urlsplit(config.EBAY_SELLING_URL)
+        return f"{parts.scheme}://{parts.netloc}/itm/{target}"
+    return target
+
+
+class WarmSession:
+    """The daemon's open browser state, reused from job to job."""
+
+    def __init__(self, context, backend: str):
+        self.context = context
+        self.backend = backend
+        self.closet_index = ClosetIndex(config.CLOSET_INDEX_PATH)
+        self.cache = ListingCache(config.CACHE_DIR, config.CACHE_MAX_BYTES)
+        self.ebay_page = self.posh_page = None
+        self.jobs_on_pages = 0
+        self.jobs_done = 0
+        self.guard = MemoryGuard.from_config()
+        self.title_index = None
+        self.closet_scanned_at = 0.0
+        self.open_pages()
+
+    def open_pages(self):
+        """Open fresh eBay and Poshmark tabs, then close the old ones."""
+        old = [p for p in (self.ebay_page, self.posh_page) if p is not None]
+        # The persistent context starts with one blank tab; adopt it the first time
+        blank = [p for p in self.context.pages if p not in old and p.url == "about:blank"]
+        self.ebay_page = blank[0] if blank else self.context.new_page()
+        self.posh_page = self.context.new_page()
+        with metrics.span("ebay.goto", page="selling"):
+            navigate(self.ebay_page, config.EBAY_SELLING_URL)
+        for page in old:
+            page.close()
+        self.jobs_on_pages = 0
+
+    def refresh_closet(self, force: bool = False):
+        age = time.monotonic() - self.closet_scanned_at
+        if not force and age < config.DAEMON_CLOSET_REFRESH_SECONDS:
+            return
+        titles = scan_posh_closet(self.posh_page, self.closet_index)
+        self.title_index = TitleIndex(titles, threshold=config.TITLE_MATCH_THRESHOLD)
+        self.closet_scanned_at = time.monotonic()
+
+    def extract(self, url: str):
+        item_id = ebay_item_id(url)
+        if self.backend == "http":
+            listing = fetch_listing(url, item_id=item_id, cache=self.cache,
+                                    max_age=config.LISTING_CACHE_TTL)
+            listing.print_summary()
+            return listing
+        listing = self.cache.fresh_listing(item_id, config.LISTING_CACHE_TTL)
+        if listing is not None:
+            print("(cached listing — page not reopened)")
+            listing.print_summary()
+            return listing
+        with metrics.span("ebay.goto", page="item"):
+            navigate(self.ebay_page, url)
+        listing = extract_ebay_listing(self.ebay_page)
+        self.cache.put_listing(listing)
+        return listing
+
+    def run_job(self, job: dict) -> dict:
+        """Crosslist one job's item; returns the fields for its result file."""
+        if self.jobs_on_pages >= config.DAEMON_RECYCLE_JOBS or self.guard.over_ceiling():
+            print(f"\nRecycling tabs after {self.jobs_on_pages} jobs...")
+            with metrics.span("daemon.recycle"):
+                self.open_pages()
+            self.guard.recycled()
+
+        timings = {"queued": round(job["started_at"] - job.get("queued_at", job["started_at"]), 3)}
+        result = {"status": "failed", "error": None, "timings": timings}
+        start = time.perf_counter()
+        with metrics.span("daemon.job") as job_span:
+            try:
+                if not job.get("target"):
+                    raise ValueError("job has no item URL or ID")
+                url = item_url(str(job["target"]).strip())
+                result["url"] = url
+                result["item_id"] = ebay_item_id(url)
+                job_span.set(item_id=result["item_id"])
+
+                step = time.perf_counter()
+                self.refresh_closet()
+                timings["closet"] = round(time.perf_counter() - step, 3)
+
+                step = time.perf_counter()
+                listing = self.extract(url)
+                timings["extract"] = round(time.perf_counter() - step, 3)
+                result["title"] = listing.title
+
+                step = time.perf_counter()
+                result["status"] = crosslist_listing(
+                    listing, self.posh_page, self.title_index, self.closet_index, self.cache)
+                timings["crosslist"] = round(time.perf_counter() - step, 3)
+            except Exception as e:
+                print(f"✗ Job failed: {e}")
+                result["error"] = f"{type(e).__name__}: {e}"
+            job_span.set(status=result["status"])
+        timings["total"] = round(time.perf_counter() - start, 3)
+        self.jobs_on_pages += 1
+        self.jobs_done += 1
+        metrics.incr(f"listings_{result['status']}")
+        if self.guard.snapshot_due(self.jobs_done):
+            self.guard.record(self.jobs_done, chromium_metrics(self.posh_page))
+        return result
+
+    def close(self):
+        self.guard.print_report()
+        self.cache.close()
+        self.closet_index.close()
+
+
+def serve(args):
+    from playwright.sync_api import sync_playwright
+
+    config.PROFILE_DIR.mkdir(exist_ok=True)
+    config.DOWNLOAD_DIR.mkdir(exist_ok=True)
+    queue = FileJobQueue(config.JOB_QUEUE_DIR)
+    requeued = queue.requeue_stale()
+    if requeued:
+        print(f"Re-queued {requeued} job(s) left unfinished by the last daemon.")
+
+    # First Ctrl+C / SIGTERM: finish the current job, then stop. Second Ctrl+C: abort.
+    stopping = []
+
+    def request_stop(signum, frame):
+        print("\nStopping after the current job (Ctrl+C again to abort)...")
+        stopping.append(signum)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    signal.signal(signal.SIGINT, request_stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, request_stop)
+
+    with sync_playwright() as p:
+        with metrics.span("browser.launch"):
+            context = p.chromium.launch_persistent_context(**browser_launch_options())
+        route_policy = RoutePolicy.from_config()
+        if route_policy is not None:
+            route_policy.install(context)
+
+        session = WarmSession(context, args.extract_backend)
+        session.refresh_closet(force=True)
+        print(f"\nDaemon ready; watching {queue.incoming}")
+
+        done = 0
+        while not stopping:
+            job = queue.claim()
+            if job is None:
+                time.sleep(config.DAEMON_POLL_SECONDS)
+                continue
+            print(f"\n=== job {job['id']}: {job.get('target')} ===")
+            result = session.run_job(job)
+            queue.finish(job, **result)
+            done += 1
+            print(f"--- {result['status']} in {result['timings']['total']:.1f}s "
+                  f"({queue.pending()} waiting)")
+
+        print(f"\nDaemon stopped after {done} job(s).")
+        session.cache.print_stats()
+        if route_policy is not None:
+            route_policy.print_stats()
+        session.close()
+        context.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Warm-browser crosslist daemon.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_p = sub.add_parser("serve", help="keep the browser open and process queued jobs")
+    serve_p.add_argument(
+        "--extract-backend",
+        choices=("browser", "http"),
+        default=None,
+        help="read eBay item pages in the warm tab or over plain HTTP "
+             "(default: $EXTRACT_BACKEND or browser)",
+    )
+    serve_p.add_argument(
+        "--trace",
+        action="store_true",
+        default=None,
+        help="time every stage and write JSONL + Prometheus metrics to "
+             "$METRICS_DIR (default: metrics/) on exit",
+    )
+
+    submit_p = sub.add_parser("submit", help="queue eBay items to crosslist")
+    submit_p.add_argument("targets", nargs="+", metavar="ITEM", help="eBay item URL or item ID")
+    submit_p.add_argument("--wait", action="store_true", help="wait for and print the results")
+    submit_p.add_argument("--timeout", type=float, default=None,
+                          help="with --wait, give up after this many seconds")
+
+    result_p = sub.add_parser("result", help="print a finished job's result")
+    result_p.add_argument("job_id")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "serve":
+        config.require_urls()
+        args.extract_backend = args.extract_backend or config.EXTRACT_BACKEND
+        if args.trace is None:
+            args.trace = config.TRACE
+        if args.trace:
+            metrics.enable(config.METRICS_DIR)
+        try:
+            serve(args)
+        finally:
+            metrics.finish()
+        return 0
+
+    queue = FileJobQueue(config.JOB_QUEUE_DIR)
+    if args.command == "result":
+        result = queue.result(args.job_id)
+        print(json.dumps(result, indent=2) if result else f"No result for {args.job_id} yet.")
+        return 0 if result else 1
+
+    job_ids = [queue.submit(target) for target in args.targets]
+    for job_id, target in zip(job_ids, args.targets):
+        print(f"Queued {target} as job {job_id}")
+    if not args.wait:
+        return 0
+    failed = 0
+    for job_id in job_ids:
+        result = queue.wait(job_id, timeout=args.timeout)
+        if result is None:
+            print(f"{job_id}: no result within {args.timeout:g}s")
+            failed += 1
+            continue
+        failed += result["status"] == "failed"
+        print(json.dumps(result, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
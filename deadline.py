@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+
+import time
+
+import metrics
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    """
+    One time budget shared by every wait in a multi-step browser flow.
+
+    Pass `deadline.ms()` as each Playwright timeout: a slow step eats into
+    the steps after it instead of each wait getting its own fixed allowance.
+    `step()` times a named step for the per-listing report and the metrics.
+    """
+
+    def __init__(self, seconds: float, name: str = "form"):
+        self.seconds = seconds
+        self.name = name
+        self.started = time.perf_counter()
+        self.expires = self.started + seconds
+        self.steps = {}
+
+    def ms(self) -> float:
+        """Milliseconds left; raises DeadlineExceeded once the budget is spent."""
+        left = (self.expires - time.perf_counter()) * 1000
+        if left <= 0:
+            raise DeadlineExceeded(f"{self.name} budget of {self.seconds:g}s used up")
+        return left
+
+    @contextmanager
+    def step(self, name: str):
+        start = time.perf_counter()
+        try:
+            with metrics.span(f"{self.name}.{name}"):
+                yield
+        finally:
+            self.steps[name] = self.steps.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self) -> str:
+        total = time.perf_counter() - self.started
+        parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.steps.items())
+        return f"{self.name} {total:.1f}s of {self.seconds:g}s: {parts}"
@@ -0,0 +1,307 @@
+"""
+Browserless extraction backend: read public eBay item pages over pooled HTTP.
+
+Parses the same fields as the Playwright backend (ebay_listing.EXTRACT_LISTING_JS)
+with the standard-library HTML parser and returns the same EbayListing.
+
+    python ebay_http.py saved_item.html [saved_desc.html]   # parse saved pages
+    python ebay_http.py https://www.ebay.com/itm/1234567890
+"""
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin
+
+import re, sys, time
+
+from ebay_listing import EbayListing, parse_price
+from http_pool import get_http_session
+from net_policy import get_net_policy
+import metrics
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+}
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "tr", "ul",
+}
+SKIP_TEXT_TAGS = {"script", "style", "noscript", "template"}
+
+
+class Node:
+    """Minimal element node: just enough DOM for the selectors we use."""
+
+    __slots__ = ("tag", "attrs", "classes", "children", "parent")
+
+    def __init__(self, tag: str, attrs: dict, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = set((attrs.get("class") or "").split())
+        self.children = []
+        self.parent = parent
+
+    def elements(self):
+        return [c for c in self.children if isinstance(c, Node)]
+
+    def descendants(self):
+        stack = list(reversed(self.elements()))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.elements()))
+
+    def matches(self, tag: str | None, cls: str | None) -> bool:
+        return (tag is None or self.tag == tag) and (cls is None or cls in self.classes)
+
+    def text_content(self) -> str:
+        parts = []
+        self._collect(parts, block_breaks=False)
+        return "".join(parts)
+
+    def inner_text(self) -> str:
+        """textContent with line breaks at block elements, roughly like innerText."""
+        parts = []
+        self._collect(parts, block_breaks=True)
+        lines = [re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(parts).split("\n")]
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+    def _collect(self, parts, block_breaks: bool):
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(child if not block_breaks else child.replace("\n", " "))
+            elif child.tag not in SKIP_TEXT_TAGS:
+                child._collect(parts, block_breaks)
+                if block_breaks and child.tag in BLOCK_TAGS:
+                    parts.append("\n")
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, dict(attrs), self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, dict(attrs), self.stack[-1])
+        self.stack[-1].children.append(node)
+
+    def handle_endtag(self, tag):
+        # Close the nearest open element with this tag (tolerates sloppy HTML)
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                break
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def parse_html(html: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def select_first(root: Node, *steps) -> Node | None:
+    """
+    First element matching a descendant chain of (tag, class) steps, e.g.
+    select_first(root, ("dl", "ux-labels-values--size"), ("dd", None), (None, "ux-textspans"))
+    behaves like querySelector("dl.ux-labels-values--size dd .ux-textspans").
+    """
+    tag, cls = steps[0]
+    for node in root.descendants():
+        if not node.matches(tag, cls):
+            continue
+        if len(steps) == 1:
+            return node
+        found = select_first(node, *steps[1:])
+        if found is not None:
+            return found
+    return None
+
+
+def _text(root: Node, *steps) -> str | None:
+    node = select_first(root, *steps)
+    return node.text_content().strip() if node is not None else None
+
+
+def _breadcrumb_category(root: Node) -> str | None:
+    # nav.breadcrumbs ul li:last-child span
+    nav = select_first(root, ("nav", "breadcrumbs"))
+    if nav is None:
+        return None
+    for ul in (n for n in nav.descendants() if n.tag == "ul"):
+        for li in (n for n in ul.descendants() if n.tag == "li"):
+            if li.parent.elements()[-1] is li:
+                span = select_first(li, ("span", None))
+                if span is not None:
+                    return span.text_content().strip()
+    return None
+
+
+def _carousel_image_urls(root: Node, base_url: str | None) -> list[str]:
+    # First .ux-image-carousel.img-transition-medium; the browser reads
+    # currentSrc, here we take the zoom image, falling back to src/data-src
+    carousel = next(
+        (
+            n for n in root.descendants()
+            if {"ux-image-carousel", "img-transition-medium"} <= n.classes
+        ),
+        None,
+    )
+    if carousel is None:
+        return []
+
+    urls = []
+    for item in carousel.descendants():
+        if "ux-image-carousel-item" not in item.classes:
+            continue
+        img = next((n for n in item.descendants() if n.tag == "img"), None)
+        if img is None:
+            continue
+        src = img.attrs.get("data-zoom-src") or img.attrs.get("src") or img.attrs.get("data-src")
+        if src and not src.startswith("data:"):
+            urls.append(urljoin(base_url, src) if base_url else src)
+    return urls
+
+
+def parse_item_html(html: str, url: str | None = None) -> tuple[EbayListing, str | None]:
+    """
+    Parse an eBay /itm/ page. Returns (listing, description iframe URL);
+    the listing's description is empty until parse_description_html fills it.
+    """
+    root = parse_html(html)
+
+    title = _text(
+        root, ("h1", "x-item-title__mainTitle"), ("span", "ux-textspans--BOLD")
+    )
+
+    def label_value(name):
+        return _text(
+            root, ("dl", f"ux-labels-values--{name}"), ("dd", None), (None, "ux-textspans")
+        )
+
+    desc_frame = next(
+        (n for n in root.descendants() if n.tag == "iframe" and n.attrs.get("id") == "desc"),
+        None,
+    )
+    desc_url = desc_frame.attrs.get("src") if desc_frame is not None else None
+    if desc_url and url:
+        desc_url = urljoin(url, desc_url)
+
+    listing = EbayListing(
+        url=url,
+        title=title or "",
+        department=label_value("department"),
+        size=label_value("size"),
+        condition=label_value("condition"),
+        price=parse_price(_text(root, ("div", "x-price-primary"), (None, "ux-textspans"))),
+        category=_breadcrumb_category(root),
+        description="",
+        image_urls=_carousel_image_urls(root, url),
+    )
+    return listing, desc_url
+
+
+def parse_description_html(html: str) -> str:
+    node = select_first(parse_html(html), (None, "x-item-description-child"))
+    return node.inner_text() if node is not None else ""
+
+
+@metrics.traced("ebay.fetch_http")
+def fetch_listing(url: str, item_id: str | None = None, session=None,
+                  cache=None, max_age: float = 0) -> EbayListing:
+    """
+    HTTP backend: fetch and parse an item page plus its description iframe.
+
+    With a ListingCache, a listing fetched less than `max_age` seconds ago is
+    returned without a request; an older one is revalidated with
+    If-None-Match/If-Modified-Since when the server sent validators.
+    """
+    session = session or get_http_session()
+
+    cached = cache.get_listing(item_id) if cache is not None else None
+    if cached is not None and time.time() - cached.fetched_at < max_age:
+        cache.count("listing_hit")
+        return cached.listing
+
+    headers = cached.validators() if cached is not None else {}
+    policy = get_net_policy()
+    resp = policy.call(url, session.get, url, headers=headers, timeout=30)
+    if resp.status_code == 304 and cached is not None:
+        cache.touch_listing(item_id)
+        cache.count("listing_revalidated")
+        return cached.listing
+    resp.raise_for_status()
+
+    listing, desc_url = parse_item_html(resp.text, url=resp.url)
+    listing.item_id = item_id
+
+    if not listing.title:
+        raise RuntimeError(f"No eBay title found on {url}")
+
+    if desc_url:
+        desc_resp = policy.call(desc_url, session.get, desc_url, timeout=30)
+        if desc_resp.ok:
+            listing.description = parse_description_html(desc_resp.text)
+
+    if cache is not None:
+        cache.count("listing_miss")
+        cache.put_listing(listing, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+    return listing
+
+
+def fetch_listings(urls, item_ids=None, workers: int = 8, cache=None, max_age: float = 0) -> list:
+    """
+    Fetch many item pages concurrently over the shared session.
+    Returns one entry per URL, in order: an EbayListing, or the exception
+    raised while fetching it.
+    """
+    item_ids = item_ids or [None] * len(urls)
+
+    def fetch(args):
+        url, item_id = args
+        try:
+            return fetch_listing(url, item_id=item_id, cache=cache, max_age=max_age)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(fetch, zip(urls, item_ids)))
+
+
+def main(argv=None):
+    args = (argv if argv is not None else sys.argv[1:])
+    if not args:
+        print(__doc__.strip())
+        return
+
+    start = time.perf_counter()
+    source = args[0]
+    if source.startswith(("http://", "https://")):
+        listing = fetch_listing(source)
+    else:
+        listing, _ = parse_item_html(Path(source).read_text(encoding="utf-8"))
+        if len(args) > 1:
+            listing.description = parse_description_html(
+                Path(args[1]).read_text(encoding="utf-8")
+            )
+
+    listing.print_summary()
+    for u in listing.image_urls:
+        print("  -", u)
+    print(f"\nParsed in {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
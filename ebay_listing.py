@@ -0,0 +1,167 @@
+import re
+
+
+class EbayListing:
+    """Everything the crosslisting pipeline needs from one eBay item page."""
+
+    __slots__ = (
+        "item_id",
+        "url",
+        "title",
+        "department",
+        "size",
+        "condition",
+        "price",
+        "category",
+        "description",
+        "image_urls",
+    )
+
+    def __init__(
+        self,
+        item_id: str | None = None,
+        url: str | None = None,
+        title: str = "",
+        department: str | None = None,
+        size: str | None = None,
+        condition: str | None = None,
+        price: int | None = None,
+        category: str | None = None,
+        description: str = "",
+        image_urls: list[str] | None = None,
+    ):
+        self.item_id = item_id
+        self.url = url
+        self.title = title
+        self.department = department
+        self.size = size
+        self.condition = condition
+        self.price = price
+        self.category = category
+        self.description = description
+        self.image_urls = image_urls or []
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EbayListing":
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def __repr__(self) -> str:
+        return (
+            f"EbayListing(item_id={self.item_id!r}, title={self.title!r}, "
+            f"price={self.price!r}, images={len(self.image_urls)})"
+        )
+
+    def print_summary(self):
+        print(f"\nEBAY LISTING TITLE:\n{self.title}")
+        print(f"EBAY DEPARTMENT: {self.department}")
+        print(f"EBAY SIZE: {self.size}")
+        print(f"EBAY CONDITION: {self.condition}")
+        print(f"EBAY PRICE INT: {self.price}")
+        print(f"EBAY CATEGORY: {self.category}")
+        print(f"EBAY IMAGES: {len(self.image_urls)}")
+        print(f"EBAY DESCRIPTION (first 200 chars): {self.description[:200]!r}")
+
+
+def parse_price(raw: str | None) -> int | None:
+    """"US $24.99" → 25; None if there is no number in it."""
+    try:
+        return int(round(float(re.sub(r"[^0-9.]", "", raw or ""))))
+    except ValueError:
+        return None
+
+
+# Reads every field (and the FIRST carousel's image URLs) in one round trip.
+# The description lives in the #desc iframe, which is usually cross-origin;
+# in that case `description` is null and the caller reads the frame itself.
+EXTRACT_LISTING_JS = """() => {
+    const text = (sel) => {
+        const el = document.querySelector(sel);
+        return el ? el.textContent.trim() : null;
+    };
+
+    const titleEl = document.querySelector('h1.x-item-title__mainTitle span.ux-textspans--BOLD');
+
+    const carousel = document.querySelector('.ux-image-carousel.img-transition-medium');
+    const images = carousel
+        ? Array.from(carousel.querySelectorAll('.ux-image-carousel-item'))
+            .map(item => item.firstChild && item.firstChild.currentSrc)
+            .filter(src => !!src)
+        : [];
+
+    let description = null;
+    try {
+        const frame = document.querySelector('iframe#desc');
+        const doc = frame && frame.contentDocument;
+        const el = doc && doc.querySelector('.x-item-description-child');
+        if (el) description = el.innerText.trim();
+    } catch (e) { /* cross-origin */ }
+
+    return {
+        title: titleEl ? titleEl.innerText.trim() : null,
+        department: text('dl.ux-labels-values--department dd .ux-textspans'),
+        size: text('dl.ux-labels-values--size dd .ux-textspans'),
+        condition: text('dl.ux-labels-values--condition dd .ux-textspans'),
+        price: text('div.x-price-primary .ux-textspans'),
+        category: text('nav.breadcrumbs ul li:last-child span'),
+        description: description,
+        images: images,
+    };
+}"""
+
+
+def get_ebay_description(page) -> str:
+    """Extracts description text from the iframe with id='desc'."""
+    try:
+        frame = page.frame(name="desc") or page.frame(url=re.compile(".*desc.*"))
+        if not frame:
+            print("[desc] iframe #desc not found.")
+            return ""
+
+        desc = frame.eval_on_selector(
+            ".x-item-description-child",
+            "el => el.innerText.trim()"
+        )
+
+        if desc:
+            print("[desc] Description found inside iframe #desc.")
+            return desc
+
+        print("[desc] .x-item-description-child not found inside iframe.")
+        return ""
+
+    except Exception as e:
+        print(f"[desc] Error extracting description: {e}")
+        return ""
+
+
+def listing_from_js(data: dict, url: str, item_id: str | None, description: str) -> EbayListing:
+    """Build the record from an EXTRACT_LISTING_JS result (sync or async page)."""
+    return EbayListing(
+        item_id=item_id,
+        url=url,
+        title=data["title"],
+        department=data["department"],
+        size=data["size"],
+        condition=data["condition"],
+        price=parse_price(data["price"]),
+        category=data["category"],
+        description=description,
+        image_urls=data["images"],
+    )
+
+
+def extract_listing_from_page(page, item_id: str | None = None) -> EbayListing:
+    """Browser backend: read an open eBay item page into an EbayListing."""
+    data = page.evaluate(EXTRACT_LISTING_JS)
+
+    if not data["title"]:
+        raise RuntimeError(f"No eBay title found on {page.url}")
+
+    description = data["description"]
+    if description is None:
+        description = get_ebay_description(page)
+
+    return listing_from_js(data, page.url, item_id, description)
@@ -1,705 +1,982 @@
+"""
+Crosslist eBay active listings to Poshmark.
+
+    python ebay_open.py [crosslist] [--batch ...]       # the default subcommand
+    python ebay_open.py scan-closet [--full-rescan]
+    python ebay_open.py report                          # batch progress and failures
+    python ebay_open.py plan [--out inventory.tsv]      # dry run: what a batch would do
+    python ebay_open.py classify "Women's Jeans" --title "Levi's 501"
+    python ebay_open.py process-images photo1.webp photo2.jpg --out processed/
+
+Importing this module has no side effects: settings come from config.py on
+first use. Playwright, requests, Pillow and the batch machinery (network
+policy, HTTP extraction, job ledger, memory guard) are imported by the code
+that needs them, so `classify` and worker processes start without them.
+"""
 from pathlib import Path
-from PIL import Image
+from typing import TYPE_CHECKING
+
+import argparse, hashlib, re, time, uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from category_rules import (
+    classify_many,
+    map_ebay_category_to_posh,
+    map_ebay_condition_to_posh_code,
+)
+from closet_index import ClosetIndex
+from ebay_listing import EbayListing, extract_listing_from_page
+from http_pool import get_http_session
+from image_hash import image_fingerprint
+from image_pipeline import PROFILES, get_process_pool, get_profile, process_image
+from listing_cache import CachedImage, ListingCache
+from route_policy import RoutePolicy
+from shard_runner import parse_shard, shard_of
+from title_match import TitleIndex
+import config, metrics, poshmark
+
+if TYPE_CHECKING:
+    from job_ledger import JobLedger, LedgerEntry
+    from memory_guard import MemoryGuard
 
-import os, re, requests
 
-from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+def sanitize_for_filename(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name)[:80]
 
-# Load environment variables from .env file in this directory
-BASE_DIR = Path(__file__).parent
-load_dotenv(BASE_DIR / ".env")
 
-# Read URLs from environment (required)
-EBAY_SELLING_URL = os.getenv("EBAY_SELLING_URL")
-POSH_CLOSET_URL = os.getenv("POSH_CLOSET_URL")
-POSH_CREATE_URL = os.getenv("POSH_CREATE_URL")
+def image_profile():
+    """The upload JPEG profile from IMAGE_PROFILE / IMAGE_MAX_EDGE / IMAGE_QUALITY."""
+    return get_profile(config.IMAGE_PROFILE, config.IMAGE_MAX_EDGE, config.IMAGE_QUALITY)
 
-if not EBAY_SELLING_URL or not POSH_CLOSET_URL or not POSH_CREATE_URL:
-    raise RuntimeError(
-        "EBAY_SELLING_URL, POSH_CLOSET_URL, and POSH_CREATE_URL must be set in a .env file"
-    )
 
-# Persistent browser profile for login reuse
-PROFILE_DIR = BASE_DIR / ".playwright-profile"
+@metrics.traced("images.download_and_process")
+def download_ebay_images(img_urls: list[str], ebay_title: str, cache: ListingCache,
+                         item_id: str | None = None, evict: bool = True):
+    """
+    Download and process the carousel images, reusing the cache where possible.
+    Returns the processed JPEG paths (inside the cache) in carousel order.
 
-# Downloads folder
-DOWNLOAD_DIR = BASE_DIR / "downloads"
+    A new photo is first hashed perceptually: if it looks like one already
+    processed (same shape, within IMAGE_REUSE_DISTANCE bits) that JPEG is
+    reused, and photos resembling another listing's are reported.
 
-def make_square_top_crop(image_path: Path):
-    """
-    Force image to 1:1 ratio by:
-    - Centering horizontally
-    - Anchoring at the TOP vertically
-    - Cropping off the bottom if needed
+    With evict=False the cache is not trimmed afterwards; callers running
+    several downloads at once trim it themselves when none is in flight.
     """
-    try:
-        img = Image.open(image_path)
-        img = img.convert("RGB")
+    if not img_urls:
+        print("\nNo images found in the FIRST eBay carousel.")
+        return []
 
-        width, height = img.size
+    print("\nFound the following image URLs on the eBay listing:")
+    for u in img_urls:
+        print("  -", u)
 
-        # Already square
-        if width == height:
-            return image_path
+    save_dir = config.DOWNLOAD_DIR
+    profile = image_profile()
+    cache.use_image_profile(repr(profile))
 
-        # Square side is the smaller dimension
-        side = min(width, height)
+    # Unique per call: the async engine downloads several listings at once, and
+    # titles repeat (or match once cut to length)
+    stem = f"{item_id or sanitize_for_filename(ebay_title)[:40]}_{uuid.uuid4().hex[:8]}"
+    jobs = []
+    for idx, url in enumerate(img_urls, start=1):
+        ext = url.split("?")[0].split(".")[-1].lower()
+        if ext not in {"jpg", "jpeg", "png", "gif", "webp"}:
+            ext = "jpg"
 
-        # Center horizontally
-        left = (width - side) // 2
-        right = left + side
+        filename = save_dir / f"{stem}_{idx:02d}.{ext}"
+        jobs.append((url, filename, cache.get_image(url)))
+
+    workers = min(config.DOWNLOAD_CONCURRENCY, len(jobs))
+    print(f"\nFetching {len(jobs)} images ({workers} at a time, cache: {cache.image_dir})")
+
+    total_start = time.perf_counter()
+    image_pool = get_process_pool()
+    results = [None] * len(jobs)
+    reuse_distance = config.IMAGE_REUSE_DISTANCE
+    duplicate_distance = config.IMAGE_DUPLICATE_DISTANCE
+    hash_distance = max(reuse_distance, duplicate_distance)
+    other_listings = {}  # item ID → title of listings whose photos these resemble
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        download_futures = {
+            pool.submit(download_image, url, filename, cached): i
+            for i, (url, filename, cached) in enumerate(jobs)
+        }
+
+        # Hand each new file to the image worker pool as soon as its download lands
+        hashing, processing = {}, {}
+        pending, duplicates = set(), []
+        total_bytes = 0
+        for future in as_completed(download_futures):
+            i = download_futures[future]
+            url, filename, cached = jobs[i]
+            try:
+                status, digest, size, seconds, etag, last_modified = future.result()
+            except Exception as e:
+                print(f"  ✗ Failed to download {url}: {e}")
+                metrics.incr("image_failures")
+                continue
+
+            if status in ("fresh", "not-modified"):
+                cache.touch_image(url, cached.digest)
+                cache.count("image_hit" if status == "fresh" else "image_revalidated")
+                print(f"  ✓ Cached {filename.name} ({status})")
+                results[i] = cached.path
+                continue
+
+            total_bytes += size
+            metrics.incr("images_downloaded")
+            metrics.incr("bytes_downloaded", size)
+            print(f"  ✓ Saved {filename.name} ({size / 1024:.0f} KB in {seconds:.2f}s)")
+
+            if digest in pending:
+                # Same bytes as another image of this listing still being processed
+                filename.unlink(missing_ok=True)
+                duplicates.append((i, digest, etag, last_modified))
+                continue
+
+            if cache.has_blob(digest):
+                # Same bytes as an image we already processed
+                filename.unlink(missing_ok=True)
+                cache.put_image(url, digest, etag, last_modified)
+                cache.count("image_dedup")
+                results[i] = cache.blob_path(digest)
+                seen = cache.image_hash(digest)
+                if seen is not None and seen.item_id and seen.item_id != item_id:
+                    other_listings[seen.item_id] = seen.title
+                continue
+
+            pending.add(digest)
+            if hash_distance < 0:
+                cache.count("image_miss")
+                processing[i] = (
+                    image_pool.submit(process_image, filename, cache.blob_path(digest),
+                                      profile=profile),
+                    digest, etag, last_modified,
+                )
+            else:
+                hashing[image_pool.submit(image_fingerprint, filename)] = (
+                    i, digest, etag, last_modified)
+
+    # Reuse a processed photo that looks the same, or process this one
+    reused = {}  # digest → digest of the look-alike whose JPEG was reused
+    for future in as_completed(hashing):
+        i, digest, etag, last_modified = hashing[future]
+        url, filename, _ = jobs[i]
+        match = None
+        try:
+            dhash, width, height = future.result()
+        except Exception as e:
+            print(f"  ✗ Could not hash {filename.name}: {e}")
+        else:
+            for distance, seen in cache.similar_images(dhash, hash_distance):
+                if (match is None and distance <= reuse_distance and seen.digest != digest
+                        and seen.same_shape(width, height) and cache.has_blob(seen.digest)):
+                    match = seen
+                if distance <= duplicate_distance and seen.item_id and seen.item_id != item_id:
+                    other_listings[seen.item_id] = seen.title
+            cache.put_image_hash(digest, dhash, width, height, item_id, ebay_title)
+
+        if match is not None:
+            filename.unlink(missing_ok=True)
+            cache.put_image(url, match.digest, etag, last_modified)
+            cache.count("image_similar")
+            print(f"  ✓ Reused look-alike photo for {filename.stem}")
+            reused[digest] = match.digest
+            results[i] = cache.blob_path(match.digest)
+            continue
+
+        cache.count("image_miss")
+        processing[i] = (
+            image_pool.submit(process_image, filename, cache.blob_path(digest),
+                              profile=profile),
+            digest, etag, last_modified,
+        )
 
-        # Anchor at TOP vertically: upper = 0, lower = side
-        upper = 0
-        lower = side
+    # Collect processed images in carousel order
+    for i, (future, digest, etag, last_modified) in sorted(processing.items()):
+        url, filename, _ = jobs[i]
+        try:
+            out_path, seconds = future.result()
+        except Exception as e:
+            filename.unlink(missing_ok=True)
+            print(f"  ✗ Failed to process {filename.name}: {e}")
+            metrics.incr("image_failures")
+            continue
+        cache.put_image(url, digest, etag, last_modified)
+        print(f"  ✓ Processed {filename.stem} ({profile.name} JPEG, "
+              f"{out_path.stat().st_size / 1024:.0f} KB, {seconds:.2f}s)")
+        metrics.incr("images_processed")
+        metrics.incr("image_process_seconds", seconds)
+        results[i] = out_path
+
+    for i, digest, etag, last_modified in duplicates:
+        digest = reused.get(digest, digest)
+        if cache.has_blob(digest):
+            cache.put_image(jobs[i][0], digest, etag, last_modified)
+            cache.count("image_dedup")
+            results[i] = cache.blob_path(digest)
+
+    saved = [p for p in results if p is not None]
+    if evict:
+        cache.evict(keep=[p.stem for p in saved])
+
+    total = time.perf_counter() - total_start
+    print(
+        f"Ready: {len(saved)}/{len(jobs)} images, "
+        f"{total_bytes / 1024:.0f} KB downloaded in {total:.2f}s"
+    )
+    if other_listings:
+        metrics.incr("similar_listings", len(other_listings))
+        print("⚠ Photos look like those of other listings (possible duplicates):")
+        for other_id, other_title in other_listings.items():
+            print(f"  - {other_id}: {other_title}")
+    return saved
 
-        img_cropped = img.crop((left, upper, right, lower))
-        img_cropped.save(image_path, "JPEG", quality=95)
 
-        print(f"  ✓ Cropped to 1:1 (top-anchored): {image_path.name}")
-        return image_path
+@metrics.traced("images.fetch")
+def download_image(url: str, filename: Path, cached: CachedImage | None = None):
+    """
+    Stream one image to disk, hashing it on the way.
 
-    except Exception as e:
-        print(f"  ✗ Failed to crop {image_path.name} to 1:1: {e}")
-        return image_path
+    Returns (status, sha256, bytes written, seconds taken, ETag, Last-Modified).
+    status is "fresh" (cached copy young enough, no request made),
+    "not-modified" (server answered 304 to our conditional request) or
+    "downloaded".
+    """
+    start = time.perf_counter()
 
-def convert_webp_to_jpg(image_path: Path):
-    if image_path.suffix.lower() != ".webp":
-        return image_path  # nothing to do
+    headers = {}
+    if cached is not None:
+        if time.time() - cached.fetched_at < config.IMAGE_CACHE_TTL:
+            return "fresh", cached.digest, 0, 0.0, cached.etag, cached.last_modified
+        headers = cached.validators()
 
-    try:
-        img = Image.open(image_path).convert("RGB")
-        jpg_path = image_path.with_suffix(".jpg")
-        img.save(jpg_path, "JPEG", quality=95)
+    def attempt():
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with get_http_session().get(url, headers=headers, timeout=30, stream=True) as resp:
+                if resp.status_code == 304 and cached is not None:
+                    return ("not-modified", cached.digest, 0, time.perf_counter() - start,
+                            cached.etag, cached.last_modified)
+                resp.raise_for_status()
+                with open(filename, "wb") as f:
+                    for chunk in resp.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+        except Exception:
+            filename.unlink(missing_ok=True)  # don't leave a truncated file behind
+            raise
+        return ("downloaded", digest.hexdigest(), size, time.perf_counter() - start,
+                etag, last_modified)
 
-        image_path.unlink()  # remove original .webp
+    from net_policy import get_net_policy
 
-        print(f"  ✓ Converted {image_path.name} → {jpg_path.name}")
-        return jpg_path
+    # Retried on timeouts and 429/5xx; each attempt rewrites the file from the start
+    return get_net_policy().call(url, attempt)
 
-    except Exception as e:
-        print(f"  ✗ Failed to convert {image_path.name}: {e}")
-        return image_path
 
+def ebay_item_id(url: str) -> str | None:
+    """Return the numeric eBay item ID from an /itm/ URL, or None."""
+    m = re.search(r"/itm/(?:[^/?#]+/)?(\d+)", url or "")
+    return m.group(1) if m else None
 
-def sanitize_for_filename(name: str) -> str:
-    return re.sub(r"[^A-Za-z0-9._-]+", "_", name)[:80]
 
-def map_ebay_category_to_posh(ebay_category: str, ebay_title: str, ebay_department: str):
+@metrics.traced("ebay.collect_urls")
+def collect_active_listing_urls(page) -> list[str]:
     """
-    Map eBay Clothing/Shoes/Accessories into a Poshmark
-    (main_category, subcategory) pair.
-
-    main_category: "Men" or "Women" (from eBay's Department)
-    subcategory:   Posh top-level like "Shoes", "Jeans", "Accessories", "Other", etc.
+    Walk every page of eBay Active Listings (following the "next" pagination
+    link) and return one canonical /itm/ URL per listing, in page order.
     """
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+    from net_policy import navigate
+
+    urls = []
+    seen_ids = set()
+    visited_pages = set()
+
+    while True:
+        visited_pages.add(page.url)
 
-    cat = (ebay_category or "").lower()
-    title = (ebay_title or "").lower()
-    text = cat + " " + title
-
-    # --- Main category from Department -----------------------------------
-    dept = (ebay_department or "").strip()
-
-    if dept in ("Men", "Women"):
-        main_cat = dept
-    elif dept.startswith("Unisex"):
-        # Choose your default bucket for unisex
-        main_cat = "Men"
-    else:
-        # If department is missing or odd, just default to Women
-        main_cat = "Women"
-
-    # convenience helper
-    def has(*words):
-        return any(w in text for w in words)
-
-    # ----------------------------------------------------------------------
-    # SHOES (Men's Shoes / Women's Shoes → "Shoes")
-    # ----------------------------------------------------------------------
-    if has("athletic shoes", "running shoes", "sneakers", "trainers",
-           "boots", "ankle boots", "cowboy boots", "work boots",
-           "sandals", "flip flops", "flip-flops",
-           "heels", "pumps", "platforms", "wedges",
-           "flats", "loafers", "oxfords", "mules", "clogs",
-           "slippers", "house shoes",
-           "casual shoes", "dress shoes", "comfort shoes"):
-        return (main_cat, "Shoes")
-
-    # ----------------------------------------------------------------------
-    # JEANS / PANTS / SHORTS / SKIRTS
-    # ----------------------------------------------------------------------
-    if has("jeans", "denim"):
-        return (main_cat, "Jeans")
-
-    if has("leggings", "yoga pants"):
-        # women has "Pants & Jumpsuits", men has "Pants"
-        return (main_cat, "Pants & Jumpsuits" if main_cat == "Women" else "Pants")
-
-    if has("pants", "trousers", "chinos", "slacks", "cargo pants", "capris"):
-        return (main_cat, "Pants & Jumpsuits" if main_cat == "Women" else "Pants")
-
-    if has("shorts", "boardshorts", "gym shorts", "bike shorts"):
-        return (main_cat, "Shorts")
-
-    if has("skirt", "skirts", "skort"):
-        return (main_cat, "Skirts")
-
-    # ----------------------------------------------------------------------
-    # TOPS / SHIRTS / SWEATERS / JACKETS & COATS
-    # ----------------------------------------------------------------------
-    # Tops & Shirts
-    if has("t-shirt", "tee", "graphic tee", "tank top", "crop top", "tube top"):
-        # Women has "Tops", Men has "Shirts"
-        return (main_cat, "Tops" if main_cat == "Women" else "Shirts")
-
-    if has("shirt", "button-front", "button-down", "polo", "henley", "dress shirt", "flannel"):
-        return (main_cat, "Shirts")
-
-    if has("blouse"):
-        return (main_cat, "Tops")
-
-    # Sweaters / Hoodies
-    if has("sweater", "cardigan", "pullover", "jumper",
-           "hoodie", "hooded sweatshirt", "sweatshirt", "crewneck"):
-        return (main_cat, "Sweaters")
-
-    # Jackets & Coats
-    if has("coat", "jacket", "parka", "puffer", "anorak",
-           "trench", "overcoat", "blazer", "vest", "windbreaker", "fleece"):
-        return (main_cat, "Jackets & Coats")
-
-    # ----------------------------------------------------------------------
-    # DRESSES / JUMPSUITS / OUTFITS (Women)
-    # ----------------------------------------------------------------------
-    if main_cat == "Women":
-        if has("dress", "sundress", "maxi dress", "cocktail dress", "gown"):
-            return (main_cat, "Dresses")
-        if has("jumpsuit", "romper", "playsuit"):
-            return (main_cat, "Pants & Jumpsuits")
-        if has("outfit", "set", "two piece set", "2 piece set", "matching set"):
-            return (main_cat, "Pants & Jumpsuits")  # or "Tops" – pick your preference
-
-    # ----------------------------------------------------------------------
-    # INTIMATES / SLEEP / SWIM / UNDERWEAR & SOCKS
-    # ----------------------------------------------------------------------
-    if has("bra", "bralette", "lingerie", "panties", "underwear", "boxers", "briefs"):
-        return (main_cat, "Intimates & Sleepwear" if main_cat == "Women" else "Underwear & Socks")
-
-    if has("pajamas", "pyjamas", "sleepwear", "nightgown", "nightshirt", "robe"):
-        return (main_cat, "Intimates & Sleepwear" if main_cat == "Women" else "Sleepwear & Robes")
-
-    if has("swimwear", "bikini", "one piece", "one-piece", "swimsuit", "trunks", "rashguard"):
-        return (main_cat, "Swim")
-
-    if has("socks", "hosiery", "tights", "pantyhose", "stockings"):
-        return (main_cat, "Underwear & Socks" if main_cat == "Men" else "Intimates & Sleepwear")
-
-    # ----------------------------------------------------------------------
-    # ACCESSORIES / BAGS / JEWELRY / GROOMING
-    # ----------------------------------------------------------------------
-    if has("handbag", "purse", "tote", "crossbody", "shoulder bag", "backpack", "wallet", "clutch"):
-        return (main_cat, "Bags")
-
-    if has("belt", "belt buckle", "hat", "beanie", "cap", "scarf", "wrap",
-           "gloves", "mittens", "earmuffs", "visor", "headband", "hair accessory",
-           "keychain", "key chain", "tie", "bow tie", "suspenders", "umbrella"):
-        return (main_cat, "Accessories")
-
-    if has("necklace", "bracelet", "ring", "earrings", "jewelry", "jewellery", "anklet", "brooch", "pin"):
-        return (main_cat, "Jewelry" if main_cat == "Women" else "Accessories")
-
-    if has("makeup", "lipstick", "foundation", "eyeshadow", "mascara", "concealer"):
-        return (main_cat, "Makeup")
-
-    if has("skincare", "skin care", "serum", "moisturizer", "cleanser", "lotion"):
-        return (main_cat, "Skincare")
-
-    if has("hair care", "shampoo", "conditioner", "hair spray", "styling gel"):
-        return (main_cat, "Hair")
-
-    if has("grooming", "razor", "shaving", "beard", "aftershave", "cologne"):
-        return (main_cat, "Grooming")
-
-    # ----------------------------------------------------------------------
-    # GLOBAL / TRADITIONAL WEAR
-    # ----------------------------------------------------------------------
-    if has("kimono", "sari", "salwar", "hanbok", "dashiki", "kaftan", "kilt"):
-        return (main_cat, "Global & Traditional Wear")
-
-    # ----------------------------------------------------------------------
-    # FALLBACK: dump into misc "Other" for that department
-    # ----------------------------------------------------------------------
-    return (main_cat, "Other")
-
-def fill_posh_fields_from_ebay(
-    posh_page,
-    ebay_title: str,
-    ebay_description: str,
-    ebay_size: str,
-    ebay_condition: str,
-    ebay_price: int | None,
-):
-    # --- Title ---
-    if ebay_title:
-        posh_page.fill("input[data-vv-name='title']", ebay_title[:80])
-
-    # --- Description ---
-    if ebay_description:
-        posh_page.fill(
-            "textarea[data-vv-name='description']",
-            ebay_description[:1500],
+        hrefs = page.eval_on_selector_all(
+            "a[href*='/itm/']",
+            "els => els.map(el => el.href)",
         )
 
-    # --- Size: use Custom field and inject eBay size ---
-    if ebay_size:
-        # 1) Open the size dropdown
-        size_dropdown = posh_page.locator("div.dropdown[selectortestlocator='size']")
-        size_dropdown.wait_for(state="visible", timeout=10000)
-        size_dropdown.click()
+        added = 0
+        for href in hrefs:
+            item_id = ebay_item_id(href)
+            if not item_id or item_id in seen_ids:
+                continue
+            seen_ids.add(item_id)
+            parts = urlsplit(href)
+            urls.append(f"{parts.scheme}://{parts.netloc}/itm/{item_id}")
+            added += 1
+
+        print(f"  Page {len(visited_pages)}: {added} new listings ({len(urls)} total)")
+
+        next_href = page.evaluate(
+            """() => {
+                const a = document.querySelector('a.pagination__next');
+                if (!a || a.getAttribute('aria-disabled') === 'true') return null;
+                return a.href || null;
+            }"""
+        )
+        if not next_href or next_href in visited_pages:
+            break
 
-        # 2) Click the "Custom" tab (if it's there)
         try:
-            posh_page.locator(
-                "a.navigation--horizontal__link span",
-                has_text="Custom",
-            ).first.click()
-        except Exception:
-            pass  # already on Custom
+            with metrics.span("ebay.goto", page="selling"):
+                navigate(page, next_href, wait_for="a[href*='/itm/']")
+        except PlaywrightTimeoutError:
+            metrics.incr("timeouts")
+            break
 
-        # 3) Wait for custom size input
-        posh_page.wait_for_selector("div.listing-editor__custom_sizes", timeout=10000)
-        size_input = posh_page.wait_for_selector("#customSizeInput0", timeout=10000)
+    return urls
 
-        # 4) Fill size with subtle suffix so Posh accepts it
-        clean_size = f"{ebay_size} – tag"
-        size_input.fill(clean_size)
 
-        # 5) Click the Save button (next to the input)
-        posh_page.locator(
-            "div.listing-editor__custom_sizes button.btn.btn--secondary"
-        ).first.click()
+@metrics.traced("ebay.extract")
+def extract_ebay_listing(page) -> EbayListing:
+    """Read the fields the Poshmark form needs from an open eBay item page."""
+    listing = extract_listing_from_page(page, item_id=ebay_item_id(page.url))
+    listing.print_summary()
+    return listing
 
-        # 6) Click the blue Done button to close the size dialog
-        done_button = posh_page.locator(
-            "div[selectortestlocator='size'] button.btn.btn--primary[data-et-name='apply']"
-        )
-        done_button.wait_for(state="visible", timeout=10000)
-        done_button.click()
-        print("✓ Size set and Done clicked")
-
-        # tiny pause so the dialog can animate closed
-        posh_page.wait_for_timeout(300)
-    else:
-        raise RuntimeError("No eBay size found; cannot create a valid Poshmark listing.")
-
-    code = map_ebay_condition_to_posh_code(ebay_condition)
-    if code:
-        # Open the condition dropdown (the element itself has data-test="dropdown")
-        cond_dropdown = posh_page.locator(
-            "div.dropdown.listing-editor__input--half[menuclickdismiss]"
-        )
-        cond_dropdown.first.wait_for(state="visible", timeout=10000)
-        cond_dropdown.first.click()
 
-        # Click the appropriate condition option
-        posh_page.click(
-            f"div[data-et-name='listing_condition'][data-et-prop-content='{code}']"
-        )
+@metrics.traced("posh.closet_scan")
+def scan_posh_closet(posh_page, closet_index: ClosetIndex, full_rescan: bool = False,
+                     stall_timeout_ms: int | None = None, mode: str | None = None) -> list[str]:
+    """Bring the closet index up to date and return every known closet title (poshmark.py)."""
+    return poshmark.run(posh_page, poshmark.scan_closet(closet_index, full_rescan,
+                                                        stall_timeout_ms, mode))
 
-    # --- Price ---
-    if ebay_price is not None:
-        posh_page.fill(
-            "input[data-vv-name='listingPrice']",
-            str(ebay_price),
-        )
-        # Click the Done button inside the Add Price modal
-        posh_page.click(
-            "div[data-test='modal-container'].listing-price-suggestion-modal "
-            "div[data-test='modal-footer'] button.btn--primary"
-        )
-        print("✓ Price set and Done clicked")
 
+@metrics.traced("posh.create_listing")
+def create_posh_listing(posh_page, listing: EbayListing, cache: ListingCache, on_stage=None):
+    """
+    Download the eBay photos and walk the Poshmark Create Listing form.
+    `on_stage(stage)` is called as "images_ready", "uploaded" and "listed"
+    are reached (see job_ledger.py). Raises RuntimeError if the listing
+    was not created.
+    """
+    # Download + process the listing's carousel images
+    jpg_files = download_ebay_images(listing.image_urls, listing.title, cache, listing.item_id)
+    if on_stage is not None:
+        on_stage("images_ready")
+    poshmark.run(posh_page, poshmark.fill_listing_form(listing, jpg_files, on_stage))
 
-def map_ebay_condition_to_posh_code(ebay_condition: str) -> str | None:
-    if not ebay_condition:
-        return None
 
-    text = ebay_condition.lower()
+def crosslist_listing(listing: EbayListing, posh_page, title_index: TitleIndex,
+                      closet_index: ClosetIndex, cache: ListingCache, on_stage=None) -> str:
+    """
+    Crosslist one extracted eBay listing.
 
-    # Very rough but practical mappings – expand as needed
-    if "new with tags" in text or "new-with-tags" in text:
-        return "nwt"   # New With Tags
-    if "new without tags" in text or "new without tag" in text or "like new" in text or "excellent" in text:
-        return "uln"   # Like New
-    if "good" in text or "gently used" in text:
-        return "ug"    # Good
-    if "fair" in text or "visible wear" in text or "some wear" in text:
-        return "uf"    # Fair
+    Returns "exists" if the title is already in the closet, "created" once
+    "List This Item" was clicked; raises if the listing was not created.
+    Only then is the title added to `title_index` and recorded in the
+    closet index, so later listings (and later runs) see it without
+    rescanning the closet. `on_stage` is passed to create_posh_listing.
+    """
+    matches = title_index.match(listing.title)
+    if matches:
+        print("\nRESULT: Listing FOUND in Poshmark closet.")
+        print("Matching titles:")
+        for m in matches:
+            print(f"  - {m.title}  [{m.kind}, {m.score:.2f}]")
+        return "exists"
+
+    print("\nRESULT: Listing NOT found in Poshmark closet.")
+    create_posh_listing(posh_page, listing, cache, on_stage)
+    title_index.add(listing.title)
+    closet_index.add_created(listing.title)
+    return "created"
+
+
+def resumed_listing(entry: "LedgerEntry", cache: ListingCache) -> EbayListing | None:
+    """The listing an earlier, interrupted batch already extracted, if it is cached."""
+    if not entry.reached("extracted"):
+        return None
+    cached = cache.get_listing(entry.key)
+    return cached.listing if cached is not None else None
+
+
+@metrics.traced("ebay.prefetch_http")
+def prefetch_listings_http(listing_urls: list[str], cache: ListingCache) -> list:
+    """HTTP backend: extract every listing concurrently before the Poshmark work."""
+    from ebay_http import fetch_listings
+
+    print(f"\nExtracting {len(listing_urls)} listings over HTTP "
+          f"({config.EXTRACT_CONCURRENCY} at a time)...")
+    start = time.perf_counter()
+    listings = fetch_listings(
+        listing_urls,
+        item_ids=[ebay_item_id(u) for u in listing_urls],
+        workers=config.EXTRACT_CONCURRENCY,
+        cache=cache,
+        max_age=config.LISTING_CACHE_TTL,
+    )
+    ok = sum(isinstance(l, EbayListing) for l in listings)
+    print(f"Extracted {ok}/{len(listings)} listings in {time.perf_counter() - start:.1f}s")
+    return listings
 
-    # default: Good
-    return "ug"
 
-def set_posh_category(posh_page, main_cat: str, cat_label: str) -> bool:
+def pending_listing_urls(listing_urls: list[str], ledger: "JobLedger", limit: int | None = None,
+                         shard: tuple[int, int] | None = None) -> list[str]:
+    """
+    Keep this worker's shard (K, N) of the listings, drop the ones an earlier
+    batch finished (listed or found in the closet), then apply limit.
     """
-    Set Poshmark category to:
+    from job_ledger import ledger_key
+
+    if shard is not None:
+        k, n = shard
+        listing_urls = [u for u in listing_urls if shard_of(ledger_key(u, ebay_item_id(u)), n) == k]
+        print(f"Shard {k}/{n}: {len(listing_urls)} listings")
+    done = ledger.done_keys()
+    pending = [u for u in listing_urls if ledger_key(u, ebay_item_id(u)) not in done]
+    if len(pending) < len(listing_urls):
+        print(f"Skipping {len(listing_urls) - len(pending)} listings finished by an "
+              f"earlier batch (job ledger: {ledger.path.name})")
+    return pending[:limit] if limit is not None else pending
+
+
+def run_batch(page, posh_page, closet_index: ClosetIndex, cache: ListingCache,
+              ledger: "JobLedger", limit: int | None = None, full_rescan: bool = False,
+              backend: str = "browser", shard: tuple[int, int] | None = None,
+              guard: "MemoryGuard | None" = None):
+    """
+    Crosslist every eBay active listing using the already-open pages.
+    Progress is recorded in `ledger`, so a restarted batch resumes where
+    this one stopped.
+
+    Both tabs are replaced every PAGE_RECYCLE_LISTINGS listings, or sooner
+    when `guard` is over its memory ceiling. If fresh tabs don't bring memory
+    under the ceiling, the batch stops early with guard.restart_needed set,
+    for the caller to restart the browser and run it again.
+    """
+    from job_ledger import ledger_key
+    from memory_guard import MemoryGuard, chromium_metrics, recycle_pages
+    from net_policy import get_net_policy, navigate
 
-        <main_cat> > <cat_label>
+    run_start = time.perf_counter()
+    guard = guard or MemoryGuard.from_config()
 
-    Example: "Men" > "Shirts", "Women" > "Jeans".
+    print("\nCollecting eBay active listings (all pages)...")
+    listing_urls = pending_listing_urls(collect_active_listing_urls(page), ledger, limit, shard)
+    print(f"\n{len(listing_urls)} listings to process.")
 
-    Returns True if both clicks succeed, False otherwise.
-    """
+    title_index = TitleIndex(
+        scan_posh_closet(posh_page, closet_index, full_rescan=full_rescan),
+        threshold=config.TITLE_MATCH_THRESHOLD,
+    )
 
-    if not main_cat or not cat_label:
-        print("Missing main_cat or cat_label for Posh category.")
-        return False
+    prefetched = {}
+    if backend == "http":
+        # Listings an interrupted batch already extracted come from the cache
+        to_fetch = []
+        for url in listing_urls:
+            entry = ledger.get(ledger_key(url, ebay_item_id(url)))
+            if entry is None or not entry.reached("extracted"):
+                to_fetch.append(url)
+        prefetched = dict(zip(to_fetch, prefetch_listings_http(to_fetch, cache)))
+
+    results = {"created": 0, "exists": 0, "failed": 0}
+    on_pages = 0  # listings since the tabs were opened
+    for n, url in enumerate(listing_urls, start=1):
+        if on_pages >= config.PAGE_RECYCLE_LISTINGS or guard.over_ceiling():
+            with metrics.span("browser.recycle"):
+                page, posh_page = recycle_pages(page, posh_page)
+            guard.recycled()
+            on_pages = 0
+            if guard.over_ceiling():
+                print("\nStill over MEMORY_CEILING_MB with fresh tabs; "
+                      "stopping to restart the browser.")
+                guard.restart_needed = True
+                break
+        print(f"\n=== [{n}/{len(listing_urls)}] {url} ===")
+        item_start = time.perf_counter()
+        key = ledger_key(url, ebay_item_id(url))
+        entry = ledger.start(key, url)
+        with metrics.span("listing", item_id=ebay_item_id(url)) as listing_span:
+            try:
+                listing = resumed_listing(entry, cache)
+                if listing is not None:
+                    print(f"(resuming after {entry.stage} — page not reopened)")
+                    listing.print_summary()
+                elif url in prefetched:
+                    listing = prefetched[url]
+                    if isinstance(listing, Exception):
+                        raise listing
+                    listing.print_summary()
+                else:
+                    listing = cache.fresh_listing(ebay_item_id(url), config.LISTING_CACHE_TTL)
+                    if listing is not None:
+                        print("(cached listing — page not reopened)")
+                        listing.print_summary()
+                    else:
+                        with metrics.span("ebay.goto", page="item"):
+                            navigate(page, url)
+                        listing = extract_ebay_listing(page)
+                        cache.put_listing(listing)
+                if not entry.reached("extracted"):
+                    ledger.advance(key, "extracted", listing.title)
+
+                status = crosslist_listing(listing, posh_page, title_index, closet_index, cache,
+                                           on_stage=lambda stage: ledger.advance(key, stage))
+                if status == "exists":
+                    ledger.advance(key, "exists")
+            except Exception as e:
+                print(f"✗ Listing failed: {e}")
+                ledger.fail(key, f"{type(e).__name__}: {e}")
+                status = "failed"
+            listing_span.set(status=status)
+        results[status] += 1
+        metrics.incr(f"listings_{status}")
+        print(f"--- {status} in {time.perf_counter() - item_start:.1f}s")
+        on_pages += 1
+        if guard.snapshot_due(n):
+            guard.record(n, chromium_metrics(posh_page))
+
+    elapsed = time.perf_counter() - run_start
+    processed = sum(results.values())
+    rate = processed / (elapsed / 60) if elapsed > 0 else 0.0
+    print(
+        f"\nBATCH DONE: {processed} listings in {elapsed:.1f}s "
+        f"({rate:.2f} listings/min) — "
+        f"created {results['created']}, already listed {results['exists']}, "
+        f"failed {results['failed']}"
+    )
+    cache.print_stats()
+    get_net_policy().print_stats()
+    guard.print_report()
+    ledger.print_report()
+    return results
 
-    print(f"Setting Poshmark category → {main_cat} > {cat_label}")
 
-    # Open the category dropdown
-    try:
-        posh_page.click("div.listing-editor__category-container [data-test='dropdown']")
-    except Exception as e:
-        print(f"✗ Could not open category dropdown: {e}")
-        return False
+SUBCOMMANDS = ("crosslist", "scan-closet", "plan", "report", "classify", "process-images")
 
-    main_key = (main_cat or "").strip().lower()
 
-    # --- 1) Click Men / Women (top-level) ---
-    try:
-        if main_key == "men":
-            posh_page.click("a.dropdown__link.dropdown__menu__item[data-et-name='men']")
-        elif main_key == "women":
-            posh_page.click("a.dropdown__link.dropdown__menu__item[data-et-name='women']")
-        else:
-            main_re = re.compile(rf"^\s*{re.escape(main_cat)}\s*$")
-            posh_page.locator(
-                "a.dropdown__link.dropdown__menu__item p",
-                has_text=main_re,
-            ).first.click()
-    except Exception as e:
-        print(f"✗ Failed to click main category {main_cat}: {e}")
-        return False
-
-    # Give Posh a moment to update the second list after choosing Men/Women
-    posh_page.wait_for_timeout(200)
-
-    # --- 2) Click the main category under that department (Shirts, Jeans, etc.) ---
-    try:
-        cat_re = re.compile(rf"^\s*{re.escape(cat_label)}\s*$")
-        posh_page.locator(
-            "li.dropdown__link.dropdown__menu__item div",
-            has_text=cat_re,
-        ).first.click()
-    except Exception as e:
-        print(f"✗ Could not click category {cat_label}: {e}")
-        return False
-
-    # (Optional) Close the dropdown so it’s not hovering
-    try:
-        posh_page.keyboard.press("Escape")
-    except Exception:
-        pass
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Crosslist eBay active listings to Poshmark.",
+        epilog="Without a subcommand, the arguments are passed to crosslist.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    crosslist = sub.add_parser("crosslist", help="crosslist the first (or, with --batch, "
+                                                 "every) eBay active listing")
+    crosslist.add_argument(
+        "--batch",
+        action="store_true",
+        help="process every eBay active listing (all pages) in one browser session",
+    )
+    crosslist.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="with --batch, stop after this many listings",
+    )
+    crosslist.add_argument(
+        "--restart",
+        action="store_true",
+        help="with --batch, forget the job ledger and process every listing again "
+             "instead of resuming",
+    )
+    crosslist.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="K/N",
+        help="with --batch, only process the listings whose item-ID hash falls in "
+             "shard K of N (set by shard_runner.py)",
+    )
+    crosslist.add_argument(
+        "--full-rescan",
+        action="store_true",
+        help="scroll the whole Poshmark closet instead of only the new items",
+    )
+    crosslist.add_argument(
+        "--extract-backend",
+        choices=("browser", "http"),
+        default=None,
+        help="read eBay item pages in the browser tab or over plain HTTP "
+             "(default: $EXTRACT_BACKEND or browser)",
+    )
+    crosslist.add_argument(
+        "--engine",
+        choices=("sync", "async"),
+        default=None,
+        help="async overlaps extraction, closet scan and image downloads across "
+             "listings; without --batch it handles the first listing only "
+             "(default: $ENGINE or sync)",
+    )
 
-    return True
+    scan = sub.add_parser("scan-closet", help="refresh the local Poshmark closet index")
+    scan.add_argument(
+        "--full-rescan",
+        action="store_true",
+        help="scroll the whole closet and drop sold/deleted items from the index",
+    )
 
-def get_ebay_description(page) -> str:
-    """Extracts description text from the iframe with id='desc'."""
-    try:
-        frame = page.frame(name="desc") or page.frame(url=re.compile(".*desc.*"))
-        if not frame:
-            print("[desc] iframe #desc not found.")
-            return ""
-
-        desc = frame.eval_on_selector(
-            ".x-item-description-child",
-            "el => el.innerText.trim()"
+    plan = sub.add_parser("plan", help="dry run: list every eBay active listing and print "
+                                       "which ones a batch would create, skip or flag")
+    plan.add_argument("--out", type=Path, default=None,
+                      help="also write the plan as tab-separated rows to this file")
+    plan.add_argument("--no-closet-scan", action="store_true",
+                      help="plan against the closet index as it is, without topping it up")
+    plan.add_argument("--show", type=int, default=20,
+                      help="listings printed per section (default: 20)")
+
+    for p in (crosslist, scan, plan):
+        p.add_argument(
+            "--trace",
+            action="store_true",
+            default=None,
+            help="time every stage and write JSONL + Prometheus metrics to "
+                 "$METRICS_DIR (default: metrics/)",
         )
 
-        if desc:
-            print("[desc] Description found inside iframe #desc.")
-            return desc
-
-        print("[desc] .x-item-description-child not found inside iframe.")
-        return ""
-
-    except Exception as e:
-        print(f"[desc] Error extracting description: {e}")
-        return ""
-
-def download_ebay_images(page, ebay_title: str):
-    # Get image URLs only from the FIRST carousel container
-    img_urls = page.eval_on_selector(
-        ".ux-image-carousel.img-transition-medium",  # first match only
-        """(container) => {
-            const items = container.querySelectorAll('.ux-image-carousel-item');
-            return Array.from(items)
-                .map(item => item.firstChild && item.firstChild.currentSrc)
-                .filter(src => !!src);
-        }"""
-    )
-
-    if not img_urls:
-        print("\nNo images found in the FIRST eBay carousel.")
-        return
+    report = sub.add_parser("report", help="show batch progress and the failed listings "
+                                           "by stage, from the job ledger")
+    report.add_argument("--clear", action="store_true",
+                        help="forget all recorded progress afterwards")
 
-    print("\nFound the following image URLs on the eBay listing:")
-    for u in img_urls:
-        print("  -", u)
+    classify = sub.add_parser(
+        "classify",
+        help="show the Poshmark category (and condition) for eBay listing fields",
+    )
+    classify.add_argument("category", help="eBay category text, or - to read "
+                                           "tab-separated category/title/department lines from stdin")
+    classify.add_argument("--title", default="", help="eBay listing title")
+    classify.add_argument("--department", default="", help="eBay Department item specific")
+    classify.add_argument("--condition", default="", help="eBay condition text")
+
+    images = sub.add_parser("process-images",
+                            help="make Poshmark-ready photos (square, top-anchored JPEG)")
+    images.add_argument("files", nargs="+", type=Path, help="photos to process")
+    images.add_argument("--out", type=Path, default=None,
+                        help="output folder (default: next to each photo, as <name>_posh.jpg)")
+    images.add_argument("--profile", choices=list(PROFILES), default=None,
+                        help="output profile (default: $IMAGE_PROFILE or poshmark)")
+    images.add_argument("--max-edge", type=int, default=None,
+                        help="cap the square's side at this many pixels (0: no cap)")
+    images.add_argument("--quality", type=int, default=None, help="JPEG quality")
+
+    if argv is None:
+        import sys
+        argv = sys.argv[1:]
+    if not argv or (argv[0] not in SUBCOMMANDS and argv[0] not in ("-h", "--help")):
+        argv = ["crosslist", *argv]
+    return parser.parse_args(argv)
+
+
+def browser_launch_options() -> dict:
+    """launch_persistent_context() arguments, shared by the sync and async engines."""
+    return dict(
+        user_data_dir=str(config.PROFILE_DIR),
+        headless=config.HEADLESS,
+        accept_downloads=True,
+        downloads_path=str(config.DOWNLOAD_DIR),
+        args=["--start-maximized"],
+    )
 
-    save_dir = DOWNLOAD_DIR
 
-    print(f"\nDownloading {len(img_urls)} images to: {save_dir}")
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "classify":
+        return classify_command(args)
+    if args.command == "process-images":
+        return process_images_command(args)
+    if args.command == "report":
+        return report_command(args)
+
+    config.require_urls()
+    if args.trace is None:
+        args.trace = config.TRACE
+    if args.trace:
+        metrics.enable(config.METRICS_DIR)
+    try:
+        if args.command == "scan-closet":
+            return scan_closet_command(args)
+        if args.command == "plan":
+            return plan_command(args)
+        args.extract_backend = args.extract_backend or config.EXTRACT_BACKEND
+        args.engine = args.engine or config.ENGINE
+        if args.engine == "async":
+            import asyncio, sys
+            # async_engine imports from this module; reuse it when run as a script
+            sys.modules.setdefault("ebay_open", sys.modules[__name__])
+            from async_engine import run_async
+            asyncio.run(run_async(args))
+        else:
+            run(args)
+    finally:
+        metrics.finish()
+
+
+def classify_command(args):
+    """Print the Poshmark category for one listing, or for TSV rows on stdin."""
+    if args.category == "-":
+        import sys
+        rows = []
+        for line in sys.stdin:
+            fields = line.rstrip("\n").split("\t")
+            rows.append((fields + ["", "", ""])[:3])
+        for (category, title, _), (main_cat, cat_label) in zip(rows, classify_many(rows)):
+            print(f"{main_cat} > {cat_label}\t{category}\t{title}")
+        return
 
-    for idx, url in enumerate(img_urls, start=1):
-        ext = url.split("?")[0].split(".")[-1].lower()
-        if ext not in {"jpg", "jpeg", "png", "gif", "webp"}:
-            ext = "jpg"
+    main_cat, cat_label = map_ebay_category_to_posh(args.category, args.title, args.department)
+    print(f"Category:  {main_cat} > {cat_label}")
+    if args.condition:
+        print(f"Condition: {map_ebay_condition_to_posh_code(args.condition)}")
 
-        filename = save_dir / f"{sanitize_for_filename(ebay_title)}_{idx:02d}.{ext}"
 
+def process_images_command(args):
+    """Square-crop and JPEG-encode local photos with the listing image pipeline."""
+    profile = get_profile(
+        args.profile or config.IMAGE_PROFILE,
+        config.IMAGE_MAX_EDGE if args.max_edge is None else args.max_edge,
+        config.IMAGE_QUALITY if args.quality is None else args.quality,
+    )
+    if args.out is not None:
+        args.out.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    pool = get_process_pool()
+    futures = []
+    for path in args.files:
+        out_dir = args.out or path.parent
+        out_path = out_dir / f"{path.stem}_posh.jpg"
+        futures.append((path, pool.submit(process_image, path, out_path,
+                                          keep_source=True, profile=profile)))
+
+    failed = 0
+    for path, future in futures:
         try:
-            resp = requests.get(url, timeout=30)
-            resp.raise_for_status()
-            with open(filename, "wb") as f:
-                f.write(resp.content)
-            print(f"  ✓ Saved {filename.name}")
-
-            # Convert WEBP → JPG if needed
-            filename = convert_webp_to_jpg(filename)
-            
-            # Ensure 1:1 ratio, top-anchored crop
-            filename = make_square_top_crop(filename)
+            out_path, seconds = future.result()
+            print(f"  ✓ {path.name} → {out_path} "
+                  f"({out_path.stat().st_size / 1024:.0f} KB, {seconds:.2f}s)")
         except Exception as e:
-            print(f"  ✗ Failed to download {url}: {e}")
+            print(f"  ✗ {path.name}: {e}")
+            failed += 1
+    print(f"Processed {len(futures) - failed}/{len(futures)} photos ({profile.name}) "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 1 if failed else None
 
 
-def main():
-    PROFILE_DIR.mkdir(exist_ok=True)
-    DOWNLOAD_DIR.mkdir(exist_ok=True)
+def report_command(args):
+    """Print the job ledger: listings per stage and every failure with its reason."""
+    from job_ledger import JobLedger
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch_persistent_context(
-            user_data_dir=str(PROFILE_DIR),
-            headless=False,
-            accept_downloads=True,
-            downloads_path=str(DOWNLOAD_DIR),
-            args=["--start-maximized"],
-        )
+    if not config.LEDGER_PATH.exists():
+        print(f"No job ledger yet ({config.LEDGER_PATH}); run a --batch first.")
+        return
+    ledger = JobLedger(config.LEDGER_PATH)
+    ledger.print_report()
+    if args.clear:
+        print(f"\nCleared {ledger.reset()} ledger entries.")
+    ledger.close()
 
-        # Use existing page or new one
-        page = browser.pages[0] if browser.pages else browser.new_page()
 
-        # STEP 1: Go to eBay Active Listings
-        print(f"Opening eBay Active Listings page: {EBAY_SELLING_URL}")
-        page.goto(EBAY_SELLING_URL, wait_until="domcontentloaded")
+def scan_closet_command(args):
+    """Open the Poshmark closet in the persistent profile and refresh the index."""
+    from playwright.sync_api import sync_playwright
 
-        try:
-            page.wait_for_selector("a[href*='/itm/']", timeout=15000)
-        except PlaywrightTimeoutError:
-            print("\nNo listing links found on the eBay Active Listings page.")
-            print("Make sure you're logged in and have active listings.")
-            input("\nPress ENTER to close browser...")
-            browser.close()
-            return
+    config.PROFILE_DIR.mkdir(exist_ok=True)
+    config.DOWNLOAD_DIR.mkdir(exist_ok=True)
+    with sync_playwright() as p:
+        with metrics.span("browser.launch"):
+            browser = p.chromium.launch_persistent_context(**browser_launch_options())
+        route_policy = RoutePolicy.from_config()
+        if route_policy is not None:
+            route_policy.install(browser)
+        posh_page = browser.pages[0] if browser.pages else browser.new_page()
+
+        closet_index = ClosetIndex(config.CLOSET_INDEX_PATH)
+        scan_posh_closet(posh_page, closet_index, full_rescan=args.full_rescan)
+        closet_index.close()
+        browser.close()
 
-        # Click first listing
-        first_listing = page.locator("a[href*='/itm/']").first
-        first_listing.click()
-        page.wait_for_load_state("domcontentloaded")
-
-        # Get title of eBay listing
-        ebay_title = (
-            page.locator(
-                "h1.x-item-title__mainTitle span.ux-textspans--BOLD"
-            )
-            .first.inner_text()
-            .strip()
-        )
-        print(f"\nEBAY LISTING TITLE:\n{ebay_title}")
-        
-        # Department (Men, Women, etc.)
-        try:
-            ebay_department = page.eval_on_selector(
-                "dl.ux-labels-values--department dd .ux-textspans",
-                "el => el.textContent.trim()"
-            )
-        except Exception:
-            ebay_department = None
 
-        print(f"EBAY DEPARTMENT: {ebay_department}")
+def plan_command(args):
+    """
+    Enumerate Active Listings and print the reconciliation plan against the
+    closet and the job ledger, without opening any item page or form.
+    """
+    import sys
+    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+    from job_ledger import JobLedger
+    from net_policy import navigate
 
-        # Size (e.g. S, M, L, 10, 32x32, etc.)
-        try:
-            ebay_size = page.eval_on_selector(
-                "dl.ux-labels-values--size dd .ux-textspans",
-                "el => el.textContent.trim()"
-            )
-        except Exception:
-            ebay_size = None
+    # inventory imports from this module; reuse it when run as a script
+    sys.modules.setdefault("ebay_open", sys.modules[__name__])
+    from inventory import enumerate_inventory, print_plan, reconcile, write_plan_tsv
 
-        print(f"EBAY SIZE: {ebay_size}")
-        
-        # Condition (e.g. "New with tags", "Pre-owned", "Excellent", etc.)
-        try:
-            ebay_condition = page.eval_on_selector(
-                "dl.ux-labels-values--condition dd .ux-textspans",
-                "el => el.textContent.trim()"
-            )
-        except Exception:
-            ebay_condition = None
+    config.PROFILE_DIR.mkdir(exist_ok=True)
+    config.DOWNLOAD_DIR.mkdir(exist_ok=True)
+    with sync_playwright() as p:
+        with metrics.span("browser.launch"):
+            browser = p.chromium.launch_persistent_context(**browser_launch_options())
+        route_policy = RoutePolicy.from_config()
+        if route_policy is not None:
+            route_policy.install(browser)
+        page = browser.pages[0] if browser.pages else browser.new_page()
 
-        print(f"EBAY CONDITION: {ebay_condition}")
-        
-        # Price → int
+        with metrics.span("ebay.goto", page="selling"):
+            navigate(page, config.EBAY_SELLING_URL)
         try:
-            raw_price = page.eval_on_selector(
-                "div.x-price-primary .ux-textspans",
-                "el => el.textContent.trim()"
-            )
-            ebay_price = int(round(float(re.sub(r'[^0-9.]', '', raw_price))))
-        except Exception:
-            ebay_price = None
+            page.wait_for_selector("a[href*='/itm/']", timeout=15000)
+        except PlaywrightTimeoutError:
+            metrics.incr("timeouts")
+            print("No listing links found on the eBay Active Listings page; "
+                  "make sure you're logged in and have active listings.")
+            browser.close()
+            return 1
 
-        print(f"EBAY PRICE INT: {ebay_price}")
+        items = enumerate_inventory(page, config.INVENTORY_CONCURRENCY)
+        closet_index = ClosetIndex(config.CLOSET_INDEX_PATH)
+        if args.no_closet_scan:
+            closet_titles = closet_index.titles()
+        else:
+            closet_titles = scan_posh_closet(browser.new_page(), closet_index, full_rescan=False)
+        closet_index.close()
+        browser.close()
 
-        # Get eBay description from iframe #desc
-        ebay_description = get_ebay_description(page)
-        print(f"\nEBAY DESCRIPTION (first 200 chars): {ebay_description[:200]!r}")
+    listed = set()
+    if config.LEDGER_PATH.exists():
+        ledger = JobLedger(config.LEDGER_PATH)
+        listed = ledger.done_keys()
+        ledger.close()
 
-        # Get eBay category from last breadcrumb item
-        ebay_category = page.eval_on_selector(
-            "nav.breadcrumbs ul li:last-child span",
-            "el => el.textContent.trim()"
-        )
-        print(f"\nEBAY CATEGORY: {ebay_category}")
-        print(f"\nEBAY LISTING TITLE:\n{ebay_title}")
-        print(f"\nEBAY DESCRIPTION (truncated):\n{ebay_description[:200]}")
+    plan = reconcile(items, closet_titles, config.TITLE_MATCH_THRESHOLD,
+                     config.PLAN_SIMILAR_THRESHOLD, listed_ids=listed)
+    print_plan(plan, show=args.show)
+    if args.out is not None:
+        write_plan_tsv(plan, args.out)
+        print(f"Plan written to {args.out}")
 
-        # STEP 2: Open Poshmark closet
-        print(f"\nOpening Poshmark closet: {POSH_CLOSET_URL}")
-        posh_page = browser.new_page()
-        posh_page.goto(POSH_CLOSET_URL, wait_until="domcontentloaded")
 
-        # STEP 3: Scroll down until no more items load
-        print("\nScrolling Poshmark closet to load all items...")
-        previous_height = 0
+def run(args):
+    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+    from ebay_http import fetch_listing
+    from job_ledger import JobLedger
+    from memory_guard import MemoryGuard
+    from net_policy import get_net_policy, navigate
 
-        while True:
-            posh_page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            posh_page.wait_for_timeout(1500)
+    config.PROFILE_DIR.mkdir(exist_ok=True)
+    config.DOWNLOAD_DIR.mkdir(exist_ok=True)
 
-            current_height = posh_page.evaluate("document.body.scrollHeight")
+    with sync_playwright() as p:
+        with metrics.span("browser.launch"):
+            browser = p.chromium.launch_persistent_context(**browser_launch_options())
 
-            if current_height == previous_height:
-                print("Reached bottom of closet — all items should be loaded.")
-                break
+        # Abort ads, trackers, fonts, video and thumbnails the script never reads
+        route_policy = RoutePolicy.from_config()
+        if route_policy is not None:
+            route_policy.install(browser)
 
-            previous_height = current_height
+        # Use existing page or new one
+        page = browser.pages[0] if browser.pages else browser.new_page()
 
-        # STEP 4: Collect all card titles (a.tile__title)
-        title_loc = posh_page.locator("a.tile__title")
-        titles = [el.inner_html().strip() for el in title_loc.all()]
-        total_listings = len(titles)
-        print(f"\nTotal listing cards detected: '{total_listings}'")
+        # STEP 1: Go to eBay Active Listings
+        print(f"Opening eBay Active Listings page: {config.EBAY_SELLING_URL}")
+        with metrics.span("ebay.goto", page="selling"):
+            navigate(page, config.EBAY_SELLING_URL)
 
-        # STEP 5: Check if eBay title is already present in Poshmark titles
-        ebay_norm = ebay_title.lower().strip()
-        print("### TITLE ###" + ebay_norm)
+        try:
+            page.wait_for_selector("a[href*='/itm/']", timeout=15000)
+        except PlaywrightTimeoutError:
+            metrics.incr("timeouts")
+            print("\nNo listing links found on the eBay Active Listings page.")
+            print("Make sure you're logged in and have active listings.")
+            input("\nPress ENTER to close browser...")
+            browser.close()
+            return
 
-        matches = []
-        for t in titles:
-            t_norm = t.lower().strip()
-            if ebay_norm in t_norm or t_norm in ebay_norm:
-                matches.append(t)
+        posh_page = browser.new_page()
 
-        if matches:
-            print("\nRESULT: Listing FOUND in Poshmark closet.")
-            print("Matching titles:")
-            for m in matches:
-                print(f"  - {m}")
+        closet_index = ClosetIndex(config.CLOSET_INDEX_PATH)
+        cache = ListingCache(config.CACHE_DIR, config.CACHE_MAX_BYTES)
+
+        if args.batch:
+            ledger = JobLedger(config.LEDGER_PATH)
+            if args.restart:
+                ledger.reset()
+            guard = MemoryGuard.from_config()
+            limit = args.limit
+            while True:
+                results = run_batch(page, posh_page, closet_index, cache, ledger, limit=limit,
+                                    full_rescan=args.full_rescan, backend=args.extract_backend,
+                                    shard=args.shard, guard=guard)
+                if not guard.restart_needed:
+                    break
+                if not sum(results.values()):
+                    print("MEMORY_CEILING_MB is below what a fresh browser needs; stopping.")
+                    break
+                if limit is not None:
+                    limit -= sum(results.values())
+                    if limit <= 0:
+                        break
+                # A new browser process gives back what closing its tabs didn't;
+                # the ledger makes the next pass skip what this one finished
+                guard.restart_needed = False
+                browser.close()
+                with metrics.span("browser.launch"):
+                    browser = p.chromium.launch_persistent_context(**browser_launch_options())
+                if route_policy is not None:
+                    route_policy.install(browser)
+                page = browser.pages[0] if browser.pages else browser.new_page()
+                with metrics.span("ebay.goto", page="selling"):
+                    navigate(page, config.EBAY_SELLING_URL, wait_for="a[href*='/itm/']")
+                posh_page = browser.new_page()
+            if route_policy is not None:
+                route_policy.print_stats()
+            ledger.close()
+            cache.close()
+            closet_index.close()
+            browser.close()
+            return
 
+        first_listing = page.locator("a[href*='/itm/']").first
+        if args.extract_backend == "http":
+            url = first_listing.evaluate("a => a.href")
+            listing = fetch_listing(url, item_id=ebay_item_id(url),
+                                    cache=cache, max_age=config.LISTING_CACHE_TTL)
+            listing.print_summary()
         else:
-            print("\nRESULT: Listing NOT found in Poshmark closet.")
-
-            # Download images from the current eBay listing page
-            download_ebay_images(page, ebay_title)
-
-            # Navigate Poshmark tab to the Create Listing page
-            print(f"\nOpening Poshmark Create Listing page: {POSH_CREATE_URL}")
-            posh_page.goto(POSH_CREATE_URL, wait_until="domcontentloaded")
-
-            # Wait for the file input to exist
-            posh_page.wait_for_selector("#img-file-input", timeout=15000)
-
-            # Find all JPG files downloaded for this eBay listing
-            jpg_files = sorted(
-                DOWNLOAD_DIR.glob(f"{sanitize_for_filename(ebay_title)}_*.jpg")
-            )
-
-            if not jpg_files:
-                print("\nNo JPG files found to upload.")
-            else:
-                print(f"\nUploading {len(jpg_files)} images to Poshmark...")
-
-                # Upload directly to the file input (bypasses OS dialog)
-                posh_page.set_input_files(
-                    "#img-file-input",
-                    [str(path) for path in jpg_files],
-                )
-
-                print("✓ Upload complete")
-                # Wait for Apply button to appear in the popup and click it
-                try:
-                    posh_page.wait_for_selector("button[data-et-name='apply']", timeout=15000)
-                    posh_page.click("button[data-et-name='apply']")
-                    print("✓ Apply button clicked")
-                except Exception as e:
-                    print(f"✗ Failed to click Apply button: {e}")
-                    
-            main_cat, cat_label = map_ebay_category_to_posh(
-                ebay_category,
-                ebay_title,
-                ebay_department,
-            )
-
-            category_ok = set_posh_category(posh_page, main_cat, cat_label)
-            if not category_ok:
-                raise RuntimeError("Failed to set Poshmark category; cannot continue.")
-
-            fill_posh_fields_from_ebay(
-                posh_page,
-                ebay_title=ebay_title,
-                ebay_description=ebay_description,
-                ebay_size=ebay_size,
-                ebay_condition=ebay_condition,
-                ebay_price=ebay_price,
-            )
-            
-            # === Final Steps: Next → List This Item ===
-            try:
-                # Click the NEXT button after all fields are filled
-                posh_page.wait_for_selector("button[data-et-name='next']", timeout=15000)
-                posh_page.click("button[data-et-name='next']")
-                print("✓ Next button clicked")
-            except Exception as e:
-                print(f"✗ Failed to click Next button: {e}")
-
-            # LIST THIS ITEM
-            try:
-                posh_page.wait_for_selector("button[data-et-name='list']", timeout=15000)
-                posh_page.click("button[data-et-name='list']")
-                print("✓ List This Item clicked")
-            except Exception as e:
-                print(f"✗ Failed to click List This Item button: {e}")
+            # Click first listing
+            first_listing.click()
+            page.wait_for_load_state("domcontentloaded")
+            listing = extract_ebay_listing(page)
+            cache.put_listing(listing)
+
+        title_index = TitleIndex(
+            scan_posh_closet(posh_page, closet_index, full_rescan=args.full_rescan),
+            threshold=config.TITLE_MATCH_THRESHOLD,
+        )
+        try:
+            crosslist_listing(listing, posh_page, title_index, closet_index, cache)
+        except Exception as e:
+            print(f"✗ Listing failed: {e}")
+        cache.print_stats()
+        get_net_policy().print_stats()
+        if route_policy is not None:
+            route_policy.print_stats()
 
         print("\nReview the browser if you want. Press ENTER here to close...")
         input()
 
+        cache.close()
+        closet_index.close()
         browser.close()
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
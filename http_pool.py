@@ -0,0 +1,39 @@
+from typing import TYPE_CHECKING
+
+import config
+
+if TYPE_CHECKING:
+    import requests
+
+# Sent with every pooled request; eBay serves a stripped page to unknown clients
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36"
+)
+
+_http_session = None
+
+
+def make_http_session(pool_size: int) -> "requests.Session":
+    """A requests session keeping up to `pool_size` connections per host open."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max(1, pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = DEFAULT_USER_AGENT
+    return session
+
+
+def get_http_session() -> "requests.Session":
+    """
+    Process-wide requests session (keep-alive connection pool), shared by the
+    image downloader and the HTTP extraction backend. HTTP_POOL_SIZE sets how
+    many connections per host it keeps open (default 16).
+    """
+    global _http_session
+    if _http_session is None:
+        _http_session = make_http_session(config.HTTP_POOL_SIZE)
+    return _http_session
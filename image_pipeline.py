@@ -0,0 +1,206 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+import io, os, shutil, time
+
+import config
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+JPEG_QUALITY = 95
+
+
+class ImageProfile(NamedTuple):
+    """How upload JPEGs are encoded; passed to the worker processes as is."""
+    name: str
+    max_edge: int | None   # longest side in pixels; None keeps the source resolution
+    quality: int
+    progressive: bool
+    optimize: bool         # extra Huffman pass: smaller file, slower encode
+    strip_metadata: bool   # drop EXIF/XMP/comments (the ICC colour profile is kept)
+
+
+# Poshmark shows photos at up to about 1280 px and re-compresses uploads, so
+# larger or higher-quality files only cost upload time. Progressive encoding
+# is off by default: several times the encode time for a few percent of size.
+PROFILES = {
+    "original": ImageProfile("original", None, JPEG_QUALITY, False, False, True),
+    "poshmark": ImageProfile("poshmark", 1600, 88, False, True, True),
+    "small": ImageProfile("small", 1280, 82, False, True, True),
+    "small-progressive": ImageProfile("small-progressive", 1280, 82, True, True, True),
+}
+
+
+def get_profile(name: str, max_edge: int | None = None,
+                quality: int | None = None) -> ImageProfile:
+    """A named profile, optionally with its edge cap (0 = none) or quality overridden."""
+    try:
+        profile = PROFILES[name]
+    except KeyError:
+        raise ValueError(f"unknown image profile {name!r} "
+                         f"(choose from {', '.join(PROFILES)})") from None
+    if max_edge is not None:
+        profile = profile._replace(max_edge=max_edge or None)
+    if quality is not None:
+        profile = profile._replace(quality=quality)
+    return profile
+
+_process_pool = None
+
+def get_process_pool() -> "ProcessPoolExecutor":
+    """
+    Process pool shared by every listing in the run (created on first use).
+    Image decode/crop/encode is CPU-bound, so IMAGE_WORKERS defaults to one
+    worker per core.
+    """
+    global _process_pool
+    if _process_pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = config.IMAGE_WORKERS or os.cpu_count() or 1
+        _process_pool = ProcessPoolExecutor(max_workers=max(1, workers))
+    return _process_pool
+
+
+# --- Two-pass helpers (convert, then crop; each reopens the file) ---------
+
+def make_square_top_crop(image_path: Path):
+    """
+    Force image to 1:1 ratio by:
+    - Centering horizontally
+    - Anchoring at the TOP vertically
+    - Cropping off the bottom if needed
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(image_path) as src, src.convert("RGB") as img:
+            width, height = img.size
+
+            # Already square
+            if width == height:
+                return image_path
+
+            # Square side is the smaller dimension
+            side = min(width, height)
+
+            # Center horizontally
+            left = (width - side) // 2
+            right = left + side
+
+            # Anchor at TOP vertically: upper = 0, lower = side
+            upper = 0
+            lower = side
+
+            with img.crop((left, upper, right, lower)) as img_cropped:
+                img_cropped.save(image_path, "JPEG", quality=95)
+
+        print(f"  ✓ Cropped to 1:1 (top-anchored): {image_path.name}")
+        return image_path
+
+    except Exception as e:
+        print(f"  ✗ Failed to crop {image_path.name} to 1:1: {e}")
+        return image_path
+
+def convert_webp_to_jpg(image_path: Path):
+    if image_path.suffix.lower() != ".webp":
+        return image_path  # nothing to do
+
+    from PIL import Image
+
+    try:
+        jpg_path = image_path.with_suffix(".jpg")
+        with Image.open(image_path) as src, src.convert("RGB") as img:
+            img.save(jpg_path, "JPEG", quality=95)
+
+        image_path.unlink()  # remove original .webp
+
+        print(f"  ✓ Converted {image_path.name} → {jpg_path.name}")
+        return jpg_path
+
+    except Exception as e:
+        print(f"  ✗ Failed to convert {image_path.name}: {e}")
+        return image_path
+
+
+# --- Fused single-decode pipeline ------------------------------------------
+
+def square_top_box(width: int, height: int) -> tuple[int, int, int, int]:
+    """Crop box for a 1:1 square, centered horizontally and anchored at the top."""
+    side = min(width, height)
+    left = (width - side) // 2
+    return (left, 0, left + side, side)
+
+
+def process_image(raw_path: Path, out_path: Path, keep_source: bool = False,
+                  profile: ImageProfile = PROFILES["original"]) -> tuple[Path, float]:
+    """
+    Turn a downloaded image into the final upload JPEG in one pass:
+    read the bytes once, decode once, top-anchored square crop, encode once.
+
+    JPEG sources are decoded straight at the smallest DCT scale that still
+    covers `profile.max_edge` (Pillow draft mode), then resized down to it.
+    A source that is already a square JPEG that fits the profile, and has no
+    metadata to strip, is renamed into place untouched (no re-encode).
+    `raw_path` is removed once `out_path` is written, unless `keep_source`
+    is set.
+
+    Returns (out_path, seconds). Runs inside the process pool, so it only
+    raises; the caller does the printing.
+    """
+    from PIL import Image, ImageOps
+
+    start = time.perf_counter()
+    data = raw_path.read_bytes()
+
+    with Image.open(io.BytesIO(data)) as img:
+        width, height = img.size
+        side = min(width, height)
+        fits = profile.max_edge is None or side <= profile.max_edge
+        has_metadata = any(key in img.info for key in ("exif", "xmp", "comment"))
+
+        if (img.format == "JPEG" and width == height and fits
+                and not (profile.strip_metadata and has_metadata)):
+            if keep_source:
+                shutil.copyfile(raw_path, out_path)
+            elif raw_path != out_path:
+                raw_path.replace(out_path)
+            return out_path, time.perf_counter() - start
+
+        if not fits and img.format == "JPEG":
+            scale = profile.max_edge / side
+            img.draft("RGB", (max(1, round(width * scale)), max(1, round(height * scale))))
+
+        icc_profile = img.info.get("icc_profile")
+        exif = img.getexif()
+        rgb = img.convert("RGB")
+
+    if exif.get(0x0112, 1) != 1:
+        # Apply the camera's rotation flag before cropping: once EXIF is
+        # stripped nothing else would
+        rgb = ImageOps.exif_transpose(rgb)
+    if profile.strip_metadata:
+        exif = None
+
+    width, height = rgb.size
+    if width != height:
+        rgb = rgb.crop(square_top_box(width, height))
+    if profile.max_edge is not None and min(width, height) > profile.max_edge:
+        rgb = rgb.resize((profile.max_edge, profile.max_edge), Image.Resampling.BICUBIC,
+                         reducing_gap=2.0)
+
+    options = {}
+    if icc_profile:
+        options["icc_profile"] = icc_profile
+    if exif is not None:
+        exif.pop(0x0112, None)  # orientation already applied
+        options["exif"] = exif
+    rgb.save(out_path, "JPEG", quality=profile.quality, progressive=profile.progressive,
+             optimize=profile.optimize, **options)
+    rgb.close()
+
+    if raw_path != out_path and not keep_source:
+        raw_path.unlink(missing_ok=True)
+
+    return out_path, time.perf_counter() - start
@@ -0,0 +1,270 @@
+"""
+eBay inventory enumeration and the crosslist reconciliation plan.
+
+    python ebay_open.py plan [--out inventory.tsv]
+
+enumerate_inventory() reads every Active Listings page into one row per
+item (ID, title, price). The first page comes from the open, logged-in tab.
+The paging parameter is worked out from its "next" link, and the other
+pages are fetched over HTTP with the tab's cookies, INVENTORY_CONCURRENCY
+at a time. If those requests don't see the listings (a login wall, a
+client-rendered page), the rest is read page by page in the tab.
+
+reconcile() diffs the inventory against the closet titles without opening
+a single item page. Each item is planned as "create", "crosslisted" (a
+closet title matches, or the job ledger has it listed) or "duplicate" (an
+earlier eBay item has the same title, or a closet title is close without
+matching).
+"""
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, NamedTuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import csv, re, time
+
+from ebay_http import parse_html
+from ebay_open import ebay_item_id
+from http_pool import make_http_session
+from net_policy import get_net_policy, navigate
+from title_match import TitleIndex, normalize_title
+import metrics
+
+if TYPE_CHECKING:
+    import requests
+
+PRICE_RE = re.compile(r"\$\s?([\d,]+(?:\.\d{2})?)")
+
+# Pages past this are never requested (a paging parameter read wrong)
+MAX_PAGES = 2000
+
+
+class InventoryItem(NamedTuple):
+    item_id: str
+    title: str
+    price: str | None  # as shown, without "$" or thousands separators
+    url: str
+
+
+class PlanEntry(NamedTuple):
+    item: InventoryItem
+    action: str  # "create", "crosslisted" or "duplicate"
+    reason: str
+
+
+def parse_active_page(html: str, base_url: str) -> tuple[list[InventoryItem], str | None]:
+    """Rows of one Active Listings page and its "next" link (None on the last page)."""
+    root = parse_html(html)
+    parts = urlsplit(base_url)
+    items = {}
+    next_href = None
+    for node in root.descendants():
+        if node.tag != "a":
+            continue
+        href = node.attrs.get("href") or ""
+        if "pagination__next" in node.classes:
+            if href and node.attrs.get("aria-disabled") != "true":
+                next_href = urljoin(base_url, href)
+            continue
+        item_id = ebay_item_id(href)
+        if not item_id:
+            continue
+        title = " ".join(node.text_content().split())
+        known = items.get(item_id)
+        # An item can have several links (photo, title); keep the longest text
+        if known is not None and len(known.title) >= len(title):
+            continue
+        row = node.parent
+        while row is not None and row.tag not in ("tr", "li"):
+            row = row.parent
+        price = PRICE_RE.search((row or node.parent).text_content())
+        items[item_id] = InventoryItem(
+            item_id, title, price.group(1).replace(",", "") if price else None,
+            f"{parts.scheme}://{parts.netloc}/itm/{item_id}",
+        )
+    return list(items.values()), next_href
+
+
+def page_param(current_url: str, next_url: str) -> tuple[str, int, int] | None:
+    """
+    (query key, value on the current page, step) of the paging parameter,
+    from the current page's URL and its "next" link: page=2 → ("page", 1, 1),
+    offset=200 → ("offset", 0, 200). None if no numeric parameter advances.
+    """
+    current = dict(parse_qsl(urlsplit(current_url).query))
+    for key, value in parse_qsl(urlsplit(next_url).query):
+        if not value.isdigit():
+            continue
+        if current.get(key, "").isdigit():
+            start = int(current[key])
+        else:
+            start = 0 if "offset" in key.lower() or "start" in key.lower() else 1
+        if int(value) > start:
+            return key, start, int(value) - start
+    return None
+
+
+def nth_page_url(next_url: str, paging: tuple[str, int, int], n: int) -> str:
+    """URL of page n (1 = the first page) for paging from page_param()."""
+    key, start, step = paging
+    parts = urlsplit(next_url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query[key] = str(start + (n - 1) * step)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def cookie_session(cookies: list[dict], pool_size: int) -> "requests.Session":
+    """HTTP session carrying the browser context's cookies."""
+    session = make_http_session(pool_size)
+    for c in cookies:
+        session.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+    return session
+
+
+def fetch_pages_http(session, next_url: str, paging: tuple[str, int, int],
+                     workers: int) -> dict[int, list[InventoryItem]] | None:
+    """
+    Pages 2.. over HTTP, `workers` in flight, until one comes back without
+    rows or without a "next" link. None if page 2 has no rows (HTTP isn't
+    seeing the logged-in list) or a page can't be fetched.
+    """
+    def fetch(n: int):
+        url = nth_page_url(next_url, paging, n)
+        with metrics.span("ebay.inventory_page", page=n):
+            resp = get_net_policy().call(url, session.get, url, timeout=30)
+            resp.raise_for_status()
+            return parse_active_page(resp.text, resp.url)
+
+    pages = {}
+    last = MAX_PAGES
+    next_page = 2
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        in_flight = {}
+        while in_flight or next_page <= last:
+            while len(in_flight) < workers and next_page <= last:
+                in_flight[pool.submit(fetch, next_page)] = next_page
+                next_page += 1
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                n = in_flight.pop(future)
+                try:
+                    items, has_next = future.result()
+                except Exception as e:
+                    # A gap in the pages would drop listings; let the tab read them all
+                    print(f"Active Listings page {n} failed over HTTP: {e}")
+                    for other in in_flight:
+                        other.cancel()
+                    return None
+                if items:
+                    pages[n] = items
+                if not items or not has_next:
+                    last = min(last, n if items else n - 1)
+    if 2 not in pages:
+        return None
+    return {n: items for n, items in pages.items() if n <= last}
+
+
+def fetch_pages_browser(page, next_url: str) -> dict[int, list[InventoryItem]]:
+    """Pages 2.. in the tab, one at a time, following the "next" links."""
+    pages = {}
+    visited = set()
+    n = 2
+    while next_url and next_url not in visited and n <= MAX_PAGES:
+        visited.add(next_url)
+        with metrics.span("ebay.goto", page="selling"):
+            navigate(page, next_url, wait_for="a[href*='/itm/']")
+        pages[n], next_url = parse_active_page(page.content(), page.url)
+        n += 1
+    return pages
+
+
+@metrics.traced("ebay.inventory")
+def enumerate_inventory(page, workers: int) -> list[InventoryItem]:
+    """Every item on Active Listings; `page` is the tab showing the first page."""
+    start = time.perf_counter()
+    first, next_url = parse_active_page(page.content(), page.url)
+    pages = {1: first}
+    how = "1 page"
+    if next_url:
+        paging = page_param(page.url, next_url)
+        more = None
+        if paging is not None:
+            session = cookie_session(page.context.cookies(), workers)
+            more = fetch_pages_http(session, next_url, paging, workers)
+            how = f"{workers} pages at a time over HTTP"
+        if more is None:
+            print("Active Listings pages aren't readable over HTTP; reading them in the tab.")
+            more = fetch_pages_browser(page, next_url)
+            how = "one page at a time in the tab"
+        pages.update(more)
+
+    items, seen = [], set()
+    for n in sorted(pages):
+        for item in pages[n]:
+            if item.item_id not in seen:
+                seen.add(item.item_id)
+                items.append(item)
+    print(f"Inventory: {len(items)} listings on {len(pages)} pages in "
+          f"{time.perf_counter() - start:.1f}s ({how})")
+    metrics.incr("inventory_pages", len(pages))
+    return items
+
+
+def reconcile(items: list[InventoryItem], closet_titles: list[str], threshold: float,
+              duplicate_threshold: float, listed_ids=frozenset()) -> list[PlanEntry]:
+    """
+    Plan each item: "crosslisted" if a closet title matches (as in the
+    batch run) or the job ledger has it listed; "duplicate" if an earlier
+    item has the same normalized title, or a closet title is at least
+    `duplicate_threshold` similar without matching; otherwise "create".
+    """
+    closet = TitleIndex(closet_titles, threshold=threshold)
+    first_by_title = {}
+    plan = []
+    for item in items:
+        matches = closet.match(item.title)
+        norm = normalize_title(item.title)
+        twin = first_by_title.setdefault(norm, item) if norm else item
+        if matches:
+            m = matches[0]
+            plan.append(PlanEntry(item, "crosslisted", f"{m.kind} {m.score:.2f}: {m.title}"))
+        elif item.item_id in listed_ids:
+            plan.append(PlanEntry(item, "crosslisted", "listed by an earlier batch (job ledger)"))
+        elif twin is not item:
+            plan.append(PlanEntry(item, "duplicate", f"same title as eBay item {twin.item_id}"))
+        elif near := closet.similar(item.title, threshold=duplicate_threshold):
+            idx, score = near[0]
+            plan.append(PlanEntry(item, "duplicate", f"similar {score:.2f}: {closet.titles[idx]}"))
+        else:
+            plan.append(PlanEntry(item, "create", ""))
+    return plan
+
+
+def print_plan(plan: list[PlanEntry], show: int = 20):
+    groups = defaultdict(list)
+    for entry in plan:
+        groups[entry.action].append(entry)
+    for action, heading in (("create", "To create"), ("duplicate", "Possible duplicates"),
+                            ("crosslisted", "Already crosslisted")):
+        entries = groups.get(action, [])
+        if not entries:
+            continue
+        print(f"\n{heading} ({len(entries)}):")
+        for entry in entries[:show]:
+            price = f"${entry.item.price}" if entry.item.price else "-"
+            line = f"  {entry.item.item_id:<14}{price:>10}  {entry.item.title}"
+            print(line + (f"\n{'':26}↳ {entry.reason}" if entry.reason else ""))
+        if len(entries) > show:
+            print(f"  ... and {len(entries) - show} more")
+    print(f"\nPLAN: {len(plan)} eBay listings — create {len(groups['create'])}, "
+          f"already crosslisted {len(groups['crosslisted'])}, "
+          f"possible duplicates {len(groups['duplicate'])}")
+
+
+def write_plan_tsv(plan: list[PlanEntry], path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter="\t", lineterminator="\n")
+        writer.writerow(["item_id", "title", "price", "action", "reason"])
+        for entry in plan:
+            writer.writerow([entry.item.item_id, entry.item.title, entry.item.price or "",
+                             entry.action, entry.reason])
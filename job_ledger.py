@@ -0,0 +1,175 @@
+"""
+Durable per-listing progress for batch runs.
+
+Each eBay item moves through these stages, and the last one completed is
+recorded in SQLite as soon as it is reached:
+
+    extracted      listing fields read (the record is in the listing cache)
+    images_ready   photos downloaded and processed (in the image cache)
+    uploaded       photos handed to the Poshmark form
+    listed         "List This Item" clicked            (done)
+    exists         already in the Poshmark closet      (done)
+
+A failure keeps the last completed stage and records the step that failed
+and why. A restarted batch skips done items and resumes the rest after their
+last completed stage. Extraction and image processing come back from the
+caches. The Poshmark form doesn't survive a restart, so an item that failed
+after `uploaded` uploads its photos again.
+"""
+from collections import defaultdict
+from pathlib import Path
+
+import sqlite3, time
+
+STAGES = ("extracted", "images_ready", "uploaded", "listed")
+DONE_STAGES = ("listed", "exists")
+
+# The step that runs after each completed stage; a failure is reported under it
+NEXT_STEP = {None: "extract", "extracted": "images", "images_ready": "upload", "uploaded": "form"}
+
+
+def ledger_key(url: str, item_id: str | None) -> str:
+    """Ledger row key: the eBay item ID, or the URL when it has none."""
+    return item_id or url
+
+
+class LedgerEntry:
+    __slots__ = ("key", "url", "title", "stage", "failed_step", "error", "attempts", "updated_at")
+
+    def __init__(self, key, url, title, stage, failed_step, error, attempts, updated_at):
+        self.key = key
+        self.url = url
+        self.title = title
+        self.stage = stage
+        self.failed_step = failed_step
+        self.error = error
+        self.attempts = attempts
+        self.updated_at = updated_at
+
+    @property
+    def done(self) -> bool:
+        return self.stage in DONE_STAGES
+
+    def reached(self, stage: str) -> bool:
+        """Whether `stage` (one of STAGES) was completed."""
+        if self.stage is None:
+            return False
+        if self.stage == "exists":
+            return True
+        return STAGES.index(self.stage) >= STAGES.index(stage)
+
+
+class JobLedger:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                key         TEXT PRIMARY KEY,
+                url         TEXT NOT NULL,
+                title       TEXT,
+                stage       TEXT,
+                failed_step TEXT,
+                error       TEXT,
+                attempts    INTEGER NOT NULL DEFAULT 0,
+                updated_at  REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_failed ON jobs(failed_step);
+            """
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, key: str) -> LedgerEntry | None:
+        row = self.conn.execute(
+            "SELECT key, url, title, stage, failed_step, error, attempts, updated_at "
+            "FROM jobs WHERE key = ?",
+            (key,),
+        ).fetchone()
+        return LedgerEntry(*row) if row else None
+
+    def done_keys(self) -> set[str]:
+        rows = self.conn.execute(
+            f"SELECT key FROM jobs WHERE stage IN ({', '.join('?' * len(DONE_STAGES))})",
+            DONE_STAGES,
+        )
+        return {key for (key,) in rows}
+
+    def start(self, key: str, url: str) -> LedgerEntry:
+        """Count an attempt at `key` and return its entry (created if new)."""
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO jobs (key, url, attempts, updated_at) VALUES (?, ?, 1, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    url = excluded.url, attempts = attempts + 1, updated_at = excluded.updated_at
+                """,
+                (key, url, time.time()),
+            )
+        return self.get(key)
+
+    def advance(self, key: str, stage: str, title: str | None = None):
+        """Record that `key` completed `stage`; clears an earlier failure."""
+        with self.conn:
+            self.conn.execute(
+                """
+                UPDATE jobs SET stage = ?, title = COALESCE(?, title),
+                    failed_step = NULL, error = NULL, updated_at = ?
+                WHERE key = ?
+                """,
+                (stage, title, time.time(), key),
+            )
+
+    def fail(self, key: str, error: str, step: str | None = None):
+        """Record a failure in `step` (default: the step after the last completed stage)."""
+        entry = self.get(key)
+        if step is None:
+            step = NEXT_STEP.get(entry.stage if entry else None, "form")
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET failed_step = ?, error = ?, updated_at = ? WHERE key = ?",
+                (step, error, time.time(), key),
+            )
+
+    def reset(self) -> int:
+        """Forget every item's progress (the next batch starts from scratch)."""
+        with self.conn:
+            return self.conn.execute("DELETE FROM jobs").rowcount
+
+    def failures(self) -> list[LedgerEntry]:
+        rows = self.conn.execute(
+            "SELECT key, url, title, stage, failed_step, error, attempts, updated_at "
+            "FROM jobs WHERE failed_step IS NOT NULL ORDER BY updated_at"
+        )
+        return [LedgerEntry(*row) for row in rows]
+
+    def stage_counts(self) -> dict[str, int]:
+        rows = self.conn.execute(
+            "SELECT COALESCE(stage, 'started'), COUNT(*) FROM jobs GROUP BY 1"
+        )
+        return dict(rows.fetchall())
+
+    def print_report(self):
+        """Progress by stage, then the failed items grouped by the step that failed."""
+        counts = self.stage_counts()
+        order = ["started", *STAGES, "exists"]
+        print("\nLEDGER: " + ", ".join(f"{stage} {counts[stage]}"
+                                       for stage in order if counts.get(stage)))
+
+        by_step = defaultdict(list)
+        for entry in self.failures():
+            by_step[entry.failed_step].append(entry)
+        if not by_step:
+            print("No failed listings.")
+            return
+        for step in [*NEXT_STEP.values(), *sorted(set(by_step) - set(NEXT_STEP.values()))]:
+            entries = by_step.get(step)
+            if not entries:
+                continue
+            print(f"\nFailed at {step} ({len(entries)}):")
+            for entry in entries:
+                label = entry.title or entry.url
+                print(f"  - {entry.key}  {label}  (attempts: {entry.attempts})\n      {entry.error}")
@@ -0,0 +1,90 @@
+"""
+File-based job queue shared by the crosslist daemon and its clients.
+
+    <root>/incoming/<job id>.json   submitted, waiting
+    <root>/working/<job id>.json    claimed by the daemon
+    <root>/done/<job id>.json       result (status, error, timings)
+
+Every state change is an atomic rename within one directory tree, so a
+client and the daemon never see a half-written job, and a crashed daemon
+leaves its job in working/ to be re-queued on the next start.
+"""
+from pathlib import Path
+
+import json, os, time, uuid
+
+
+class FileJobQueue:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.incoming = self.root / "incoming"
+        self.working = self.root / "working"
+        self.done = self.root / "done"
+        for d in (self.incoming, self.working, self.done):
+            d.mkdir(parents=True, exist_ok=True)
+
+    # --- client side -------------------------------------------------------------
+
+    def submit(self, target: str) -> str:
+        """Queue a crosslist job for an eBay item URL or ID; returns the job ID."""
+        now = time.time()
+        # Sortable by submit time, so the daemon works the queue in order
+        job_id = (f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}"
+                  f"{int(now % 1 * 1e6):06d}-{uuid.uuid4().hex[:6]}")
+        job = {"id": job_id, "target": target, "queued_at": now}
+        tmp = self.incoming / f".{job_id}.tmp"
+        tmp.write_text(json.dumps(job), encoding="utf-8")
+        os.replace(tmp, self.incoming / f"{job_id}.json")
+        return job_id
+
+    def result(self, job_id: str) -> dict | None:
+        path = self.done / f"{job_id}.json"
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def wait(self, job_id: str, timeout: float | None = None, poll: float = 0.25) -> dict | None:
+        """Block until the job has a result (or `timeout` seconds pass)."""
+        give_up = None if timeout is None else time.monotonic() + timeout
+        while (result := self.result(job_id)) is None:
+            if give_up is not None and time.monotonic() > give_up:
+                return None
+            time.sleep(poll)
+        return result
+
+    def pending(self) -> int:
+        return sum(1 for _ in self.incoming.glob("*.json"))
+
+    # --- daemon side -------------------------------------------------------------
+
+    def claim(self) -> dict | None:
+        """Move the oldest waiting job to working/ and return it, or None."""
+        for path in sorted(self.incoming.glob("*.json")):
+            claimed = self.working / path.name
+            try:
+                os.replace(path, claimed)
+            except FileNotFoundError:
+                continue  # another daemon got it first
+            try:
+                job = json.loads(claimed.read_text(encoding="utf-8"))
+            except ValueError:
+                job = {"id": path.stem, "target": None}
+            job["started_at"] = time.time()
+            return job
+        return None
+
+    def finish(self, job: dict, **result):
+        """Write the job's result to done/ and drop it from working/."""
+        record = {**job, **result, "finished_at": time.time()}
+        tmp = self.done / f".{job['id']}.tmp"
+        tmp.write_text(json.dumps(record, default=str), encoding="utf-8")
+        os.replace(tmp, self.done / f"{job['id']}.json")
+        (self.working / f"{job['id']}.json").unlink(missing_ok=True)
+
+    def requeue_stale(self) -> int:
+        """Put jobs a previous daemon left in working/ back in the queue."""
+        count = 0
+        for path in self.working.glob("*.json"):
+            os.replace(path, self.incoming / path.name)
+            count += 1
+        return count
@@ -0,0 +1,328 @@
+from collections import Counter
+from pathlib import Path
+
+import json, sqlite3, threading, time
+
+from ebay_listing import EbayListing
+from image_hash import HammingIndex, to_hex
+import metrics
+
+
+def conditional_headers(etag: str | None, last_modified: str | None) -> dict:
+    """If-None-Match / If-Modified-Since headers; empty if the server gave no validators."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+class CachedListing:
+    __slots__ = ("listing", "etag", "last_modified", "fetched_at")
+
+    def __init__(self, listing, etag, last_modified, fetched_at):
+        self.listing = listing
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def validators(self) -> dict:
+        return conditional_headers(self.etag, self.last_modified)
+
+
+class CachedImage:
+    __slots__ = ("digest", "path", "etag", "last_modified", "fetched_at")
+
+    def __init__(self, digest, path, etag, last_modified, fetched_at):
+        self.digest = digest
+        self.path = path
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def validators(self) -> dict:
+        return conditional_headers(self.etag, self.last_modified)
+
+
+class HashedImage:
+    """Perceptual hash of a downloaded image and the listing it came from."""
+
+    __slots__ = ("digest", "width", "height", "item_id", "title")
+
+    def __init__(self, digest, width, height, item_id, title):
+        self.digest = digest
+        self.width = width
+        self.height = height
+        self.item_id = item_id
+        self.title = title
+
+    def same_shape(self, width: int, height: int) -> bool:
+        """Same aspect ratio (within 1%), so the square crops cover the same area."""
+        return abs(self.width * height - width * self.height) <= 0.01 * self.height * height
+
+
+class ListingCache:
+    """
+    Cache of extracted listings (keyed by eBay item ID) and processed images
+    (JPEG files named by the SHA-256 of the downloaded bytes).
+
+    - listings: item ID → EbayListing record plus the page's ETag/Last-Modified
+    - image_urls: image URL → content hash plus ETag/Last-Modified
+    - blobs: content hash → processed JPEG on disk, with size and last use
+    - image_hashes: content hash → perceptual hash, size and source listing;
+      kept after eviction so duplicate listings can still be spotted
+
+    Processed images are evicted least-recently-used first once they exceed
+    `max_bytes`. Safe to use from the downloader threads.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.image_dir = self.root / "images"
+        self.image_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(self.root / "cache.sqlite3", check_same_thread=False)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS listings (
+                item_id       TEXT PRIMARY KEY,
+                record        TEXT NOT NULL,
+                etag          TEXT,
+                last_modified TEXT,
+                fetched_at    REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS image_urls (
+                url           TEXT PRIMARY KEY,
+                digest        TEXT NOT NULL,
+                etag          TEXT,
+                last_modified TEXT,
+                fetched_at    REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest    TEXT PRIMARY KEY,
+                size      INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS blobs_lru ON blobs(last_used);
+            CREATE TABLE IF NOT EXISTS settings (
+                key   TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS image_hashes (
+                digest  TEXT PRIMARY KEY,
+                dhash   TEXT NOT NULL,
+                width   INTEGER NOT NULL,
+                height  INTEGER NOT NULL,
+                item_id TEXT,
+                title   TEXT
+            );
+            """
+        )
+        self.conn.commit()
+        self.hash_index = None  # built from image_hashes on first lookup
+        self.image_profile = None
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # --- listings ------------------------------------------------------------
+
+    def get_listing(self, item_id: str | None) -> CachedListing | None:
+        if not item_id:
+            return None
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT record, etag, last_modified, fetched_at FROM listings WHERE item_id = ?",
+                (item_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        record, etag, last_modified, fetched_at = row
+        return CachedListing(
+            EbayListing.from_dict(json.loads(record)), etag, last_modified, fetched_at
+        )
+
+    def fresh_listing(self, item_id: str | None, max_age: float) -> EbayListing | None:
+        """The cached listing if it was fetched less than `max_age` seconds ago."""
+        cached = self.get_listing(item_id)
+        if cached is not None and time.time() - cached.fetched_at < max_age:
+            self.count("listing_hit")
+            return cached.listing
+        self.count("listing_miss")
+        return None
+
+    def put_listing(self, listing: EbayListing, etag=None, last_modified=None):
+        if not listing.item_id:
+            return
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?, ?)",
+                (listing.item_id, json.dumps(listing.to_dict()), etag, last_modified, time.time()),
+            )
+
+    def touch_listing(self, item_id: str):
+        """Mark a revalidated (304) listing as fresh again."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE listings SET fetched_at = ? WHERE item_id = ?", (time.time(), item_id)
+            )
+
+    # --- images --------------------------------------------------------------
+
+    def blob_path(self, digest: str) -> Path:
+        return self.image_dir / f"{digest}.jpg"
+
+    def get_image(self, url: str) -> CachedImage | None:
+        """Cached processed image for `url`, if its file is still on disk."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT digest, etag, last_modified, fetched_at FROM image_urls WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        digest, etag, last_modified, fetched_at = row
+        path = self.blob_path(digest)
+        if not path.exists():
+            return None
+        return CachedImage(digest, path, etag, last_modified, fetched_at)
+
+    def use_image_profile(self, profile: str):
+        """
+        Processed images were encoded with some output profile; when it
+        changes, drop them so every photo is re-encoded with the new one.
+        """
+        if profile == self.image_profile:
+            return
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT value FROM settings WHERE key = 'image_profile'"
+            ).fetchone()
+            if row is not None and row[0] != profile:
+                for (digest,) in self.conn.execute("SELECT digest FROM blobs").fetchall():
+                    self.blob_path(digest).unlink(missing_ok=True)
+                self.conn.execute("DELETE FROM blobs")
+                self.conn.execute("DELETE FROM image_urls")
+                print(f"Image profile changed; cleared processed images in {self.image_dir}")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO settings VALUES ('image_profile', ?)", (profile,)
+            )
+        self.image_profile = profile
+
+    def has_blob(self, digest: str) -> bool:
+        return self.blob_path(digest).exists()
+
+    def put_image(self, url: str, digest: str, etag=None, last_modified=None):
+        """Record that `url` served content `digest` (whose JPEG is in the cache)."""
+        path = self.blob_path(digest)
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO image_urls VALUES (?, ?, ?, ?, ?)",
+                (url, digest, etag, last_modified, now),
+            )
+            self.conn.execute(
+                """
+                INSERT INTO blobs (digest, size, last_used) VALUES (?, ?, ?)
+                ON CONFLICT(digest) DO UPDATE SET size = excluded.size, last_used = excluded.last_used
+                """,
+                (digest, path.stat().st_size, now),
+            )
+
+    def touch_image(self, url: str, digest: str):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE image_urls SET fetched_at = ? WHERE url = ?", (now, url))
+            self.conn.execute("UPDATE blobs SET last_used = ? WHERE digest = ?", (now, digest))
+
+    # --- perceptual hashes ----------------------------------------------------
+
+    def _load_hash_index(self, max_distance: int) -> HammingIndex:
+        index = HammingIndex(max_distance)
+        rows = self.conn.execute(
+            "SELECT digest, dhash, width, height, item_id, title FROM image_hashes"
+        ).fetchall()
+        for digest, dhash, width, height, item_id, title in rows:
+            index.add(int(dhash, 16), HashedImage(digest, width, height, item_id, title))
+        return index
+
+    def put_image_hash(self, digest: str, dhash: int, width: int, height: int,
+                       item_id: str | None = None, title: str | None = None):
+        entry = HashedImage(digest, width, height, item_id, title)
+        with self.lock, self.conn:
+            inserted = self.conn.execute(
+                "INSERT OR IGNORE INTO image_hashes VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, to_hex(dhash), width, height, item_id, title),
+            ).rowcount
+            if inserted and self.hash_index is not None:
+                self.hash_index.add(dhash, entry)
+
+    def image_hash(self, digest: str) -> HashedImage | None:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT width, height, item_id, title FROM image_hashes WHERE digest = ?",
+                (digest,),
+            ).fetchone()
+        return HashedImage(digest, *row) if row else None
+
+    def similar_images(self, dhash: int, max_distance: int) -> list[tuple[int, HashedImage]]:
+        """(Hamming distance, image) for known images within max_distance, nearest first."""
+        with self.lock:
+            if self.hash_index is None or self.hash_index.max_distance < max_distance:
+                self.hash_index = self._load_hash_index(max_distance)
+            return self.hash_index.search(dhash, max_distance)
+
+    # --- eviction / stats -------------------------------------------------------
+
+    def total_bytes(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def evict(self, keep=()) -> int:
+        """
+        Delete least-recently-used images until the cache fits in max_bytes.
+        Digests in `keep` (e.g. the listing being uploaded) are never evicted.
+        Returns the number of bytes freed.
+        """
+        keep = set(keep)
+        freed = 0
+        with self.lock, self.conn:
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            rows = self.conn.execute(
+                "SELECT digest, size FROM blobs ORDER BY last_used"
+            ).fetchall()
+            for digest, size in rows:
+                if total - freed <= self.max_bytes:
+                    break
+                if digest in keep:
+                    continue
+                self.blob_path(digest).unlink(missing_ok=True)
+                self.conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                self.conn.execute("DELETE FROM image_urls WHERE digest = ?", (digest,))
+                freed += size
+        if freed:
+            self.count("evicted_bytes", freed)
+        return freed
+
+    def count(self, name: str, n: int = 1):
+        with self.lock:
+            self.stats[name] += n
+        metrics.incr(f"cache_{name}", n)
+
+    def print_stats(self):
+        s = self.stats
+        print(
+            f"\nCACHE: listings {s['listing_hit']} hit / {s['listing_revalidated']} revalidated / "
+            f"{s['listing_miss']} miss; images {s['image_hit']} hit / "
+            f"{s['image_revalidated']} revalidated / {s['image_dedup']} dedup / "
+            f"{s['image_similar']} similar / {s['image_miss']} miss; "
+            f"{self.total_bytes() / 1e6:.1f} of {self.max_bytes / 1e6:.0f} MB used, "
+            f"{s['evicted_bytes'] / 1e6:.1f} MB evicted"
+        )
@@ -0,0 +1,222 @@
+"""
+Memory ceiling and periodic memory snapshots for long batch and daemon runs.
+
+    guard = MemoryGuard.from_config()
+    ...after each listing...
+    if guard.snapshot_due(n):
+        guard.record(n, chromium_metrics(posh_page))
+    if guard.over_ceiling():
+        ...recycle the tabs (and the browser, if that wasn't enough)...
+
+Memory is read from /proc (Linux). The ceiling (MEMORY_CEILING_MB, off by
+default) applies to this process plus its children: the Playwright driver
+and every Chromium process. Each process counts its PSS, which splits shared
+pages between the processes sharing them, so the sum doesn't count them
+several times; kernels without smaps_rollup fall back to RSS, which does.
+Where /proc isn't available the ceiling is never reached.
+
+Every MEMORY_SNAPSHOT_EVERY listings a snapshot line is printed and
+appended to METRICS_DIR/memory-<time>.jsonl. It holds the Python and total
+RSS, and the tab's JS heap and DOM counts from Chromium's Performance
+domain. With TRACEMALLOC=1 it also holds the Python allocations traced
+since the run started and the lines that grew the most. print_report()
+turns the snapshots into growth per 100 listings.
+"""
+from collections import defaultdict
+from pathlib import Path
+
+import json, os, time, tracemalloc
+
+import config, metrics
+
+# Performance.getMetrics values kept in a snapshot
+CHROMIUM_METRICS = ("JSHeapUsedSize", "JSHeapTotalSize", "Nodes", "Documents",
+                    "JSEventListeners", "Frames")
+
+MB = 1024 * 1024
+
+
+def process_rss(pid: int) -> int | None:
+    """Resident bytes of one process, or None if it can't be read."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def process_pss(pid: int) -> int | None:
+    """Proportional set size of one process in bytes, or None if it can't be read."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _process_memory(pid: int) -> int | None:
+    pss = process_pss(pid)
+    return pss if pss is not None else process_rss(pid)
+
+
+def tree_rss(pid: int | None = None) -> int | None:
+    """
+    Resident bytes of `pid` (default: this process) and all its descendants,
+    as PSS where the kernel reports it.
+    """
+    pid = pid or os.getpid()
+    own = _process_memory(pid)
+    if own is None:
+        return None
+    children = defaultdict(list)
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/stat") as f:
+                # "pid (comm) state ppid ..."; comm may contain spaces and parentheses
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children[ppid].append(int(entry.name))
+    total, todo = own, list(children[pid])
+    while todo:
+        child = todo.pop()
+        total += _process_memory(child) or 0
+        todo.extend(children[child])
+    return total
+
+
+def _pick_metrics(result: dict) -> dict:
+    values = {m["name"]: m["value"] for m in result.get("metrics", [])}
+    return {name: values[name] for name in CHROMIUM_METRICS if name in values}
+
+
+def chromium_metrics(page) -> dict | None:
+    """JS heap and DOM counts of a Chromium tab (None for other browsers or a closed tab)."""
+    try:
+        session = page.context.new_cdp_session(page)
+        try:
+            session.send("Performance.enable")
+            return _pick_metrics(session.send("Performance.getMetrics"))
+        finally:
+            session.detach()
+    except Exception:
+        return None
+
+
+async def chromium_metrics_async(page) -> dict | None:
+    """chromium_metrics() for a playwright.async_api page."""
+    try:
+        session = await page.context.new_cdp_session(page)
+        try:
+            await session.send("Performance.enable")
+            return _pick_metrics(await session.send("Performance.getMetrics"))
+        finally:
+            await session.detach()
+    except Exception:
+        return None
+
+
+class MemoryGuard:
+    def __init__(self, ceiling_mb: int = 0, snapshot_every: int = 0, trace: bool = False,
+                 out_dir: Path | None = None):
+        self.ceiling = ceiling_mb * MB
+        self.snapshot_every = snapshot_every
+        self.out_path = None
+        if snapshot_every and out_dir is not None:
+            self.out_path = Path(out_dir) / f"memory-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+        self.snapshots = []
+        self.recycles = 0
+        self.restart_needed = False  # recycling tabs didn't bring RSS under the ceiling
+        self.baseline = None
+        if trace:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+            self.baseline = tracemalloc.take_snapshot()
+
+    @classmethod
+    def from_config(cls) -> "MemoryGuard":
+        return cls(config.MEMORY_CEILING_MB, config.MEMORY_SNAPSHOT_EVERY,
+                   config.TRACEMALLOC, config.METRICS_DIR)
+
+    def over_ceiling(self) -> bool:
+        if not self.ceiling:
+            return False
+        rss = tree_rss()
+        return rss is not None and rss > self.ceiling
+
+    def snapshot_due(self, listings: int) -> bool:
+        return bool(self.snapshot_every) and listings % self.snapshot_every == 0
+
+    def record(self, listings: int, chromium: dict | None = None) -> dict:
+        """Take a snapshot after `listings` listings; prints it and appends it to the JSONL file."""
+        snap = {
+            "listings": listings,
+            "ts": round(time.time(), 3),
+            "python_rss_mb": round((process_rss(os.getpid()) or 0) / MB, 1),
+            "total_rss_mb": round((tree_rss() or 0) / MB, 1),
+            "recycles": self.recycles,
+        }
+        if chromium:
+            snap["chromium"] = chromium
+        if self.baseline is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            growth = tracemalloc.take_snapshot().compare_to(self.baseline, "lineno")
+            snap["traced_mb"] = round(current / MB, 2)
+            snap["traced_peak_mb"] = round(peak / MB, 2)
+            snap["top_growth"] = [f"{stat.traceback[0]}: {stat.size_diff / 1024:+.0f} KB"
+                                  for stat in growth[:5] if stat.size_diff >= 1024]
+        self.snapshots.append(snap)
+
+        line = (f"MEMORY after {listings} listings: python {snap['python_rss_mb']:.0f} MB, "
+                f"total {snap['total_rss_mb']:.0f} MB")
+        if chromium:
+            line += (f", tab JS heap {chromium.get('JSHeapUsedSize', 0) / MB:.0f} MB, "
+                     f"{chromium.get('Nodes', 0):.0f} DOM nodes")
+        if "traced_mb" in snap:
+            line += f", traced {snap['traced_mb']:.1f} MB"
+        print(line)
+        if self.out_path is not None:
+            self.out_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.out_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(snap) + "\n")
+        return snap
+
+    def recycled(self):
+        self.recycles += 1
+        metrics.incr("pages_recycled")
+
+    def print_report(self):
+        """Growth between the first and the last snapshot, per 100 listings."""
+        if len(self.snapshots) < 2:
+            return
+        first, last = self.snapshots[0], self.snapshots[-1]
+        per = 100 / max(1, last["listings"] - first["listings"])
+        parts = [f"{name} {first[key]:.0f} → {last[key]:.0f} MB "
+                 f"({(last[key] - first[key]) * per:+.1f} MB/100 listings)"
+                 for name, key in (("python", "python_rss_mb"), ("total", "total_rss_mb"),
+                                   ("traced", "traced_mb")) if key in first]
+        print(f"\nMEMORY: {', '.join(parts)}; tabs recycled {self.recycles}x"
+              + (f" (snapshots in {self.out_path})" if self.out_path else ""))
+
+
+def recycle_pages(*pages) -> list:
+    """New tabs in the same context in place of `pages`, which are closed."""
+    context = pages[0].context
+    fresh = [context.new_page() for _ in pages]
+    for page in pages:
+        page.close()
+    return fresh
+
+
+async def recycle_pages_async(*pages) -> list:
+    """recycle_pages() for playwright.async_api pages."""
+    context = pages[0].context
+    fresh = [await context.new_page() for _ in pages]
+    for page in pages:
+        await page.close()
+    return fresh
@@ -0,0 +1,199 @@
+"""
+Lightweight run instrumentation: timed spans and counters.
+
+    with metrics.span("posh.upload", images=len(files)):
+        ...
+    metrics.incr("bytes_downloaded", size)
+
+Tracing is off until enable() is called; span() then returns one shared
+no-op object and incr() returns immediately, so the calls can stay in hot
+paths. finish() writes the run as JSONL (one line per span plus a final
+counters line), refreshes a Prometheus textfile and prints a summary table.
+"""
+from collections import Counter
+from pathlib import Path
+
+import contextvars, functools, json, os, threading, time
+
+_tracer = None
+
+# Open spans of the current thread / asyncio task, innermost last
+_open_spans = contextvars.ContextVar("open_spans", default=())
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **labels):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "labels", "start", "wall", "parent", "token")
+
+    def __init__(self, tracer, name: str, labels: dict):
+        self.tracer = tracer
+        self.name = name
+        self.labels = labels
+        self.parent = None
+
+    def set(self, **labels):
+        """Attach labels known only once the span is running (counts, status)."""
+        self.labels.update(labels)
+
+    def __enter__(self):
+        stack = _open_spans.get()
+        self.parent = stack[-1].name if stack else None
+        self.token = _open_spans.set(stack + (self,))
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        _open_spans.reset(self.token)
+        if exc_type is not None:
+            self.labels["error"] = exc_type.__name__
+        self.tracer.record(self, seconds)
+        return False
+
+
+class Tracer:
+    def __init__(self, out_dir: Path, run_id: str):
+        self.out_dir = Path(out_dir)
+        self.run_id = run_id
+        self.started = time.time()
+        self.spans = []
+        self.counters = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, span: _Span, seconds: float):
+        entry = {
+            "span": span.name,
+            "start": round(span.wall, 6),
+            "seconds": round(seconds, 6),
+        }
+        if span.parent:
+            entry["parent"] = span.parent
+        if span.labels:
+            entry["labels"] = span.labels
+        with self.lock:
+            self.spans.append(entry)
+
+    def incr(self, name: str, n: float = 1):
+        with self.lock:
+            self.counters[name] += n
+
+    def summary(self) -> dict:
+        """span name → [count, total seconds, max seconds], in first-seen order."""
+        stats = {}
+        for entry in self.spans:
+            s = stats.setdefault(entry["span"], [0, 0.0, 0.0])
+            s[0] += 1
+            s[1] += entry["seconds"]
+            s[2] = max(s[2], entry["seconds"])
+        return stats
+
+    def write_jsonl(self) -> Path:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / f"run-{self.run_id}.jsonl"
+        with open(path, "w", encoding="utf-8") as f:
+            for entry in self.spans:
+                f.write(json.dumps(entry, default=str) + "\n")
+            f.write(json.dumps({
+                "run": self.run_id,
+                "seconds": round(time.time() - self.started, 3),
+                "counters": dict(self.counters),
+            }) + "\n")
+        return path
+
+    def write_prometheus(self) -> Path:
+        """
+        Prometheus textfile-collector format; written to a temp file and
+        renamed so the collector never reads a half-written file.
+        """
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / "crosslist.prom"
+        lines = [
+            "# HELP crosslist_stage_seconds Time spent per pipeline stage in the last run.",
+            "# TYPE crosslist_stage_seconds summary",
+        ]
+        for name, (count, total, _) in self.summary().items():
+            lines.append(f'crosslist_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'crosslist_stage_seconds_count{{stage="{name}"}} {count}')
+        for name, value in sorted(self.counters.items()):
+            metric = f"crosslist_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        lines.append("# TYPE crosslist_last_run_timestamp_seconds gauge")
+        lines.append(f"crosslist_last_run_timestamp_seconds {time.time():.0f}")
+
+        tmp = path.with_suffix(".prom.tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    def print_summary(self):
+        stats = self.summary()
+        print(f"\n{'stage':<32}{'count':>7}{'total s':>10}{'mean s':>9}{'max s':>9}")
+        for name, (count, total, longest) in sorted(stats.items(), key=lambda kv: -kv[1][1]):
+            print(f"{name:<32}{count:>7}{total:>10.2f}{total / count:>9.2f}{longest:>9.2f}")
+        if self.counters:
+            print("  " + ", ".join(f"{k} {v:g}" for k, v in sorted(self.counters.items())))
+
+
+def enable(out_dir: Path) -> Tracer:
+    """Start recording spans and counters for this run."""
+    global _tracer
+    _tracer = Tracer(out_dir, time.strftime("%Y%m%d-%H%M%S"))
+    return _tracer
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, **labels):
+    """Context manager timing one stage; a shared no-op when tracing is off."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(_tracer, name, labels)
+
+
+def incr(name: str, n: float = 1):
+    if _tracer is not None:
+        _tracer.incr(name, n)
+
+
+def traced(name: str):
+    """Decorator form of span() for whole functions."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if _tracer is None:
+                return fn(*args, **kwargs)
+            with _Span(_tracer, name, {}):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def finish():
+    """Write the run's JSONL and Prometheus files, print the summary, stop tracing."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None:
+        return
+    tracer.print_summary()
+    jsonl = tracer.write_jsonl()
+    prom = tracer.write_prometheus()
+    print(f"Metrics: {jsonl} and {prom}")
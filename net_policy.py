@@ -0,0 +1,268 @@
+"""
+Retries, backoff, per-host concurrency and circuit breaking for every
+network call the script makes (HTTP requests and page navigations).
+
+    policy = get_net_policy()
+    resp = policy.call(url, session.get, url, timeout=30)
+    await policy.acall(url, page.goto, url, wait_until="domcontentloaded")
+
+A call is retried when it raises a timeout or connection error, or returns
+(or raises for) a 429/5xx response. Retries wait with exponential backoff
+and full jitter, or for the server's Retry-After if that is longer. Any
+other exception is raised at once. Once the retries are used up, the last
+response is returned (callers still raise_for_status()) or the last
+exception raised.
+
+Each host gets an AIMD concurrency limit. It starts at NET_HOST_CONCURRENCY
+calls in flight, is halved when the host throttles or times out, and grows
+by about one per limit's worth of successful calls. After
+BREAKER_FAILURES throttled or failed calls in a row, the host's circuit
+opens. Calls to it then wait out BREAKER_COOLDOWN_SECONDS, doubled each
+time the probe call after a pause fails again.
+"""
+from urllib.parse import urlsplit
+
+import asyncio, random, threading, time
+
+import config, metrics
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Exception class names (anywhere in the MRO) that mean "try again": requests'
+# timeouts and dropped connections, Playwright's TimeoutError
+RETRY_ERRORS = frozenset({
+    "Timeout", "ConnectTimeout", "ReadTimeout", "ConnectionError",
+    "ChunkedEncodingError", "TimeoutError",
+})
+
+# Halving the limit again within this many seconds would punish one burst twice
+DECREASE_INTERVAL = 1.0
+
+# How often an async call re-checks a full or paused host
+ASYNC_POLL_SECONDS = 0.05
+
+_policy = None
+
+
+def response_status(result) -> int | None:
+    """HTTP status of a requests or Playwright response (None for anything else)."""
+    status = getattr(result, "status_code", None)
+    if status is None:
+        status = getattr(result, "status", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after(result) -> float | None:
+    """Seconds from a Retry-After header, when given as a number."""
+    headers = getattr(result, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether an exception from a network call is worth retrying."""
+    if response_status(getattr(exc, "response", None)) in RETRY_STATUSES:
+        return True
+    if any(cls.__name__ in RETRY_ERRORS for cls in type(exc).__mro__):
+        return True
+    # Playwright reports dropped connections as Error("net::ERR_...")
+    return "net::ERR_" in str(exc) and "ERR_ABORTED" not in str(exc)
+
+
+class _Host:
+    __slots__ = ("limit", "in_flight", "failures", "open_until", "cooldown", "probing",
+                 "last_decrease", "calls", "retries", "throttled", "opened")
+
+    def __init__(self, limit: float, cooldown: float):
+        self.limit = limit
+        self.in_flight = 0
+        self.failures = 0  # throttled/failed calls in a row
+        self.open_until = 0.0
+        self.cooldown = cooldown
+        self.probing = False  # one call is testing a host whose pause just ended
+        self.last_decrease = 0.0
+        self.calls = self.retries = self.throttled = self.opened = 0
+
+
+class NetPolicy:
+    """Per-host AIMD limits and circuit breakers, shared by threads and asyncio tasks."""
+
+    def __init__(self, retries: int = 3, backoff: float = 0.5, backoff_max: float = 30.0,
+                 host_concurrency: int = 16, breaker_failures: int = 5,
+                 breaker_cooldown: float = 30.0):
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.max_limit = max(1, host_concurrency)
+        self.breaker_failures = max(1, breaker_failures)
+        self.breaker_cooldown = breaker_cooldown
+        self.hosts = {}
+        self.cond = threading.Condition()
+
+    @classmethod
+    def from_config(cls) -> "NetPolicy":
+        return cls(
+            retries=config.NET_RETRIES,
+            backoff=config.NET_BACKOFF_SECONDS,
+            backoff_max=config.NET_BACKOFF_MAX_SECONDS,
+            host_concurrency=config.NET_HOST_CONCURRENCY,
+            breaker_failures=config.BREAKER_FAILURES,
+            breaker_cooldown=config.BREAKER_COOLDOWN_SECONDS,
+        )
+
+    def _host(self, host: str) -> _Host:
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = _Host(float(self.max_limit), self.breaker_cooldown)
+        return state
+
+    def _try_acquire(self, host: str) -> float:
+        """Take a slot on `host` (returns 0), or return how long to wait first."""
+        with self.cond:
+            state = self._host(host)
+            now = time.monotonic()
+            if state.open_until > now:
+                return state.open_until - now
+            if state.open_until and not state.probing:
+                # The pause is over: let one call through to see if the host recovered
+                if state.in_flight:
+                    return ASYNC_POLL_SECONDS
+                state.probing = True
+            elif state.probing or state.in_flight >= int(state.limit):
+                return ASYNC_POLL_SECONDS
+            state.in_flight += 1
+            state.calls += 1
+            return 0.0
+
+    def _acquire(self, host: str):
+        with self.cond:
+            while (wait := self._try_acquire(host)) > 0:
+                self.cond.wait(wait)
+
+    def _release(self, host: str, ok: bool | None):
+        """Free the slot; ok=True/False adjusts the limit and breaker, None leaves them."""
+        with self.cond:
+            state = self.hosts[host]
+            state.in_flight -= 1
+            probe, state.probing = state.probing, False
+            if ok:
+                state.failures = 0
+                state.open_until = 0.0
+                state.cooldown = self.breaker_cooldown
+                state.limit = min(self.max_limit, state.limit + 1 / state.limit)
+            elif ok is False:
+                state.throttled += 1
+                state.failures += 1
+                metrics.incr("net_throttled")
+                now = time.monotonic()
+                if now - state.last_decrease >= DECREASE_INTERVAL:
+                    state.limit = max(1.0, state.limit / 2)
+                    state.last_decrease = now
+                if probe or state.failures >= self.breaker_failures:
+                    if probe:
+                        state.cooldown = min(state.cooldown * 2, self.breaker_cooldown * 16)
+                    state.open_until = now + state.cooldown
+                    state.failures = 0
+                    state.opened += 1
+                    metrics.incr("breaker_opened")
+                    print(f"  ⏸ {host}: pausing requests for {state.cooldown:.0f}s "
+                          f"(throttled or failing)")
+            self.cond.notify_all()
+
+    def _delay(self, attempt: int, result) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+        hinted = retry_after(result)
+        return min(self.backoff_max, max(delay, hinted)) if hinted is not None else delay
+
+    def _note_retry(self, host: str):
+        with self.cond:
+            self.hosts[host].retries += 1
+        metrics.incr("net_retries")
+
+    def call(self, url: str, fn, *args, **kwargs):
+        """fn(*args, **kwargs) under `url`'s host limit, retried as described above."""
+        host = urlsplit(url).hostname or "?"
+        for attempt in range(self.retries + 1):
+            self._acquire(host)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                failed = is_retryable(e)
+                self._release(host, False if failed else None)
+                if not failed or attempt == self.retries:
+                    raise
+                result = getattr(e, "response", None)
+            else:
+                failed = response_status(result) in RETRY_STATUSES
+                self._release(host, not failed)
+                if not failed or attempt == self.retries:
+                    return result
+            self._note_retry(host)
+            time.sleep(self._delay(attempt, result))
+
+    async def acall(self, url: str, fn, *args, **kwargs):
+        """call() for a coroutine function; waits without blocking the event loop."""
+        host = urlsplit(url).hostname or "?"
+        for attempt in range(self.retries + 1):
+            while (wait := self._try_acquire(host)) > 0:
+                await asyncio.sleep(min(wait, ASYNC_POLL_SECONDS))
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                failed = is_retryable(e)
+                self._release(host, False if failed else None)
+                if not failed or attempt == self.retries:
+                    raise
+                result = getattr(e, "response", None)
+            else:
+                failed = response_status(result) in RETRY_STATUSES
+                self._release(host, not failed)
+                if not failed or attempt == self.retries:
+                    return result
+            self._note_retry(host)
+            await asyncio.sleep(self._delay(attempt, result))
+
+    def print_stats(self):
+        busy = {h: s for h, s in self.hosts.items() if s.retries or s.throttled}
+        if not busy:
+            return
+        print("\nNETWORK: hosts that throttled or failed")
+        for host, s in sorted(busy.items(), key=lambda kv: -kv[1].throttled):
+            print(f"  {host}: {s.calls} calls, {s.throttled} throttled/failed, "
+                  f"{s.retries} retries, paused {s.opened}x, limit now {int(s.limit)}")
+
+
+def navigate(page, url: str, wait_for: str | None = None, timeout_ms: int = 15000):
+    """
+    page.goto(url) under the policy, then wait for the `wait_for` selector.
+    A timeout of either, or a 429/5xx page, retries the whole navigation.
+    """
+    def attempt():
+        response = page.goto(url, wait_until="domcontentloaded")
+        if wait_for is not None and response_status(response) not in RETRY_STATUSES:
+            page.wait_for_selector(wait_for, timeout=timeout_ms)
+        return response
+
+    return get_net_policy().call(url, attempt)
+
+
+async def navigate_async(page, url: str, wait_for: str | None = None, timeout_ms: int = 15000):
+    """navigate() for a playwright.async_api page."""
+    async def attempt():
+        response = await page.goto(url, wait_until="domcontentloaded")
+        if wait_for is not None and response_status(response) not in RETRY_STATUSES:
+            await page.wait_for_selector(wait_for, timeout=timeout_ms)
+        return response
+
+    return await get_net_policy().acall(url, attempt)
+
+
+def get_net_policy() -> NetPolicy:
+    """Process-wide policy, so every stage shares each host's limit and breaker."""
+    global _policy
+    if _policy is None:
+        _policy = NetPolicy.from_config()
+    return _policy
@@ -0,0 +1,522 @@
+"""
+Poshmark closet scan and Create Listing form, written once for both engines.
+
+Each flow is a generator of page operations. It yields an operation, gets
+its result back (or the exception it raised, at the yield), and returns the
+flow's result. run() drives a flow on a playwright.sync_api page and
+run_async() on a playwright.async_api page:
+
+    titles = run(posh_page, scan_closet(closet_index))                # ebay_open.py
+    titles = await run_async(posh_page, scan_closet(closet_index))    # async_engine.py
+
+An operation is a function of the page, returning a value with the sync
+API or an awaitable with the async one, or a Navigate / Request, which go
+through the network policy. Every Poshmark selector lives in this module;
+when the site changes, both engines change with it.
+"""
+from pathlib import Path
+from typing import NamedTuple
+
+import inspect, re, time
+
+from category_rules import map_ebay_category_to_posh, map_ebay_condition_to_posh_code
+from closet_feed import feed_style, is_json_response, page_url, parse_closet_payload
+from closet_index import ClosetIndex, posh_listing_id
+from deadline import Deadline, DeadlineExceeded
+import config, metrics
+
+# Reads (href, title) for every closet card from index `start` onwards
+CLOSET_TILES_JS = """(start) => Array.from(document.querySelectorAll('a.tile__title'))
+    .slice(start)
+    .map(a => [a.getAttribute('href') || '', a.textContent.trim()])"""
+
+SCROLL_TO_BOTTOM_JS = "window.scrollTo(0, document.body.scrollHeight)"
+
+
+class Navigate(NamedTuple):
+    """Operation: load `url` under the network policy (net_policy.navigate)."""
+    url: str
+    wait_for: str | None = None
+
+
+class Request(NamedTuple):
+    """Operation: GET `url` with the page's cookies, under the network policy."""
+    url: str
+    timeout_ms: float
+
+
+def run(page, flow):
+    """Drive `flow` on a playwright.sync_api page; returns the flow's result."""
+    from net_policy import get_net_policy, navigate
+
+    result, error = None, None
+    while True:
+        try:
+            op = flow.send(result) if error is None else flow.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        result, error = None, None
+        try:
+            if isinstance(op, Navigate):
+                result = navigate(page, op.url, wait_for=op.wait_for)
+            elif isinstance(op, Request):
+                result = get_net_policy().call(op.url, page.request.get, op.url,
+                                               timeout=op.timeout_ms)
+            else:
+                result = op(page)
+        except Exception as e:
+            error = e
+
+
+async def run_async(page, flow):
+    """Drive `flow` on a playwright.async_api page; returns the flow's result."""
+    from net_policy import get_net_policy, navigate_async
+
+    result, error = None, None
+    while True:
+        try:
+            op = flow.send(result) if error is None else flow.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        result, error = None, None
+        try:
+            if isinstance(op, Navigate):
+                result = await navigate_async(page, op.url, wait_for=op.wait_for)
+            elif isinstance(op, Request):
+                result = await get_net_policy().acall(op.url, page.request.get, op.url,
+                                                      timeout=op.timeout_ms)
+            else:
+                result = op(page)
+                if inspect.isawaitable(result):
+                    result = await result
+        except Exception as e:
+            error = e
+
+
+def _count_failure(e: Exception):
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    metrics.incr("timeouts" if isinstance(e, (PlaywrightTimeoutError, DeadlineExceeded))
+                 else "step_failures")
+
+
+# --- closet ---------------------------------------------------------------------
+
+def find_closet_feed(responses: list, stall_timeout_ms: int):
+    """
+    (feed URL, paging style) of the closet's data requests, or None.
+    `responses` is filled with the page's JSON responses by a listener; one
+    scroll makes the page request its next page if it hasn't already.
+    """
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    deadline = time.perf_counter() + stall_timeout_ms / 1000
+    checked = 0
+    yield lambda page: page.evaluate(SCROLL_TO_BOTTOM_JS)
+    while True:
+        for response in responses[checked:]:
+            checked += 1
+            try:
+                page = parse_closet_payload((yield lambda _, r=response: r.json()))
+            except Exception:
+                continue
+            style = feed_style(response.url)
+            if page is not None and style is not None:
+                return response.url, style
+        left_ms = (deadline - time.perf_counter()) * 1000
+        if left_ms <= 0:
+            return None
+        try:
+            yield lambda page: page.wait_for_event("response", predicate=is_json_response,
+                                                   timeout=left_ms)
+        except PlaywrightTimeoutError:
+            return None
+
+
+def read_closet_feed(feed_url: str, style: str, stop_at: set | None, timeout_ms: int):
+    """
+    Page through the closet feed from the newest item, with the page's
+    cookies but without rendering anything. Stops at the last page, or at a
+    listing in `stop_at`. Returns the (listing ID, title) pairs, or None if
+    a page doesn't parse.
+    """
+    scanned = []
+    offset, cursor = 0, None
+    pages = 0
+    start = time.perf_counter()
+    while True:
+        url = page_url(feed_url, style, offset, cursor)
+        with metrics.span("posh.closet_feed_page"):
+            response = yield Request(url, timeout_ms)
+            try:
+                page = (parse_closet_payload((yield lambda _: response.json()))
+                        if response.ok else None)
+            except ValueError:
+                page = None
+        if page is None:
+            print(f"Closet feed page {pages + 1} not recognized (HTTP {response.status}).")
+            return None
+        pages += 1
+        scanned.extend(page.items)
+        if stop_at and any(listing_id in stop_at for listing_id, _ in page.items):
+            print("Reached already-indexed items — stopping early.")
+            break
+        if not page.more or not page.items:
+            break
+        offset, cursor = offset + len(page.items), page.cursor
+
+    elapsed = time.perf_counter() - start
+    metrics.incr("closet_feed_pages", pages)
+    print(f"Closet feed: {len(scanned)} listings, {pages} pages in {elapsed:.1f}s "
+          f"({elapsed / pages:.2f}s/page)")
+    return scanned
+
+
+def scroll_closet_dom(stop_at: set | None, stall_timeout_ms: int):
+    """
+    Scroll the closet page and read its cards until no more load (or, with
+    `stop_at`, until a card of an already-indexed listing appears). After
+    each scroll we wait for the card count to grow; if it doesn't within the
+    stall timeout, the closet is fully loaded.
+    """
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    timer_start = time.perf_counter()
+    scanned = []
+    rounds = 0
+
+    try:
+        yield lambda page: page.wait_for_selector("a.tile__title", timeout=stall_timeout_ms)
+    except PlaywrightTimeoutError:
+        metrics.incr("timeouts")
+        print("No listing cards found in the closet.")
+
+    while True:
+        tiles = yield lambda page: page.evaluate(CLOSET_TILES_JS, len(scanned))
+        batch = [(posh_listing_id(href) or title, title) for href, title in tiles]
+        scanned.extend(batch)
+
+        if stop_at and any(listing_id in stop_at for listing_id, _ in batch):
+            print("Reached already-indexed items — stopping early.")
+            break
+
+        rounds += 1
+        yield lambda page: page.evaluate(SCROLL_TO_BOTTOM_JS)
+        try:
+            yield lambda page: page.wait_for_function(
+                "(n) => document.querySelectorAll('a.tile__title').length > n",
+                arg=len(scanned),
+                timeout=stall_timeout_ms,
+            )
+        except PlaywrightTimeoutError:
+            print("Reached bottom of closet — no new cards within the stall timeout.")
+            break
+
+    elapsed = time.perf_counter() - timer_start
+    metrics.incr("closet_scrolls", rounds)
+    print(
+        f"Closet scan: {len(scanned)} cards, {rounds} scrolls in {elapsed:.1f}s "
+        f"({elapsed / max(rounds, 1):.2f}s/scroll, stall timeout {stall_timeout_ms} ms)"
+    )
+    return scanned
+
+
+def scan_closet(closet_index: ClosetIndex, full_rescan: bool = False,
+                stall_timeout_ms: int | None = None, mode: str | None = None):
+    """
+    Bring the closet index up to date and return every known closet title.
+
+    The closet lists newest items first, so an incremental refresh reads
+    only until it reaches a listing that is already in the index. A full
+    rescan reads to the end and drops indexed items that are gone. With
+    mode "feed" (default: $CLOSET_SCAN) listings come from the closet's JSON
+    feed (closet_feed.py); "dom", or a feed that isn't recognized, scrolls
+    the page and reads the cards.
+    """
+    if stall_timeout_ms is None:
+        stall_timeout_ms = config.CLOSET_STALL_TIMEOUT_MS
+    mode = mode or config.CLOSET_SCAN
+
+    known_ids = closet_index.known_ids()
+    incremental = bool(known_ids) and not full_rescan
+    stop_at = known_ids if incremental else None
+
+    # Listen before the page loads, in case it fetches its first page itself
+    responses = []
+
+    def collect(response):
+        if is_json_response(response):
+            responses.append(response)
+
+    feed = None
+    try:
+        if mode == "feed":
+            yield lambda page: page.on("response", collect)
+
+        print(f"\nOpening Poshmark closet: {config.POSH_CLOSET_URL}")
+        with metrics.span("posh.goto", page="closet"):
+            yield Navigate(config.POSH_CLOSET_URL)
+
+        what = "new items" if incremental else "all items"
+        print(f"\nReading Poshmark closet ({what}, {len(known_ids)} indexed)...")
+        scan_start = time.time()
+        if mode == "feed":
+            feed = yield from find_closet_feed(responses, stall_timeout_ms)
+    finally:
+        if mode == "feed":
+            yield lambda page: page.remove_listener("response", collect)
+
+    scanned = None
+    if mode == "feed":
+        if feed is not None:
+            scanned = yield from read_closet_feed(*feed, stop_at, stall_timeout_ms)
+        if scanned is None:
+            metrics.incr("closet_feed_fallbacks")
+            print("Closet feed not recognized — scrolling the closet page instead.")
+    if scanned is None:
+        scanned = yield from scroll_closet_dom(stop_at, stall_timeout_ms)
+    metrics.incr("closet_cards", len(scanned))
+
+    new = closet_index.upsert_scanned(scanned)
+    print(f"\nListing cards scanned: {len(scanned)} ({new} new)")
+
+    if not incremental:
+        removed = closet_index.prune_unseen(scan_start)
+        if removed:
+            print(f"Removed {removed} listings no longer in the closet.")
+
+    titles = closet_index.titles()
+    print(f"Total listings in closet index: '{len(titles)}'")
+    return titles
+
+
+# --- Create Listing form ----------------------------------------------------------
+
+def fill_text_fields(title: str, description: str, deadline: Deadline):
+    """Title and description: plain inputs, safe to fill while photos upload."""
+    if title:
+        yield lambda page: page.fill("input[data-vv-name='title']", title[:80],
+                                     timeout=deadline.ms())
+    if description:
+        yield lambda page: page.fill("textarea[data-vv-name='description']",
+                                     description[:1500], timeout=deadline.ms())
+
+
+def _custom_size_tab(page):
+    return page.locator("a.navigation--horizontal__link span", has_text="Custom")
+
+
+def _custom_size_input(page):
+    return page.locator("#customSizeInput0")
+
+
+def _size_done_button(page):
+    return page.locator(
+        "div[selectortestlocator='size'] button.btn.btn--primary[data-et-name='apply']"
+    )
+
+
+def fill_listing_fields(size: str | None, condition: str | None, price: int | None,
+                        deadline: Deadline):
+    """Size (as a custom size), condition and price."""
+    # --- Size: use Custom field and inject eBay size ---
+    if not size:
+        raise RuntimeError("No eBay size found; cannot create a valid Poshmark listing.")
+
+    with deadline.step("size"):
+        # 1) Open the size dropdown
+        yield lambda page: page.click("div.dropdown[selectortestlocator='size']",
+                                      timeout=deadline.ms())
+
+        # 2) Click the "Custom" tab once the dialog has rendered, unless it
+        #    already opened on Custom
+        yield lambda page: _custom_size_tab(page).or_(_custom_size_input(page)).first.wait_for(
+            state="visible", timeout=deadline.ms())
+        if not (yield lambda page: _custom_size_input(page).is_visible()):
+            yield lambda page: _custom_size_tab(page).first.click(timeout=deadline.ms())
+
+        # 3) Fill size with subtle suffix so Posh accepts it
+        yield lambda page: _custom_size_input(page).fill(f"{size} – tag", timeout=deadline.ms())
+
+        # 4) Click the Save button (next to the input)
+        yield lambda page: page.locator(
+            "div.listing-editor__custom_sizes button.btn.btn--secondary"
+        ).first.click(timeout=deadline.ms())
+
+        # 5) Click the blue Done button, then wait for the dialog to close
+        #    (instead of a fixed pause for the animation)
+        yield lambda page: _size_done_button(page).click(timeout=deadline.ms())
+        yield lambda page: _size_done_button(page).wait_for(state="hidden",
+                                                            timeout=deadline.ms())
+        print("✓ Size set and Done clicked")
+
+    code = map_ebay_condition_to_posh_code(condition)
+    if code:
+        with deadline.step("condition"):
+            # Open the condition dropdown (the element itself has data-test="dropdown")
+            yield lambda page: page.locator(
+                "div.dropdown.listing-editor__input--half[menuclickdismiss]"
+            ).first.click(timeout=deadline.ms())
+
+            # Click the appropriate condition option
+            yield lambda page: page.click(
+                f"div[data-et-name='listing_condition'][data-et-prop-content='{code}']",
+                timeout=deadline.ms(),
+            )
+
+    # --- Price ---
+    if price is not None:
+        with deadline.step("price"):
+            yield lambda page: page.fill("input[data-vv-name='listingPrice']", str(price),
+                                         timeout=deadline.ms())
+            # Click the Done button inside the Add Price modal
+            yield lambda page: page.click(
+                "div[data-test='modal-container'].listing-price-suggestion-modal "
+                "div[data-test='modal-footer'] button.btn--primary",
+                timeout=deadline.ms(),
+            )
+            print("✓ Price set and Done clicked")
+
+
+def set_category(main_cat: str, cat_label: str, deadline: Deadline):
+    """
+    Set Poshmark category to:
+
+        <main_cat> > <cat_label>
+
+    Example: "Men" > "Shirts", "Women" > "Jeans".
+
+    Returns True if both clicks succeed, False otherwise.
+    """
+    if not main_cat or not cat_label:
+        print("Missing main_cat or cat_label for Posh category.")
+        return False
+
+    print(f"Setting Poshmark category → {main_cat} > {cat_label}")
+
+    # Open the category dropdown
+    try:
+        yield lambda page: page.click(
+            "div.listing-editor__category-container [data-test='dropdown']",
+            timeout=deadline.ms(),
+        )
+    except Exception as e:
+        print(f"✗ Could not open category dropdown: {e}")
+        return False
+
+    main_key = main_cat.strip().lower()
+
+    # --- 1) Click Men / Women (top-level) ---
+    try:
+        if main_key in ("men", "women"):
+            yield lambda page: page.click(
+                f"a.dropdown__link.dropdown__menu__item[data-et-name='{main_key}']",
+                timeout=deadline.ms(),
+            )
+        else:
+            main_re = re.compile(rf"^\s*{re.escape(main_cat)}\s*$")
+            yield lambda page: page.locator(
+                "a.dropdown__link.dropdown__menu__item p", has_text=main_re,
+            ).first.click(timeout=deadline.ms())
+    except Exception as e:
+        print(f"✗ Failed to click main category {main_cat}: {e}")
+        return False
+
+    # --- 2) Click the main category under that department (Shirts, Jeans, etc.) ---
+    # The click waits for the second list to render after choosing Men/Women
+    try:
+        cat_re = re.compile(rf"^\s*{re.escape(cat_label)}\s*$")
+        yield lambda page: page.locator(
+            "li.dropdown__link.dropdown__menu__item div", has_text=cat_re,
+        ).first.click(timeout=deadline.ms())
+    except Exception as e:
+        print(f"✗ Could not click category {cat_label}: {e}")
+        return False
+
+    # (Optional) Close the dropdown so it’s not hovering
+    try:
+        yield lambda page: page.keyboard.press("Escape")
+    except Exception:
+        pass
+
+    return True
+
+
+def _click_step(selector: str, deadline: Deadline, step: str, label: str):
+    """Click one form button under `deadline`; True if it was clicked."""
+    try:
+        with deadline.step(step):
+            yield lambda page: page.click(selector, timeout=deadline.ms())
+    except Exception as e:
+        _count_failure(e)
+        print(f"✗ Failed to click {label}: {e}")
+        return False
+    print(f"✓ {label} clicked")
+    return True
+
+
+def fill_listing_form(listing, jpg_files: list[Path], on_stage=None):
+    """
+    Walk the Create Listing form for `listing` (an EbayListing) with its
+    processed photos, from opening the page to "List This Item".
+    `on_stage(stage)` is called as "uploaded" and "listed" are reached
+    (see job_ledger.py); RuntimeError if the listing could not be created.
+    Every wait shares one FORM_BUDGET_SECONDS budget.
+    """
+    # Every wait below shares this budget instead of stacking fixed timeouts
+    deadline = Deadline(config.FORM_BUDGET_SECONDS, "posh.form")
+
+    # Navigate Poshmark tab to the Create Listing page
+    print(f"\nOpening Poshmark Create Listing page: {config.POSH_CREATE_URL}")
+    with deadline.step("open"):
+        yield lambda page: page.goto(config.POSH_CREATE_URL, wait_until="domcontentloaded",
+                                     timeout=deadline.ms())
+        yield lambda page: page.wait_for_selector("#img-file-input", timeout=deadline.ms())
+
+    if not jpg_files:
+        print("\nNo JPG files found to upload.")
+    else:
+        print(f"\nUploading {len(jpg_files)} images to Poshmark...")
+
+        # Upload directly to the file input (bypasses OS dialog)
+        with deadline.step("upload"):
+            yield lambda page: page.set_input_files(
+                "#img-file-input", [str(path) for path in jpg_files], timeout=deadline.ms(),
+            )
+        metrics.incr("images_uploaded", len(jpg_files))
+
+    # Title and description don't depend on the photos: fill them while
+    # Poshmark is still processing the upload
+    with deadline.step("text"):
+        yield from fill_text_fields(listing.title, listing.description, deadline)
+
+    if jpg_files:
+        # Click Apply in the photo popup as soon as it is ready
+        yield from _click_step("button[data-et-name='apply']", deadline, "apply",
+                               "Apply button")
+    if on_stage is not None:
+        on_stage("uploaded")
+
+    main_cat, cat_label = map_ebay_category_to_posh(
+        listing.category, listing.title, listing.department,
+    )
+    with deadline.step("category"):
+        category_ok = yield from set_category(main_cat, cat_label, deadline)
+    if not category_ok:
+        raise RuntimeError("Failed to set Poshmark category; cannot continue.")
+
+    yield from fill_listing_fields(listing.size, listing.condition, listing.price, deadline)
+
+    # === Final Steps: Next → List This Item ===
+    # Without both clicks nothing was listed: raise so the caller doesn't
+    # record the title as in the closet
+    if not (yield from _click_step("button[data-et-name='next']", deadline, "next",
+                                   "Next button")):
+        raise RuntimeError("Next button was not clicked; listing not created.")
+    if not (yield from _click_step("button[data-et-name='list']", deadline, "list",
+                                   "List This Item")):
+        raise RuntimeError("List This Item was not clicked; listing not created.")
+    if on_stage is not None:
+        on_stage("listed")
+
+    print(deadline.report())
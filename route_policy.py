@@ -0,0 +1,143 @@
+from collections import Counter
+from urllib.parse import urlsplit
+
+import config, metrics
+
+# Resource types the automation never reads (Playwright request.resource_type)
+DEFAULT_BLOCK_TYPES = ("font", "media", "image")
+
+# Ad, analytics and tag-manager hosts seen on eBay / Poshmark pages;
+# subdomains are matched too ("doubleclick.net" covers "ad.doubleclick.net")
+DEFAULT_BLOCK_DOMAINS = (
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com",
+    "google-analytics.com", "googletagmanager.com", "googletagservices.com",
+    "adservice.google.com", "facebook.net", "connect.facebook.net",
+    "scorecardresearch.com", "criteo.com", "criteo.net", "adnxs.com",
+    "amazon-adsystem.com", "taboola.com", "outbrain.com", "hotjar.com",
+    "quantserve.com", "moatads.com", "rubiconproject.com", "pubmatic.com",
+    "openx.net", "casalemedia.com", "demdex.net", "everesttech.net",
+    "adsrvr.org", "krxd.net", "nr-data.net", "bat.bing.com",
+    "ct.pinterest.com", "analytics.tiktok.com", "branch.io", "px-cloud.net",
+)
+
+# Never blocked, whatever their type: the eBay carousel reads each slide's
+# currentSrc from i.ebayimg.com, so those images must still load
+DEFAULT_ALLOW_DOMAINS = ("ebayimg.com",)
+
+# Rough transfer size of one blocked request, for the "bytes saved" estimate
+ESTIMATED_BYTES = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "script": 80_000,
+    "stylesheet": 30_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+
+def _or_default(setting: tuple[str, ...] | None, default) -> tuple[str, ...]:
+    return tuple(default) if setting is None else setting
+
+
+def _host_in(host: str, domains: frozenset) -> bool:
+    # "a.b.example.com" → check "a.b.example.com", "b.example.com", "example.com", "com"
+    while host:
+        if host in domains:
+            return True
+        _, _, host = host.partition(".")
+    return False
+
+
+class RoutePolicy:
+    """
+    context.route handler that aborts requests the automation doesn't need.
+
+    A request is blocked when its host is in `block_domains`, or its
+    resource type is in `block_types` and its host is not in `allow_domains`.
+    Page documents are never blocked. Counts blocked requests per type and
+    host for the run, with an estimate of the bytes not downloaded.
+    """
+
+    def __init__(self, block_types=DEFAULT_BLOCK_TYPES, block_domains=DEFAULT_BLOCK_DOMAINS,
+                 allow_domains=DEFAULT_ALLOW_DOMAINS):
+        self.block_types = frozenset(block_types) - {"document"}
+        self.block_domains = frozenset(block_domains)
+        self.allow_domains = frozenset(allow_domains)
+        self.allowed = 0
+        self.blocked_types = Counter()
+        self.blocked_hosts = Counter()
+        self.bytes_saved = 0
+
+    @classmethod
+    def from_config(cls) -> "RoutePolicy | None":
+        """
+        Policy configured by ROUTE_BLOCK_TYPES / ROUTE_BLOCK_DOMAINS /
+        ROUTE_ALLOW_DOMAINS (comma-separated, empty to disable that part),
+        or None when ROUTE_POLICY=off.
+        """
+        if not config.ROUTE_POLICY:
+            return None
+        return cls(
+            block_types=_or_default(config.ROUTE_BLOCK_TYPES, DEFAULT_BLOCK_TYPES),
+            block_domains=_or_default(config.ROUTE_BLOCK_DOMAINS, DEFAULT_BLOCK_DOMAINS),
+            allow_domains=_or_default(config.ROUTE_ALLOW_DOMAINS, DEFAULT_ALLOW_DOMAINS),
+        )
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        if resource_type == "document":
+            return False
+        host = (urlsplit(url).hostname or "").lower()
+        if _host_in(host, self.block_domains):
+            return True
+        return resource_type in self.block_types and not _host_in(host, self.allow_domains)
+
+    def _check(self, request) -> bool:
+        """should_block() for a Playwright request, updating the run counters."""
+        resource_type = request.resource_type
+        if not self.should_block(request.url, resource_type):
+            self.allowed += 1
+            return False
+
+        self.blocked_types[resource_type] += 1
+        self.blocked_hosts[urlsplit(request.url).hostname or "?"] += 1
+        estimate = ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        self.bytes_saved += estimate
+        metrics.incr("requests_blocked")
+        metrics.incr("bytes_blocked_estimate", estimate)
+        return True
+
+    def handle(self, route):
+        if self._check(route.request):
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    async def handle_async(self, route):
+        if self._check(route.request):
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def install(self, context):
+        """Route every request of a browser context (all its pages) through the policy."""
+        context.route("**/*", self.handle)
+
+    async def install_async(self, context):
+        """install() for a playwright.async_api context."""
+        await context.route("**/*", self.handle_async)
+
+    def print_stats(self, top: int = 5):
+        blocked = sum(self.blocked_types.values())
+        total = blocked + self.allowed
+        if not total:
+            return
+        by_type = ", ".join(f"{t} {n}" for t, n in self.blocked_types.most_common())
+        print(
+            f"\nROUTES: blocked {blocked} of {total} requests "
+            f"(~{self.bytes_saved / 1e6:.1f} MB not downloaded)"
+            + (f" — {by_type}" if by_type else "")
+        )
+        for host, n in self.blocked_hosts.most_common(top):
+            print(f"  {n:>5}  {host}")
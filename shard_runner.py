@@ -0,0 +1,246 @@
+"""
+Sharded batch runs: N worker processes, each with its own browser profile.
+
+    python shard_runner.py --workers 3
+    python shard_runner.py --workers 3 --engine async --concurrency 2 --limit 50
+
+Worker K runs `ebay_open.py crosslist --batch --shard K/N --trace` with its
+own PROFILE_DIR, DOWNLOAD_DIR, CACHE_DIR and METRICS_DIR under
+SHARD_DIR/worker-K/. Every worker reads the Active Listings itself and keeps
+the items whose item-ID hash falls in its shard, so no coordinating browser
+is needed and a rerun gives each worker the same items. The job ledger and
+closet index are shared; SQLite locks them across processes. The cache is
+not: a worker trimming it would delete photos another worker had just looked
+up, so each worker has its own, with an equal share of CACHE_MAX_MB.
+
+A worker profile that doesn't exist yet is copied from PROFILE_DIR, so it
+starts with the same eBay and Poshmark logins. When every worker is done,
+their traces are merged into one report (printed and saved as
+SHARD_DIR/report-<time>.json).
+"""
+from pathlib import Path
+
+import argparse, hashlib, json, os, shutil, subprocess, sys, time
+
+import config
+
+REPO_DIR = Path(__file__).resolve().parent
+
+# Chromium's lock files; a copied profile must not inherit them
+PROFILE_LOCKS = ("SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile")
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Stable 1-based shard for a ledger key (unlike hash(), the same in every process)."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards + 1
+
+
+def parse_shard(text: str) -> tuple[int, int]:
+    """argparse type for K/N (worker K of N, 1-based)."""
+    try:
+        k, n = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected K/N, e.g. 1/3, not {text!r}") from None
+    if not 1 <= k <= n:
+        raise argparse.ArgumentTypeError(f"shard {k} is not between 1 and {n}")
+    return k, n
+
+
+def worker_dir(k: int) -> Path:
+    return config.SHARD_DIR / f"worker-{k}"
+
+
+def seed_profile(profile: Path):
+    """Copy the main browser profile for a new worker, so it starts logged in."""
+    if profile.exists() or not config.PROFILE_DIR.exists():
+        return
+    print(f"Copying {config.PROFILE_DIR} to {profile}")
+    shutil.copytree(config.PROFILE_DIR, profile, symlinks=True,
+                    ignore=shutil.ignore_patterns(*PROFILE_LOCKS))
+
+
+def worker_env(k: int, workers: int, concurrency: int) -> dict:
+    """Environment for worker K: its own directories and a share of the machine."""
+    root = worker_dir(k)
+    return {
+        **os.environ,
+        "PROFILE_DIR": str(root / "profile"),
+        "DOWNLOAD_DIR": str(root / "downloads"),
+        "CACHE_DIR": str(root / "cache"),
+        "CACHE_MAX_MB": str(config.CACHE_MAX_BYTES / workers / (1024 * 1024)),
+        "METRICS_DIR": str(root / "metrics"),
+        "EXTRACT_TABS": str(min(config.EXTRACT_TABS, concurrency)),
+        "EXTRACT_CONCURRENCY": str(min(config.EXTRACT_CONCURRENCY, concurrency)),
+        "DOWNLOAD_CONCURRENCY": str(min(config.DOWNLOAD_CONCURRENCY, concurrency)),
+        "IMAGE_WORKERS": str(max(1, (os.cpu_count() or 1) // workers)),
+        "PYTHONUNBUFFERED": "1",
+    }
+
+
+def start_workers(args) -> list[tuple[int, subprocess.Popen, Path]]:
+    procs = []
+    for k in range(1, args.workers + 1):
+        root = worker_dir(k)
+        root.mkdir(parents=True, exist_ok=True)
+        seed_profile(root / "profile")
+        # Only this run's trace should be merged
+        for old in (root / "metrics").glob("run-*.jsonl"):
+            old.unlink()
+
+        cmd = [sys.executable, str(REPO_DIR / "ebay_open.py"), "crosslist", "--batch",
+               "--shard", f"{k}/{args.workers}", "--trace"]
+        if args.limit is not None:
+            cmd += ["--limit", str(args.limit)]
+        if args.engine:
+            cmd += ["--engine", args.engine]
+        if args.extract_backend:
+            cmd += ["--extract-backend", args.extract_backend]
+
+        log = root / "run.log"
+        with open(log, "w", encoding="utf-8") as out:
+            proc = subprocess.Popen(cmd, cwd=REPO_DIR, stdin=subprocess.DEVNULL, stdout=out,
+                                    stderr=subprocess.STDOUT,
+                                    env=worker_env(k, args.workers, args.concurrency))
+        print(f"worker {k}/{args.workers}: pid {proc.pid}, log {log}")
+        procs.append((k, proc, log))
+    return procs
+
+
+def read_trace(k: int) -> dict:
+    """Listing outcomes, stage totals and counters from worker K's trace."""
+    summary = {"worker": k, "statuses": {}, "listing_seconds": 0.0, "run_seconds": None,
+               "stages": {}, "counters": {}}
+    paths = sorted((worker_dir(k) / "metrics").glob("run-*.jsonl"))
+    if not paths:
+        return summary
+    with open(paths[-1], encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if "span" not in entry:
+                summary["run_seconds"] = entry["seconds"]
+                summary["counters"] = entry["counters"]
+                continue
+            stage = summary["stages"].setdefault(entry["span"], [0, 0.0, 0.0])
+            stage[0] += 1
+            stage[1] += entry["seconds"]
+            stage[2] = max(stage[2], entry["seconds"])
+            if entry["span"] == "listing":
+                status = entry.get("labels", {}).get("status", "failed")
+                summary["statuses"][status] = summary["statuses"].get(status, 0) + 1
+                summary["listing_seconds"] += entry["seconds"]
+    return summary
+
+
+def merge(summaries: list[dict], wall: float) -> dict:
+    statuses, stages, counters = {}, {}, {}
+    for s in summaries:
+        for status, n in s["statuses"].items():
+            statuses[status] = statuses.get(status, 0) + n
+        for name, (count, total, longest) in s["stages"].items():
+            merged = stages.setdefault(name, [0, 0.0, 0.0])
+            merged[0] += count
+            merged[1] += total
+            merged[2] = max(merged[2], longest)
+        for name, value in s["counters"].items():
+            counters[name] = counters.get(name, 0) + value
+    listings = sum(statuses.values())
+    return {
+        "workers": len(summaries),
+        "wall_seconds": round(wall, 3),
+        "listings": listings,
+        "listings_per_min": round(listings / (wall / 60), 2) if wall > 0 else 0.0,
+        "statuses": statuses,
+        "stages": stages,
+        "counters": counters,
+        "per_worker": summaries,
+    }
+
+
+def print_report(report: dict, exit_codes: dict):
+    print(f"\n{'worker':<8}{'exit':>5}{'listings':>10}{'created':>9}{'exists':>8}"
+          f"{'failed':>8}{'run s':>9}{'per min':>9}")
+    for s in report["per_worker"]:
+        n = sum(s["statuses"].values())
+        run_s = s["run_seconds"]
+        rate = f"{n / (run_s / 60):.1f}" if run_s else "-"
+        print(f"{s['worker']:<8}{exit_codes[s['worker']]:>5}{n:>10}"
+              f"{s['statuses'].get('created', 0):>9}{s['statuses'].get('exists', 0):>8}"
+              f"{s['statuses'].get('failed', 0):>8}{run_s or 0:>9.1f}{rate:>9}")
+    st = report["statuses"]
+    print(f"\nSHARDED RUN: {report['listings']} listings in {report['wall_seconds']:.1f}s "
+          f"across {report['workers']} workers ({report['listings_per_min']:.2f} listings/min) "
+          f"— created {st.get('created', 0)}, already listed {st.get('exists', 0)}, "
+          f"failed {st.get('failed', 0)}")
+
+    print(f"\n{'stage (all workers)':<32}{'count':>7}{'total s':>10}{'mean s':>9}{'max s':>9}")
+    for name, (count, total, longest) in sorted(report["stages"].items(),
+                                                key=lambda kv: -kv[1][1])[:15]:
+        print(f"{name:<32}{count:>7}{total:>10.2f}{total / count:>9.2f}{longest:>9.2f}")
+
+
+def run(args) -> int:
+    config.require_urls()
+    if args.restart:
+        from job_ledger import JobLedger
+
+        ledger = JobLedger(config.LEDGER_PATH)
+        print(f"Cleared {ledger.reset()} job ledger entries.")
+        ledger.close()
+
+    start = time.perf_counter()
+    procs = start_workers(args)
+    exit_codes = {}
+    try:
+        for k, proc, log in procs:
+            exit_codes[k] = proc.wait()
+            print(f"worker {k}/{args.workers} exited {exit_codes[k]} after "
+                  f"{time.perf_counter() - start:.1f}s")
+    except KeyboardInterrupt:
+        print("\nStopping workers...")
+        for k, proc, _ in procs:
+            proc.terminate()
+        for k, proc, _ in procs:
+            exit_codes[k] = proc.wait()
+    wall = time.perf_counter() - start
+
+    report = merge([read_trace(k) for k, _, _ in procs], wall)
+    report["exit_codes"] = exit_codes
+    print_report(report, exit_codes)
+    path = config.SHARD_DIR / f"report-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nReport: {path}")
+    failed = [k for k, code in exit_codes.items() if code != 0]
+    if failed:
+        print(f"Workers {', '.join(map(str, failed))} failed; see their run.log.")
+    return 1 if failed else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Crosslist with several browser processes, each on a shard of the listings.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: $SHARD_WORKERS or 2)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="cap on each worker's extraction tabs/requests and parallel "
+                             "downloads (default: $SHARD_CONCURRENCY or 2)")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="stop each worker after this many listings")
+    parser.add_argument("--engine", choices=("sync", "async"), default=None,
+                        help="worker engine (default: $ENGINE or sync)")
+    parser.add_argument("--extract-backend", choices=("browser", "http"), default=None,
+                        help="worker extraction backend (default: $EXTRACT_BACKEND or browser)")
+    parser.add_argument("--restart", action="store_true",
+                        help="forget the job ledger first and process every listing again")
+    args = parser.parse_args(argv)
+    args.workers = max(1, args.workers or config.SHARD_WORKERS)
+    args.concurrency = max(1, args.concurrency or config.SHARD_CONCURRENCY)
+    return args
+
+
+def main(argv=None):
+    return run(parse_args(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,6 @@
+from pathlib import Path
+
+import sys
+
+# The modules live at the repository root, next to this folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
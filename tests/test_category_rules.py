@@ -0,0 +1,69 @@
+import re
+
+import pytest
+
+from category_rules import (
+    CATEGORY_RULES,
+    FALLBACK_SUBCATEGORY,
+    classify_many,
+    map_ebay_category_to_posh,
+)
+
+
+def reference_map(category, title, department):
+    """The rule table checked one keyword at a time, first rule first."""
+    main_cat, _ = map_ebay_category_to_posh("", "", department)
+    text = (category or "").lower() + " " + (title or "").lower()
+    for women_label, men_label, words in CATEGORY_RULES:
+        if main_cat == "Men" and men_label is None:
+            continue
+        for w in words:
+            if re.search(rf"(?<![a-z0-9]){re.escape(w)}(?:s|es)?(?![a-z0-9])", text):
+                return main_cat, women_label if main_cat == "Women" else men_label
+    return main_cat, FALLBACK_SUBCATEGORY
+
+
+@pytest.mark.parametrize("title, department, expected", [
+    # Keywords inside longer words don't count
+    ("Cutie pie sweater", "Women", "Sweaters"),
+    ("Strawberry print", "Women", FALLBACK_SUBCATEGORY),
+    ("Cropped capris", "Women", "Pants & Jumpsuits"),
+    # Whole words, with an optional plural
+    ("Baseball cap", "Men", "Accessories"),
+    ("Red silk tie", "Men", "Accessories"),
+    ("Leather belts", "Men", "Accessories"),
+    ("Gold rings", "Women", "Jewelry"),
+    ("Wool trousers", "Men", "Pants"),
+])
+def test_whole_word_matching(title, department, expected):
+    assert map_ebay_category_to_posh("", title, department) == (department, expected)
+
+
+def test_earlier_rule_wins():
+    # "dress shoes" contains "dress", but Shoes comes first in the table
+    assert map_ebay_category_to_posh("", "Nike dress shoes", "Men") == ("Men", "Shoes")
+    assert map_ebay_category_to_posh("", "Maxi dress", "Women") == ("Women", "Dresses")
+
+
+def test_women_only_rules_skipped_for_men():
+    assert map_ebay_category_to_posh("", "Maxi dress", "Men") == ("Men", FALLBACK_SUBCATEGORY)
+
+
+def test_category_and_department():
+    assert map_ebay_category_to_posh("Jeans", "Levis 501", "Unisex Adult") == ("Men", "Jeans")
+    assert map_ebay_category_to_posh(None, None, None) == ("Women", FALLBACK_SUBCATEGORY)
+
+
+def test_compiled_matcher_agrees_with_table():
+    words = sorted({w for _, _, ws in CATEGORY_RULES for w in ws})
+    titles = [f"vintage {a} with {b}" for a in words for b in words[::7]]
+    titles += [f"{w}s" for w in words] + [f"x{w} {w}y" for w in words]
+    for department in ("Women", "Men"):
+        for title in titles:
+            assert map_ebay_category_to_posh("", title, department) == \
+                reference_map("", title, department), title
+
+
+def test_classify_many_keeps_order():
+    rows = [("", "Maxi dress", "Women"), ("", "Baseball cap", "Men"), ("", "Thing", "Women")]
+    assert classify_many(rows) == [map_ebay_category_to_posh(*row) for row in rows]
@@ -0,0 +1,84 @@
+from urllib.parse import parse_qsl, urlsplit
+
+import json
+
+import pytest
+
+from closet_feed import ClosetPage, feed_style, is_json_response, page_url, parse_closet_payload
+
+CURSOR_URL = "https://poshmark.test/vm-rest/users/me/posts?max_id=abc&count=48"
+OFFSET_URL = "https://poshmark.test/api/closet?offset=96&limit=48"
+REQUEST_URL = ("https://poshmark.test/vm-rest/users/me/posts/filtered?"
+               "request=%7B%22max_id%22%3A%225%22%2C%22count%22%3A48%7D&summarize=true")
+
+
+def query(url: str) -> dict:
+    return dict(parse_qsl(urlsplit(url).query, keep_blank_values=True))
+
+
+class Response:
+    def __init__(self, content_type=None):
+        self.headers = {"content-type": content_type} if content_type else {}
+
+
+def test_json_responses():
+    assert is_json_response(Response("application/json; charset=utf-8"))
+    assert not is_json_response(Response("text/html"))
+    assert not is_json_response(Response())
+
+
+def test_parse_cursor_page():
+    payload = {"data": [{"id": "a1", "title": " Levi's 501 "}, {"id": "a2", "title": "Nike"}],
+               "more": {"next_max_id": 17}}
+    assert parse_closet_payload(payload) == ClosetPage([("a1", "Levi's 501"), ("a2", "Nike")],
+                                                       True, "17")
+    payload["more"] = {"next_max_id": None}
+    assert parse_closet_payload(payload) == ClosetPage([("a1", "Levi's 501"), ("a2", "Nike")],
+                                                       False, None)
+
+
+def test_parse_pair_page():
+    payload = {"data": [["a1", "Levi's 501"]], "more_available": False}
+    assert parse_closet_payload(payload) == ClosetPage([("a1", "Levi's 501")], False)
+
+
+@pytest.mark.parametrize("payload", [
+    None,
+    [],
+    {"data": {"id": "a1"}},
+    {"data": [{"id": "a1", "title": "Levi's 501"}]},                 # no paging field
+    {"data": [{"id": 1, "title": "Levi's 501"}], "more_available": False},
+    {"data": [["a1"]], "more_available": False},
+    {"data": ["a1"], "more_available": False},
+    {"data": [], "more_available": "yes"},
+])
+def test_unknown_payloads(payload):
+    assert parse_closet_payload(payload) is None
+
+
+def test_feed_style():
+    assert feed_style(CURSOR_URL) == "cursor"
+    assert feed_style(REQUEST_URL) == "cursor"
+    assert feed_style(OFFSET_URL) == "offset"
+    assert feed_style("https://poshmark.test/api/closet?count=48") is None
+    assert feed_style("https://poshmark.test/api/closet?request=not-json") is None
+
+
+def test_page_url_offset():
+    assert query(page_url(OFFSET_URL, "offset")) == {"offset": "0", "limit": "48"}
+    assert query(page_url(OFFSET_URL, "offset", offset=48))["offset"] == "48"
+
+
+def test_page_url_cursor():
+    assert query(page_url(CURSOR_URL, "cursor")) == {"count": "48"}
+    assert query(page_url(CURSOR_URL, "cursor", cursor="xyz")) == {"max_id": "xyz", "count": "48"}
+    url = page_url(CURSOR_URL, "cursor", cursor="xyz")
+    assert url.startswith("https://poshmark.test/vm-rest/users/me/posts?")
+
+
+def test_page_url_cursor_in_request_param():
+    first = query(page_url(REQUEST_URL, "cursor"))
+    assert json.loads(first["request"]) == {"count": 48}
+    assert first["summarize"] == "true"
+    later = query(page_url(REQUEST_URL, "cursor", cursor="9"))
+    assert json.loads(later["request"]) == {"max_id": "9", "count": 48}
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from closet_index import ClosetIndex, posh_listing_id
+
+LEVIS = "65a1f0c2b3d4e5f6a7b8c9d0"
+NIKE = "65a1f0c2b3d4e5f6a7b8c9d1"
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ClosetIndex(tmp_path / "closet.sqlite3")
+    yield index
+    index.close()
+
+
+def scanned_before(index: ClosetIndex, seconds: float):
+    """Backdate every row, as if the last scan ran `seconds` ago."""
+    with index.conn:
+        index.conn.execute("UPDATE listings SET last_seen = last_seen - ?", (seconds,))
+
+
+def test_listing_id_from_href():
+    assert posh_listing_id(f"/listing/Levis-501-Jeans-32x32-{LEVIS}") == LEVIS
+    assert posh_listing_id(f"https://poshmark.com/listing/x-{LEVIS}/?ref=closet") == LEVIS
+    assert posh_listing_id("/listing/some-slug") == "some-slug"
+    assert posh_listing_id("") is None
+
+
+def test_upsert_counts_new_ids(index):
+    assert index.upsert_scanned([(LEVIS, "Levi's 501 Jeans")]) == 1
+    assert index.upsert_scanned([(LEVIS, "Levi's 501 Jeans 32x32"), (NIKE, "Nike Air Max 90")]) == 1
+    assert index.known_ids() == {LEVIS, NIKE}
+    assert index.titles() == ["Levi's 501 Jeans 32x32", "Nike Air Max 90"]
+
+
+def test_scan_replaces_created_placeholder(index):
+    index.add_created("Nike Air Max 90")
+    index.add_created("Nike Air Max 90")
+    assert index.titles() == ["Nike Air Max 90"]
+    assert index.known_ids() == set()
+
+    index.upsert_scanned([(NIKE, "Nike Air Max 90")])
+    assert len(index) == 1
+    assert index.known_ids() == {NIKE}
+
+
+def test_prune_drops_unseen_rows(index):
+    index.upsert_scanned([(LEVIS, "Levi's 501 Jeans"), (NIKE, "Nike Air Max 90")])
+    scanned_before(index, 60)
+    assert index.last_full_scan() is None
+
+    scan_start = time.time()
+    index.upsert_scanned([(NIKE, "Nike Air Max 90")])
+    assert index.prune_unseen(scan_start) == 1
+    assert index.titles() == ["Nike Air Max 90"]
+    assert index.last_full_scan() >= scan_start
+
+
+def test_prune_drops_unmatched_placeholders(index):
+    # Created before the rescan, but the closet never showed it
+    index.add_created("Levi's 501 Jeans")
+    scanned_before(index, 60)
+    scan_start = time.time()
+    # Created while the rescan was running: kept
+    index.add_created("Nike Air Max 90")
+    assert index.prune_unseen(scan_start) == 1
+    assert index.titles() == ["Nike Air Max 90"]
@@ -0,0 +1,49 @@
+import pytest
+
+import deadline
+from deadline import Deadline, DeadlineExceeded
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(deadline.time, "perf_counter", clock)
+    return clock
+
+
+def test_every_wait_shares_the_budget(clock):
+    d = Deadline(10, "posh.form")
+    assert d.ms() == 10_000
+    clock.now += 4
+    assert d.ms() == 6_000
+    clock.now += 6
+    with pytest.raises(DeadlineExceeded, match="posh.form budget of 10s used up"):
+        d.ms()
+
+
+def test_exceeded_is_a_timeout():
+    # Callers count it with the Playwright timeouts
+    assert issubclass(DeadlineExceeded, TimeoutError)
+
+
+def test_steps_add_up_even_when_they_fail(clock):
+    d = Deadline(90, "posh.form")
+    with d.step("open"):
+        clock.now += 1.5
+    for _ in range(2):
+        with d.step("category"):
+            clock.now += 0.25
+    with pytest.raises(RuntimeError):
+        with d.step("list"):
+            clock.now += 2
+            raise RuntimeError("List This Item was not clicked")
+    assert d.steps == {"open": 1.5, "category": 0.5, "list": 2.0}
+    assert d.report() == "posh.form 4.0s of 90s: open 1.50s, category 0.50s, list 2.00s"
@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import pytest
+
+import ebay_http, net_policy
+from ebay_http import parse_description_html, parse_item_html
+from net_policy import NetPolicy
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+ITEM_URL = "https://www.ebay.com/itm/123456789012"
+
+
+class Response:
+    def __init__(self, url: str, text: str, status: int = 200):
+        self.url = url
+        self.text = text
+        self.status_code = status
+        self.ok = status < 400
+        self.headers = {}
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class Session:
+    """Serves the fixture item page and its description iframe."""
+
+    def __init__(self):
+        self.requested = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requested.append(url)
+        name = "ebay_desc.html" if "/itmdesc/" in url else "ebay_item.html"
+        return Response(url, (FIXTURES / name).read_text(encoding="utf-8"))
+
+
+@pytest.fixture(autouse=True)
+def no_retries(monkeypatch):
+    monkeypatch.setattr(net_policy, "_policy", NetPolicy(retries=0))
+
+
+def test_parse_item_page():
+    listing, desc_url = parse_item_html((FIXTURES / "ebay_item.html").read_text(), ITEM_URL)
+    assert listing.title == "Levi's 501 Original Fit Jeans Men's 32x32 Dark Wash"
+    assert (listing.department, listing.size, listing.price) == ("Men", "32x32", 35)
+    assert listing.condition == "Pre-owned - Excellent"
+    assert listing.category == "Jeans"
+    assert listing.image_urls == [
+        "https://i.ebayimg.com/images/g/abcAAOSw1/s-l1600.webp",
+        "https://i.ebayimg.com/images/g/defAAOSw2/s-l1600.webp",
+        "https://i.ebayimg.com/images/g/ghiAAOSw3/s-l1600.jpg",
+    ]
+    assert desc_url == "https://www.ebay.com/itmdesc/1234567890?t=0"
+
+
+def test_parse_description():
+    text = parse_description_html((FIXTURES / "ebay_desc.html").read_text())
+    assert text.startswith("Levi's 501 Original Fit, button fly.\n")
+    assert "Inseam 32\"" in text.splitlines()
+
+
+def test_fetch_listing_reads_page_and_description():
+    session = Session()
+    listing = ebay_http.fetch_listing(ITEM_URL, item_id="123456789012", session=session)
+    assert listing.item_id == "123456789012"
+    assert listing.description.endswith("Smoke-free home")
+    assert session.requested == [ITEM_URL, "https://www.ebay.com/itmdesc/1234567890?t=0"]
+
+
+def test_fetch_listing_without_title_fails():
+    class Blank(Session):
+        def get(self, url, headers=None, timeout=None):
+            return Response(url, "<html><body>Sign in</body></html>")
+
+    with pytest.raises(RuntimeError, match="No eBay title"):
+        ebay_http.fetch_listing(ITEM_URL, session=Blank())
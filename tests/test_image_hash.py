@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from image_hash import HASH_BITS, HammingIndex, image_fingerprint
+
+
+def flip(h: int, bits) -> int:
+    for bit in bits:
+        h ^= 1 << bit
+    return h
+
+
+@pytest.mark.parametrize("distance", range(HASH_BITS))
+def test_ranges_cover_every_bit_once(distance):
+    index = HammingIndex(distance)
+    assert len(index.ranges) == distance + 1
+    covered = 0
+    for shift, mask in index.ranges:
+        assert covered >> shift == 0
+        covered |= mask << shift
+    assert covered == (1 << HASH_BITS) - 1
+
+
+@pytest.mark.parametrize("distance", range(HASH_BITS))
+def test_finds_hashes_exactly_max_distance_away(distance):
+    rng = random.Random(distance)
+    index = HammingIndex(distance)
+    h = rng.getrandbits(HASH_BITS)
+    index.add(h, "photo")
+    # Worst case: one bit off in each of the first `distance` ranges
+    worst = flip(h, [shift for shift, _ in index.ranges[:distance]])
+    assert index.search(worst) == [(distance, "photo")]
+    for _ in range(5):
+        near = flip(h, rng.sample(range(HASH_BITS), distance))
+        assert index.search(near) == [(distance, "photo")]
+    if distance + 1 < HASH_BITS:
+        assert index.search(flip(h, range(distance + 1))) == []
+
+
+def test_search_matches_a_linear_scan():
+    rng = random.Random(11)
+    index = HammingIndex(10)
+    hashes = [rng.getrandbits(HASH_BITS) for _ in range(500)]
+    for n, h in enumerate(hashes):
+        index.add(h, n)
+    queries = [flip(rng.choice(hashes), rng.sample(range(HASH_BITS), rng.randint(0, 12)))
+               for _ in range(200)]
+    for q in queries:
+        for distance in (4, 10):
+            expected = sorted(n for n, h in enumerate(hashes) if (h ^ q).bit_count() <= distance)
+            assert sorted(n for _, n in index.search(q, distance)) == expected
+
+
+def test_distance_limits():
+    index = HammingIndex(4)
+    index.add(0, "photo")
+    with pytest.raises(ValueError):
+        index.search(0, 5)
+    assert index.search(0, -1) == []
+    assert HammingIndex(-1).search(0) == []
+    with pytest.raises(ValueError):
+        HammingIndex(HASH_BITS)
+
+
+@pytest.mark.parametrize("size", [(1, 1), (5, 3), (7, 200), (64, 48)])
+def test_fingerprint_of_small_jpegs(tmp_path, size):
+    from PIL import Image
+
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", size, "red").save(path, "JPEG")
+    h, width, height = image_fingerprint(path)
+    assert (width, height) == size
+    assert 0 <= h < 1 << HASH_BITS
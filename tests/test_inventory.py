@@ -0,0 +1,138 @@
+import pytest
+
+import net_policy
+from inventory import (
+    InventoryItem,
+    fetch_pages_http,
+    nth_page_url,
+    page_param,
+    parse_active_page,
+    reconcile,
+    write_plan_tsv,
+)
+from net_policy import NetPolicy
+
+BASE = "https://www.ebay.com/sh/lst/active"
+
+
+@pytest.fixture(autouse=True)
+def no_retries(monkeypatch):
+    monkeypatch.setattr(net_policy, "_policy", NetPolicy(retries=0))
+
+
+def active_page(ids, next_href=None, disabled=False) -> str:
+    rows = "".join(
+        f'<tr><td><a href="/itm/{i}"><img alt=""></a></td>'
+        f'<td><a href="https://www.ebay.com/itm/Title-{i}/{i}?hash=x">Item {i} title</a></td>'
+        f'<td>$1,{i % 1000:03d}.00</td></tr>'
+        for i in ids
+    )
+    nav = ""
+    if next_href is not None:
+        flag = ' aria-disabled="true"' if disabled else ""
+        nav = f'<a class="pagination__next" href="{next_href}"{flag}>Next</a>'
+    return f"<html><body><table>{rows}</table>{nav}</body></html>"
+
+
+def item(item_id: str, title: str) -> InventoryItem:
+    return InventoryItem(item_id, title, None, f"https://www.ebay.com/itm/{item_id}")
+
+
+def test_parse_active_page():
+    items, next_url = parse_active_page(active_page([101, 102], "?offset=200&limit=200"),
+                                        BASE + "?limit=200")
+    assert items == [
+        InventoryItem("101", "Item 101 title", "1101.00", "https://www.ebay.com/itm/101"),
+        InventoryItem("102", "Item 102 title", "1102.00", "https://www.ebay.com/itm/102"),
+    ]
+    assert next_url == BASE + "?offset=200&limit=200"
+    assert parse_active_page(active_page([101], "?offset=400", disabled=True), BASE)[1] is None
+
+
+@pytest.mark.parametrize("current, next_url, expected", [
+    (BASE, BASE + "?page=2", ("page", 1, 1)),
+    (BASE + "?limit=200", BASE + "?limit=200&offset=200", ("offset", 0, 200)),
+    (BASE + "?offset=200&limit=200", BASE + "?offset=400&limit=200", ("offset", 200, 200)),
+    (BASE + "?pg=3", BASE + "?pg=4&sort=-price", ("pg", 3, 1)),
+    (BASE + "?start=0", BASE + "?start=50", ("start", 0, 50)),
+    (BASE + "?page=2", BASE + "?page=2&tab=a", None),
+    (BASE, BASE + "?cursor=abc", None),
+])
+def test_page_param(current, next_url, expected):
+    assert page_param(current, next_url) == expected
+
+
+def test_nth_page_url():
+    next_url = BASE + "?limit=200&offset=200"
+    paging = page_param(BASE + "?limit=200", next_url)
+    assert nth_page_url(next_url, paging, 1) == BASE + "?limit=200&offset=0"
+    assert nth_page_url(next_url, paging, 4) == BASE + "?limit=200&offset=600"
+
+
+class Response:
+    def __init__(self, url: str, text: str):
+        self.url = url
+        self.text = text
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+
+class Session:
+    """Active Listings with `pages` pages of two items each, paged by ?page=N."""
+
+    def __init__(self, pages: int, empty=(), broken=()):
+        self.pages = pages
+        self.empty = set(empty)
+        self.broken = set(broken)
+
+    def get(self, url, timeout=None):
+        n = int(url.rsplit("page=", 1)[1])
+        if n in self.broken:
+            raise ConnectionError(f"page {n}")
+        ids = [] if n in self.empty or n > self.pages else [n * 10, n * 10 + 1]
+        next_href = f"?page={n + 1}" if n < self.pages else None
+        return Response(url, active_page(ids, next_href))
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_fetch_pages_http_stops_at_the_last_page(workers):
+    pages = fetch_pages_http(Session(5), BASE + "?page=2", ("page", 1, 1), workers)
+    assert sorted(pages) == [2, 3, 4, 5]
+    assert [i.item_id for i in pages[5]] == ["50", "51"]
+
+
+def test_fetch_pages_http_gives_up():
+    # Page 2 empty: HTTP doesn't see the logged-in list
+    assert fetch_pages_http(Session(5, empty={2}), BASE + "?page=2", ("page", 1, 1), 2) is None
+    # A failed page would leave a gap
+    assert fetch_pages_http(Session(5, broken={3}), BASE + "?page=2", ("page", 1, 1), 2) is None
+
+
+def test_reconcile():
+    closet = ["Levi's 501 Original Fit Jeans 32x32", "Nike Air Max 90 White Size 10"]
+    items = [
+        item("1", "Levi's 501 Original Fit Jeans 32x32"),      # exact
+        item("2", "Patagonia Better Sweater Fleece Jacket"),    # new
+        item("3", "Patagonia Better Sweater Fleece Jacket"),    # same as 2
+        item("4", "Nike Air Max 90 White Sz 10"),               # close to a closet title
+        item("5", "Lululemon Align Leggings"),                  # listed by the ledger
+    ]
+    plan = reconcile(items, closet, threshold=0.85, duplicate_threshold=0.5, listed_ids={"5"})
+    assert [(e.item.item_id, e.action) for e in plan] == [
+        ("1", "crosslisted"), ("2", "create"), ("3", "duplicate"), ("4", "duplicate"),
+        ("5", "crosslisted"),
+    ]
+    assert plan[0].reason.startswith("exact 1.00")
+    assert plan[2].reason == "same title as eBay item 2"
+    assert plan[3].reason.endswith("Nike Air Max 90 White Size 10")
+
+
+def test_write_plan_tsv(tmp_path):
+    plan = reconcile([item("1", "Levi's 501\tJeans")], [], 0.85, 0.7)
+    path = tmp_path / "plan.tsv"
+    write_plan_tsv(plan, path)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "item_id\ttitle\tprice\taction\treason"
+    assert lines[1] == '1\t"Levi\'s 501\tJeans"\t\tcreate\t'
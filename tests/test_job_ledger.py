@@ -0,0 +1,113 @@
+import pytest
+
+from job_ledger import JobLedger, ledger_key
+
+URL = "https://www.ebay.com/itm/{}"
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = JobLedger(tmp_path / "jobs.sqlite3")
+    yield ledger
+    ledger.close()
+
+
+def test_key_is_the_item_id_or_the_url():
+    assert ledger_key(URL.format(1), "1") == "1"
+    assert ledger_key("https://www.ebay.com/itm/x", None) == "https://www.ebay.com/itm/x"
+
+
+def test_stages_in_order(ledger):
+    entry = ledger.start("1", URL.format(1))
+    assert entry.stage is None and entry.attempts == 1
+    assert not entry.reached("extracted")
+
+    ledger.advance("1", "extracted", "Levi's 501 Jeans")
+    ledger.advance("1", "images_ready")
+    entry = ledger.get("1")
+    assert entry.title == "Levi's 501 Jeans"
+    assert entry.reached("extracted") and entry.reached("images_ready")
+    assert not entry.reached("uploaded") and not entry.done
+
+    ledger.advance("1", "exists")
+    assert ledger.get("1").reached("listed")
+    assert ledger.done_keys() == {"1"}
+
+
+@pytest.mark.parametrize("stage, step", [
+    (None, "extract"),
+    ("extracted", "images"),
+    ("images_ready", "upload"),
+    ("uploaded", "form"),
+])
+def test_failure_is_the_step_after_the_last_stage(ledger, stage, step):
+    ledger.start("1", URL.format(1))
+    if stage is not None:
+        ledger.advance("1", stage)
+    ledger.fail("1", "TimeoutError: boom")
+    entry = ledger.get("1")
+    assert (entry.stage, entry.failed_step, entry.error) == (stage, step, "TimeoutError: boom")
+
+
+def test_resume_after_a_crash(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    ledger = JobLedger(path)
+    for key in ("1", "2", "3"):
+        ledger.start(key, URL.format(key))
+        ledger.advance(key, "extracted")
+    ledger.advance("1", "listed")
+    ledger.advance("2", "uploaded")
+    ledger.fail("2", "RuntimeError: List This Item was not clicked")
+    ledger.close()  # the process dies here
+
+    ledger = JobLedger(path)
+    assert ledger.done_keys() == {"1"}
+    assert [e.key for e in ledger.failures()] == ["2"]
+
+    # Retrying counts the attempt and keeps the progress; success clears the failure
+    entry = ledger.start("2", URL.format(2))
+    assert (entry.stage, entry.attempts) == ("uploaded", 2)
+    ledger.advance("2", "listed")
+    assert ledger.failures() == []
+    assert ledger.stage_counts() == {"listed": 2, "extracted": 1}
+    ledger.close()
+
+
+def test_pending_skips_done_items_then_limits(ledger):
+    from ebay_open import pending_listing_urls
+
+    urls = [URL.format(n) for n in range(1, 7)]
+    for n in (2, 4):
+        ledger.start(str(n), URL.format(n))
+        ledger.advance(str(n), "listed" if n == 2 else "exists")
+    ledger.start("5", URL.format(5))  # started, not done
+    assert pending_listing_urls(urls, ledger) == [urls[0], urls[2], urls[4], urls[5]]
+    assert pending_listing_urls(urls, ledger, limit=2) == [urls[0], urls[2]]
+
+
+def test_shards_split_the_pending_items(ledger):
+    from ebay_open import pending_listing_urls
+
+    urls = [URL.format(n) for n in range(100, 160)]
+    shards = [pending_listing_urls(urls, ledger, shard=(k, 3)) for k in (1, 2, 3)]
+    assert sorted(u for shard in shards for u in shard) == sorted(urls)
+    assert all(shards)
+
+
+def test_report_groups_failures_by_step(ledger, capsys):
+    ledger.start("1", URL.format(1))
+    ledger.fail("1", "TimeoutError: item page")
+    ledger.start("2", URL.format(2))
+    ledger.advance("2", "uploaded", "Nike Air Max 90")
+    ledger.fail("2", "RuntimeError: List This Item was not clicked")
+    ledger.start("3", URL.format(3))
+    ledger.advance("3", "listed")
+
+    ledger.print_report()
+    out = capsys.readouterr().out
+    assert "LEDGER: started 1, uploaded 1, listed 1" in out
+    assert out.index("Failed at extract (1)") < out.index("Failed at form (1)")
+    assert "2  Nike Air Max 90  (attempts: 1)" in out
+
+    assert ledger.reset() == 3
+    assert ledger.done_keys() == set()
@@ -0,0 +1,154 @@
+import pytest
+
+import config, ebay_http, ebay_open, net_policy
+from ebay_listing import EbayListing
+from listing_cache import ListingCache, conditional_headers
+from net_policy import NetPolicy
+
+ITEM_URL = "https://www.ebay.com/itm/1"
+IMAGE_URL = "https://i.ebayimg.com/images/g/abc/s-l1600.jpg"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ListingCache(tmp_path / "cache", max_bytes=250)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture(autouse=True)
+def no_retries(monkeypatch):
+    monkeypatch.setattr(net_policy, "_policy", NetPolicy(retries=0))
+
+
+def aged(cache: ListingCache, table: str, seconds: float):
+    """Make every row of `table` look fetched `seconds` earlier."""
+    with cache.conn:
+        cache.conn.execute(f"UPDATE {table} SET fetched_at = fetched_at - ?", (seconds,))
+
+
+def blob(cache: ListingCache, url: str, digest: str, size: int):
+    cache.blob_path(digest).write_bytes(b"x" * size)
+    cache.put_image(url, digest)
+
+
+class Response:
+    def __init__(self, status: int, text: str = "", headers=None):
+        self.status_code = status
+        self.ok = status < 400
+        self.text = text
+        self.url = ITEM_URL
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class Session:
+    """Answers 304 to a request carrying the expected ETag, like eBay does."""
+
+    def __init__(self, etag: str):
+        self.etag = etag
+        self.sent = []
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.sent.append(headers or {})
+        if (headers or {}).get("If-None-Match") == self.etag:
+            return Response(304)
+        raise AssertionError("expected a conditional request")
+
+
+def test_conditional_headers():
+    assert conditional_headers(None, None) == {}
+    assert conditional_headers('"v1"', "Tue, 01 Oct 2024 10:00:00 GMT") == {
+        "If-None-Match": '"v1"', "If-Modified-Since": "Tue, 01 Oct 2024 10:00:00 GMT"}
+
+
+def test_listing_round_trip_and_age(cache):
+    listing = EbayListing(item_id="1", title="Levi's 501 Jeans", price=35, size="32x32")
+    cache.put_listing(listing, etag='"v1"')
+    cached = cache.get_listing("1")
+    assert cached.listing.to_dict() == listing.to_dict()
+    assert cached.validators() == {"If-None-Match": '"v1"'}
+    assert cache.fresh_listing("1", max_age=60).title == "Levi's 501 Jeans"
+
+    aged(cache, "listings", 120)
+    assert cache.fresh_listing("1", max_age=60) is None
+    cache.touch_listing("1")
+    assert cache.fresh_listing("1", max_age=60) is not None
+    assert cache.get_listing(None) is None
+    assert (cache.stats["listing_hit"], cache.stats["listing_miss"]) == (2, 1)
+
+
+def test_stale_listing_is_revalidated(cache):
+    cache.put_listing(EbayListing(item_id="1", title="Levi's 501 Jeans"), etag='"v1"')
+    aged(cache, "listings", 120)
+    session = Session('"v1"')
+    listing = ebay_http.fetch_listing(ITEM_URL, item_id="1", session=session, cache=cache,
+                                      max_age=60)
+    assert listing.title == "Levi's 501 Jeans"
+    assert session.sent == [{"If-None-Match": '"v1"'}]
+    assert cache.stats["listing_revalidated"] == 1
+    # The 304 made it fresh again: no request this time
+    ebay_http.fetch_listing(ITEM_URL, item_id="1", session=session, cache=cache, max_age=60)
+    assert len(session.sent) == 1
+
+
+def test_stale_image_is_revalidated(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "_values", {"IMAGE_CACHE_TTL": 60.0})
+    session = Session('"img1"')
+    monkeypatch.setattr(ebay_open, "get_http_session", lambda: session)
+    blob(cache, IMAGE_URL, "d1", 10)
+    with cache.conn:
+        cache.conn.execute("UPDATE image_urls SET etag = ?", ('"img1"',))
+
+    status, digest, *_ = ebay_open.download_image(IMAGE_URL, tmp_path / "a.jpg",
+                                                  cache.get_image(IMAGE_URL))
+    assert (status, digest, session.sent) == ("fresh", "d1", [])
+
+    aged(cache, "image_urls", 120)
+    status, digest, size, _, etag, _ = ebay_open.download_image(
+        IMAGE_URL, tmp_path / "a.jpg", cache.get_image(IMAGE_URL))
+    assert (status, digest, size, etag) == ("not-modified", "d1", 0, '"img1"')
+    assert not (tmp_path / "a.jpg").exists()
+
+
+def test_image_needs_its_file(cache):
+    blob(cache, IMAGE_URL, "d1", 10)
+    assert cache.get_image(IMAGE_URL).path == cache.blob_path("d1")
+    cache.blob_path("d1").unlink()
+    assert cache.get_image(IMAGE_URL) is None
+
+
+def test_evict_least_recently_used(cache):
+    for n in range(1, 5):
+        blob(cache, f"{IMAGE_URL}?{n}", f"d{n}", 100)
+    with cache.conn:
+        for n in range(1, 5):
+            cache.conn.execute("UPDATE blobs SET last_used = ? WHERE digest = ?", (n, f"d{n}"))
+    cache.touch_image(f"{IMAGE_URL}?1", "d1")  # d1 is now the most recent
+
+    # 400 bytes, 250 allowed: d2 goes, d3 is kept for the upload, so d4 goes too
+    assert cache.evict(keep=["d3"]) == 200
+    assert cache.total_bytes() == 200
+    assert {n for n in range(1, 5) if cache.has_blob(f"d{n}")} == {1, 3}
+    assert cache.get_image(f"{IMAGE_URL}?2") is None
+    assert cache.evict() == 0
+    assert cache.stats["evicted_bytes"] == 200
+
+
+def test_new_image_profile_clears_processed_images(cache):
+    cache.use_image_profile("poshmark")
+    blob(cache, IMAGE_URL, "d1", 10)
+    cache.use_image_profile("poshmark")
+    assert cache.has_blob("d1")
+    cache.use_image_profile("small")
+    assert not cache.has_blob("d1")
+    assert cache.get_image(IMAGE_URL) is None and cache.total_bytes() == 0
@@ -0,0 +1,103 @@
+import json, os
+
+import pytest
+
+import config, memory_guard
+from memory_guard import MB, MemoryGuard, recycle_pages
+
+
+class Readings:
+    """Stands in for process_rss/tree_rss: returns the next value in MB each call."""
+
+    def __init__(self, *mb):
+        self.values = [None if v is None else v * MB for v in mb]
+
+    def __call__(self, pid=None):
+        return self.values.pop(0) if len(self.values) > 1 else self.values[0]
+
+
+class Page:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Context:
+    def __init__(self):
+        self.pages = []
+
+    def new_page(self) -> Page:
+        page = Page(self)
+        self.pages.append(page)
+        return page
+
+
+def test_ceiling_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("MEMORY_CEILING_MB", raising=False)
+    assert config._read_settings()["MEMORY_CEILING_MB"] == 0
+
+    def tree_rss(pid=None):
+        raise AssertionError("memory read with no ceiling")
+    monkeypatch.setattr(memory_guard, "tree_rss", tree_rss)
+    assert not MemoryGuard().over_ceiling()
+
+
+def test_over_ceiling(monkeypatch):
+    monkeypatch.setattr(memory_guard, "tree_rss", Readings(900, 1100, None))
+    guard = MemoryGuard(ceiling_mb=1000)
+    assert not guard.over_ceiling()
+    assert guard.over_ceiling()
+    # Unreadable (no /proc): never over
+    assert not guard.over_ceiling()
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc")
+def test_tree_counts_this_process():
+    own = memory_guard.process_rss(os.getpid())
+    pss = memory_guard.process_pss(os.getpid())
+    assert own > 0
+    assert pss is None or 0 < pss <= own
+    assert memory_guard.tree_rss() >= (pss or own)
+    assert memory_guard.process_rss(2 ** 22 + 1) is None
+
+
+def test_recycle_pages_opens_fresh_tabs():
+    context = Context()
+    old = [context.new_page(), context.new_page()]
+    fresh = recycle_pages(*old)
+    assert all(page.closed for page in old)
+    assert len(fresh) == 2 and not any(page.closed for page in fresh)
+    assert all(page.context is context for page in fresh)
+
+
+def test_snapshots_and_report(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(memory_guard, "process_rss", Readings(100, 110, 130))
+    monkeypatch.setattr(memory_guard, "tree_rss", Readings(1000, 1200, 1400))
+    guard = MemoryGuard(snapshot_every=50, out_dir=tmp_path)
+    assert [n for n in range(1, 151) if guard.snapshot_due(n)] == [50, 100, 150]
+
+    guard.record(50, {"JSHeapUsedSize": 20 * MB, "Nodes": 1500})
+    guard.recycled()
+    guard.record(100)
+    guard.record(150)
+    assert "tab JS heap 20 MB, 1500 DOM nodes" in capsys.readouterr().out
+
+    lines = [json.loads(line) for line in guard.out_path.read_text().splitlines()]
+    assert [s["listings"] for s in lines] == [50, 100, 150]
+    assert lines[0]["chromium"] == {"JSHeapUsedSize": 20 * MB, "Nodes": 1500}
+    assert [s["recycles"] for s in lines] == [0, 1, 1]
+
+    guard.print_report()
+    report = capsys.readouterr().out
+    assert "python 100 → 130 MB (+30.0 MB/100 listings)" in report
+    assert "total 1000 → 1400 MB (+400.0 MB/100 listings)" in report
+    assert "tabs recycled 1x" in report
+
+
+def test_report_needs_two_snapshots(capsys):
+    guard = MemoryGuard()
+    guard.print_report()
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,114 @@
+import pytest
+
+import net_policy
+from net_policy import NetPolicy, is_retryable
+
+URL = "https://i.ebayimg.com/images/g/abc/s-l1600.webp"
+HOST = "i.ebayimg.com"
+
+
+class Response:
+    def __init__(self, status: int, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(net_policy.time, "monotonic", clock)
+    monkeypatch.setattr(net_policy.time, "sleep", lambda seconds: None)
+    return clock
+
+
+def test_backoff_is_full_jitter_and_capped(monkeypatch):
+    policy = NetPolicy(backoff=0.5, backoff_max=4.0)
+    monkeypatch.setattr(net_policy.random, "uniform", lambda lo, hi: hi)
+    assert [policy._delay(attempt, None) for attempt in range(5)] == [0.5, 1.0, 2.0, 4.0, 4.0]
+    monkeypatch.setattr(net_policy.random, "uniform", lambda lo, hi: lo)
+    assert policy._delay(3, None) == 0
+
+
+def test_longer_retry_after_wins(monkeypatch):
+    policy = NetPolicy(backoff=0.5, backoff_max=30.0)
+    monkeypatch.setattr(net_policy.random, "uniform", lambda lo, hi: hi)
+    assert policy._delay(0, Response(429, {"Retry-After": "7"})) == 7.0
+    assert policy._delay(0, Response(429, {"Retry-After": "0"})) == 0.5
+    assert policy._delay(0, Response(429, {"Retry-After": "600"})) == 30.0
+
+
+def test_retries_then_returns_the_last_response(clock):
+    policy = NetPolicy(retries=2, breaker_failures=100)
+    answers = [Response(200), Response(502), Response(503)]
+    assert policy.call(URL, lambda: answers.pop()).status_code == 200
+    answers = [Response(503)] * 3
+    assert policy.call(URL, lambda: answers.pop()).status_code == 503
+    assert policy.hosts[HOST].retries == 4
+
+
+def test_other_errors_are_not_retried(clock):
+    policy = NetPolicy(retries=3)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise ValueError("bad URL")
+
+    with pytest.raises(ValueError):
+        policy.call(URL, fn)
+    assert len(calls) == 1
+    assert not is_retryable(ValueError("bad URL"))
+    assert is_retryable(TimeoutError())
+
+
+def test_limit_halves_once_per_interval_and_regrows(clock):
+    policy = NetPolicy(retries=0, host_concurrency=16, breaker_failures=100)
+    policy.call(URL, lambda: Response(429))
+    policy.call(URL, lambda: Response(429))
+    assert policy.hosts[HOST].limit == 8
+    clock.now += net_policy.DECREASE_INTERVAL
+    policy.call(URL, lambda: Response(429))
+    assert policy.hosts[HOST].limit == 4
+    for _ in range(4):
+        policy.call(URL, lambda: Response(200))
+    assert 4.9 < policy.hosts[HOST].limit < 5.1
+
+
+def test_breaker_opens_and_cooldown_doubles_on_a_failed_probe(clock):
+    policy = NetPolicy(retries=0, breaker_failures=3, breaker_cooldown=10.0)
+    for _ in range(3):
+        policy.call(URL, lambda: Response(503))
+    state = policy.hosts[HOST]
+    assert state.opened == 1
+    assert policy._try_acquire(HOST) == pytest.approx(10.0)
+
+    # The probe after the pause fails: pause again, twice as long
+    clock.now += 10.0
+    policy.call(URL, lambda: Response(503))
+    assert state.opened == 2
+    assert policy._try_acquire(HOST) == pytest.approx(20.0)
+
+    # Only one probe at a time; a good one closes the circuit
+    clock.now += 20.0
+    assert policy._try_acquire(HOST) == 0
+    assert policy._try_acquire(HOST) > 0
+    policy._release(HOST, True)
+    assert state.open_until == 0 and state.cooldown == 10.0
+    assert policy._try_acquire(HOST) == 0
+
+
+def test_cooldown_is_capped(clock):
+    policy = NetPolicy(retries=0, breaker_failures=1, breaker_cooldown=1.0)
+    policy.call(URL, lambda: Response(503))
+    for _ in range(10):
+        clock.now += 100.0
+        policy.call(URL, lambda: Response(503))
+    assert policy.hosts[HOST].cooldown == 16.0
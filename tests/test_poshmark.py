@@ -0,0 +1,211 @@
+import asyncio
+
+import pytest
+
+import config, poshmark
+from closet_index import ClosetIndex
+from ebay_listing import EbayListing
+
+
+class Page:
+    """
+    Records the form operations a flow performs. Selectors in `fail` raise on
+    click. With asynchronous=True, actions return coroutines like
+    playwright.async_api, while locator() stays synchronous.
+    """
+
+    def __init__(self, asynchronous: bool = False, fail=(), tiles=()):
+        self.asynchronous = asynchronous
+        self.fail = set(fail)
+        self.tiles = list(tiles)
+        self.calls = []
+        self.listeners = []
+        self.keyboard = self
+
+    def _done(self, value=None):
+        if not self.asynchronous:
+            return value
+
+        async def result():
+            return value
+        return result()
+
+    def _act(self, name: str, selector: str, value=None):
+        self.calls.append((name, selector))
+        if name == "click" and selector in self.fail:
+            raise TimeoutError(f"{selector} not found")
+        return self._done(value)
+
+    def goto(self, url, **kwargs):
+        return self._act("goto", url)
+
+    def wait_for_selector(self, selector, **kwargs):
+        return self._act("wait", selector)
+
+    def set_input_files(self, selector, files, **kwargs):
+        return self._act("upload", selector, files)
+
+    def fill(self, selector, value, **kwargs):
+        return self._act("fill", selector)
+
+    def click(self, selector, **kwargs):
+        return self._act("click", selector)
+
+    def press(self, key):
+        return self._act("press", key)
+
+    def locator(self, selector, has_text=None):
+        return Locator(self, selector)
+
+    def evaluate(self, js, arg=None):
+        if js == poshmark.CLOSET_TILES_JS:
+            return self._done(self.tiles[arg:])
+        return self._done()
+
+    def wait_for_function(self, js, arg=None, timeout=None):
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+        raise PlaywrightTimeoutError("no new cards")
+
+    def on(self, event, fn):
+        self.listeners.append(fn)
+
+    def remove_listener(self, event, fn):
+        self.listeners.remove(fn)
+
+    def clicked(self) -> list[str]:
+        return [selector for name, selector in self.calls if name == "click"]
+
+
+class Locator:
+    def __init__(self, page: Page, selector: str):
+        self.page = page
+        self.selector = selector
+        self.first = self
+
+    def or_(self, other):
+        return self
+
+    def wait_for(self, **kwargs):
+        return self.page._done()
+
+    def is_visible(self):
+        return self.page._done(True)
+
+    def fill(self, value, **kwargs):
+        return self.page._act("fill", self.selector)
+
+    def click(self, **kwargs):
+        return self.page._act("click", self.selector)
+
+
+LISTING = EbayListing(item_id="1", title="Levi's 501 Jeans", department="Men", size="32x32",
+                      condition="Pre-owned - Excellent", price=35, category="Jeans")
+LIST_BUTTON = "button[data-et-name='list']"
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    monkeypatch.setattr(config, "_values", {
+        "POSH_CLOSET_URL": "https://poshmark.test/closet/me",
+        "POSH_CREATE_URL": "https://poshmark.test/create-listing",
+        "FORM_BUDGET_SECONDS": 30.0,
+        "CLOSET_STALL_TIMEOUT_MS": 10,
+        "CLOSET_SCAN": "dom",
+    })
+
+
+def fill(page: Page, jpg_files=()) -> list[str]:
+    stages = []
+    flow = poshmark.fill_listing_form(LISTING, list(jpg_files), on_stage=stages.append)
+    if page.asynchronous:
+        asyncio.run(poshmark.run_async(page, flow))
+    else:
+        poshmark.run(page, flow)
+    return stages
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_both_drivers_walk_the_same_form(asynchronous):
+    sync_page, page = Page(), Page(asynchronous=asynchronous)
+    assert fill(sync_page, ["a.jpg"]) == fill(page, ["a.jpg"]) == ["uploaded", "listed"]
+    assert page.calls == sync_page.calls
+    assert page.clicked()[-2:] == ["button[data-et-name='next']", LIST_BUTTON]
+
+
+def test_category_failure_raises():
+    page = Page(fail={"div.listing-editor__category-container [data-test='dropdown']"})
+    with pytest.raises(RuntimeError, match="category"):
+        fill(page)
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_scan_closet_from_cards(asynchronous, tmp_path, monkeypatch):
+    import net_policy
+
+    monkeypatch.setattr(net_policy, "navigate", lambda page, url, wait_for=None: None)
+
+    async def navigate_async(page, url, wait_for=None):
+        return None
+    monkeypatch.setattr(net_policy, "navigate_async", navigate_async)
+
+    page = Page(asynchronous=asynchronous, tiles=[
+        ("/listing/Levis-501-65a1f0c2b3d4e5f6a7b8c9d0", "Levi's 501 Jeans"),
+        ("/listing/Nike-Air-65a1f0c2b3d4e5f6a7b8c9d1", "Nike Air Max 90"),
+    ])
+    index = ClosetIndex(tmp_path / "closet.sqlite3")
+    flow = poshmark.scan_closet(index, full_rescan=True)
+    titles = asyncio.run(poshmark.run_async(page, flow)) if asynchronous else poshmark.run(page, flow)
+    assert titles == ["Levi's 501 Jeans", "Nike Air Max 90"]
+    assert index.known_ids() == {"65a1f0c2b3d4e5f6a7b8c9d0", "65a1f0c2b3d4e5f6a7b8c9d1"}
+    index.close()
+
+
+def test_listener_removed_when_navigation_fails(tmp_path, monkeypatch):
+    import net_policy
+
+    def navigate(page, url, wait_for=None):
+        raise RuntimeError("closet did not load")
+    monkeypatch.setattr(net_policy, "navigate", navigate)
+
+    page = Page()
+    index = ClosetIndex(tmp_path / "closet.sqlite3")
+    with pytest.raises(RuntimeError, match="did not load"):
+        poshmark.run(page, poshmark.scan_closet(index, mode="feed"))
+    assert page.listeners == []
+    index.close()
+
+
+def test_failed_list_click_is_retried_on_resume(tmp_path, monkeypatch):
+    import ebay_open
+    from job_ledger import JobLedger
+    from title_match import TitleIndex
+
+    monkeypatch.setattr(ebay_open, "download_ebay_images", lambda *args, **kwargs: [])
+    ledger = JobLedger(tmp_path / "jobs.sqlite3")
+    index = ClosetIndex(tmp_path / "closet.sqlite3")
+
+    def attempt(page: Page) -> str:
+        ledger.start("1", "https://www.ebay.com/itm/1")
+        titles = TitleIndex(index.titles())
+        try:
+            return ebay_open.crosslist_listing(
+                LISTING, page, titles, index, cache=None,
+                on_stage=lambda stage: ledger.advance("1", stage),
+            )
+        except RuntimeError as e:
+            ledger.fail("1", str(e))
+            return "failed"
+
+    assert attempt(Page(fail={LIST_BUTTON})) == "failed"
+    assert index.titles() == []
+    entry = ledger.get("1")
+    assert (entry.stage, entry.failed_step) == ("uploaded", "form")
+    assert ledger.done_keys() == set()
+
+    # The rerun creates the listing instead of matching a placeholder
+    assert attempt(Page()) == "created"
+    assert ledger.get("1").stage == "listed"
+    assert index.titles() == [LISTING.title]
+    ledger.close()
+    index.close()
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from title_match import TitleIndex, normalize_title, trigrams
+
+CLOSET = [
+    "Nike Air Max 90 White Size 10",
+    "Levi's 501 Original Fit Jeans 32x32",
+    "Patagonia Better Sweater Fleece Jacket Mens L",
+    "Lululemon Align Leggings 25 Black Size 6",
+    "Shirt",
+]
+
+
+def jaccard(a: str, b: str) -> float:
+    ga, gb = trigrams(normalize_title(a)), trigrams(normalize_title(b))
+    return len(ga & gb) / len(ga | gb)
+
+
+def test_normalize_title():
+    assert normalize_title("Levi&#39;s  Café-Racer JACKET!") == "levis cafe racer jacket"
+
+
+def test_exact_and_containment():
+    index = TitleIndex(CLOSET)
+    assert [m.kind for m in index.match("nike air max 90 white size 10")] == ["exact"]
+    assert [m.kind for m in index.match("Nike Air Max 90")] == ["contains"]
+    assert [m.kind for m in index.match("Levis 501 Original Fit Jeans 32x32 Dark")] == ["contained"]
+    # Too short to match by containment
+    assert index.match("Shirt blue") == []
+
+
+def test_similar_respects_the_threshold():
+    index = TitleIndex(CLOSET)
+    query = "Nike Air Max 90 White Sz 10"
+    score = jaccard(query, CLOSET[0])
+    assert index.similar(query, threshold=score) == [(0, score)]
+    assert index.similar(query, threshold=score + 0.01) == []
+    # match() uses the index's own threshold
+    assert index.match(query) == []
+    assert [m.kind for m in TitleIndex(CLOSET, threshold=0.7).match(query)] == ["similar"]
+
+
+@pytest.mark.parametrize("threshold", [0.1, 0.3, 0.5, 0.7, 0.85, 1.0])
+def test_similar_finds_what_a_full_scan_finds(threshold):
+    rng = random.Random(3)
+    words = "nike air max white black size jeans levis fit slim red blue 10 32 m l".split()
+    titles = [" ".join(rng.choices(words, k=rng.randint(2, 7))) for _ in range(300)]
+    index = TitleIndex(titles)
+    for query in titles[:40]:
+        expected = {i for i, t in enumerate(titles) if jaccard(query, t) >= threshold}
+        assert {i for i, _ in index.similar(query, threshold=threshold)} == expected
+
+
+@pytest.mark.parametrize("closet_title, query, threshold", [
+    # 7 of 25 trigrams: 0.28 * 25 == 7.000000000000001
+    ("abcdef", "abcdef ghijklmnopqrstuvw", 0.28),
+    # 28 of 50 trigrams: 0.56 * 50 == 28.000000000000004
+    ("abcdefghijklmnopqrstuvwxyz0", "abcdefghijklmnopqrstuvwxyz0 987654321 zyxwvutsrqp", 0.56),
+])
+def test_similar_at_the_exact_boundary(closet_title, query, threshold):
+    n = len(trigrams(query))
+    assert len(trigrams(closet_title)) / n == jaccard(query, closet_title) == threshold
+    index = TitleIndex([closet_title])
+    assert index.similar(query, threshold=threshold) == [(0, threshold)]
+
+
+@pytest.mark.parametrize("threshold", [0, -0.5, 1.01])
+def test_threshold_out_of_range(threshold):
+    with pytest.raises(ValueError):
+        TitleIndex(CLOSET, threshold=threshold)
+    with pytest.raises(ValueError):
+        TitleIndex(CLOSET).similar("Nike Air Max", threshold=threshold)
@@ -0,0 +1,173 @@
+from collections import defaultdict
+from typing import NamedTuple
+
+import html, math, re, unicodedata
+
+# Titles shorter than this (after normalization) are too generic to match by
+# containment: "Shirt" would otherwise match every shirt in the closet.
+MIN_CONTAINMENT_CHARS = 8
+MIN_CONTAINMENT_TOKENS = 2
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, strip accents/HTML entities/punctuation, collapse whitespace."""
+    text = html.unescape(title or "")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"['’`]", "", text.lower())  # "Levi's" → "levis"
+    text = re.sub(r"[^a-z0-9]+", " ", text)
+    return text.strip()
+
+
+def trigrams(norm: str) -> set[str]:
+    padded = f"  {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _check_threshold(threshold: float) -> float:
+    # 0 would divide by zero in the length filter and match every title
+    if not 0 < threshold <= 1:
+        raise ValueError(f"similarity threshold must be in (0, 1], got {threshold!r}")
+    return threshold
+
+
+class TitleMatch(NamedTuple):
+    index: int     # position of the closet title in the index
+    title: str     # closet title as originally given
+    kind: str      # "exact", "contains", "contained" or "similar"
+    score: float   # 1.0 for exact/containment, trigram Jaccard for "similar"
+
+
+class TitleIndex:
+    """
+    Inverted index over closet titles for duplicate detection.
+
+    Built once per run; supports exact, containment (either direction, on
+    whole tokens) and trigram-similarity lookups without scanning every
+    title.
+    """
+
+    def __init__(self, titles=(), threshold: float = 0.85):
+        self.threshold = _check_threshold(threshold)
+        self.titles = []
+        self.norms = []
+        self.gram_sets = []
+        self.by_norm = defaultdict(list)
+        self.by_token = defaultdict(set)
+        self.by_gram = defaultdict(list)
+        for title in titles:
+            self.add(title)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def add(self, title: str) -> int:
+        idx = len(self.titles)
+        norm = normalize_title(title)
+        tokens = set(norm.split())
+        grams = trigrams(norm) if norm else set()
+
+        self.titles.append(title)
+        self.norms.append(norm)
+        self.gram_sets.append(grams)
+
+        self.by_norm[norm].append(idx)
+        for tok in tokens:
+            self.by_token[tok].add(idx)
+        for gram in grams:
+            self.by_gram[gram].append(idx)
+        return idx
+
+    # --- individual lookups ------------------------------------------------
+
+    def exact(self, title: str) -> list[int]:
+        norm = normalize_title(title)
+        return list(self.by_norm.get(norm, ())) if norm else []
+
+    def containment(self, title: str) -> list[tuple[int, str]]:
+        """
+        Closet titles that contain the query ("contains") or are contained in
+        it ("contained"), compared on whole tokens.
+        """
+        norm = normalize_title(title)
+        tokens = set(norm.split())
+        if not tokens:
+            return []
+
+        results = []
+        padded = f" {norm} "
+
+        # Closet title contains the query: intersect postings, rarest first
+        if _long_enough(norm, tokens):
+            postings = sorted((self.by_token.get(t, set()) for t in tokens), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            for idx in candidates:
+                if self.norms[idx] != norm and padded in f" {self.norms[idx]} ":
+                    results.append((idx, "contains"))
+
+        # Query contains the closet title: the closet title must be one of the
+        # query's contiguous token runs, so look each run up directly
+        words = norm.split()
+        for i in range(len(words)):
+            for j in range(i + MIN_CONTAINMENT_TOKENS, len(words) + 1):
+                run = " ".join(words[i:j])
+                if run == norm or len(run) < MIN_CONTAINMENT_CHARS:
+                    continue
+                for idx in self.by_norm.get(run, ()):
+                    results.append((idx, "contained"))
+
+        return results
+
+    def similar(self, title: str, threshold: float | None = None) -> list[tuple[int, float]]:
+        """Closet titles whose trigram Jaccard similarity is >= threshold."""
+        threshold = self.threshold if threshold is None else _check_threshold(threshold)
+        norm = normalize_title(title)
+        if not norm:
+            return []
+        grams = trigrams(norm)
+        n = len(grams)
+
+        # Prefix filter: a title with Jaccard >= t shares at least ceil(t·|A|)
+        # of the query's trigrams, so it must share one of the
+        # |A| - ceil(t·|A|) + 1 rarest ones. Probe only those, then verify.
+        # The 1e-9 keeps float error from rounding t·|A| past an exact
+        # boundary (0.28 * 25 == 7.000000000000001).
+        probe = sorted(grams, key=lambda g: len(self.by_gram.get(g, ())))
+        probe = probe[: n - math.ceil(threshold * n - 1e-9) + 1]
+        candidates = set()
+        for gram in probe:
+            candidates.update(self.by_gram.get(gram, ()))
+
+        lo, hi = threshold * n - 1e-9, n / threshold + 1e-9
+        results = []
+        for idx in candidates:
+            other = self.gram_sets[idx]
+            if not lo <= len(other) <= hi:
+                continue
+            inter = len(grams & other)
+            score = inter / (n + len(other) - inter)
+            if score >= threshold:
+                results.append((idx, score))
+        results.sort(key=lambda r: -r[1])
+        return results
+
+    # --- combined ----------------------------------------------------------
+
+    def match(self, title: str) -> list[TitleMatch]:
+        """All closet titles that look like the same listing, best first."""
+        found = {}
+        for idx in self.exact(title):
+            found[idx] = TitleMatch(idx, self.titles[idx], "exact", 1.0)
+        for idx, kind in self.containment(title):
+            found.setdefault(idx, TitleMatch(idx, self.titles[idx], kind, 1.0))
+        for idx, score in self.similar(title):
+            found.setdefault(idx, TitleMatch(idx, self.titles[idx], "similar", score))
+        return sorted(found.values(), key=lambda m: (-m.score, m.index))
+
+    def match_many(self, titles) -> dict[str, list[TitleMatch]]:
+        """Batch lookup: {title: matches} for every title (empty list if none)."""
+        return {title: self.match(title) for title in titles}
+
+
+def _long_enough(norm: str, tokens) -> bool:
+    return len(norm) >= MIN_CONTAINMENT_CHARS and len(tokens) >= MIN_CONTAINMENT_TOKENS